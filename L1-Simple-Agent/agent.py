@@ -1,10 +1,15 @@
-import re
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
 
 from agents_in_langgraph.utils import open_ai
 from agents_in_langgraph.utils.util import known_actions, average_dog_weight
+from agents_in_langgraph.utils.react import ACTION_RE, ActionDispatcher, ReActParser, format_observations
+
+logger = logging.getLogger(__name__)
 
 class Agent:
-    def __init__(self, system: str="") -> None:
+    def __init__(self, system: str="", stream: bool=False) -> None:
         self.system = system
         self.messages = []
         if self.system:
@@ -12,7 +17,10 @@ class Agent:
         self.client = open_ai.new_open_ai()
         # python regular expression to selection action
         self.known_actions = known_actions
-        self.action_re = re.compile('^Action: (\w+): (.*)$')
+        self.action_re = ACTION_RE
+        self.dispatcher = ActionDispatcher(self.known_actions)
+        # stream completions and start actions as soon as their line is complete
+        self.stream = stream
     
     def __call__(self, message):
         self.messages.append({"role": "user", "content": message})
@@ -26,35 +34,62 @@ class Agent:
             model=model,
             temperature=temperature,
             messages=self.messages,
+            # keep the model loaded, so the long system prompt stays in its prompt cache
+            extra_body=open_ai.ollama_options(),
         )
 
         return completion.choices[0].message.content
+
+    def execute_stream(self, model: str="qwen2.5-it:3b", temperature: float=0.0):
+        completion = self.client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            messages=self.messages,
+            stream=True,
+            extra_body=open_ai.ollama_options(),
+        )
+        for chunk in completion:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def turn(self, message):
+        """One model turn: returns the completion, its actions and their observations"""
+        self.messages.append({"role": "user", "content": message})
+        parser = ReActParser(self.action_re)
+        if not self.stream:
+            result = self.execute()
+            actions = parser.feed(result) + parser.close()
+            observations = [self.dispatcher.run(a) for a in actions]
+        else:
+            pieces, actions, futures = [], [], []
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                for token in self.execute_stream():
+                    pieces.append(token)
+                    # fire each action while the model is still generating
+                    for action in parser.feed(token):
+                        actions.append(action)
+                        futures.append(executor.submit(self.dispatcher.run, action))
+                for action in parser.close():
+                    actions.append(action)
+                    futures.append(executor.submit(self.dispatcher.run, action))
+                observations = [f.result() for f in futures]
+            result = "".join(pieces)
+        self.messages.append({"role": "assistant", "content": result})
+        return result, actions, observations, parser.answer
     
     def query(self, question: str, max_turns: int=5):
-        i = 0
         next_prompt = question
-        while i < max_turns:
-            i += 1
-            result = self(next_prompt)
-            print(result)
-            actions = [
-                self.action_re.match(a) 
-                for a in result.split('\n') 
-                if self.action_re.match(a)
-            ]
-            if actions:
-                # There is an action to run
-                action, action_input = actions[0].groups()
-                if action not in self.known_actions:
-                    raise Exception("Unknown action: {}: {}".format(action, action_input))
-                print(" -- running {} {}".format(action, action_input))
-                observation = self.known_actions[action](action_input)
-                print("Observation:", observation)
-                next_prompt = "Observation: {}".format(observation)
-            else:
-                return
+        for i in range(max_turns):
+            result, actions, observations, answer = self.turn(next_prompt)
+            logger.info("turn %d:\n%s", i + 1, result)
+            if not actions:
+                return answer if answer is not None else result
+            # There are actions to run, unknown or failing ones come back as error observations
+            next_prompt = format_observations(actions, observations)
+            logger.info("%s", next_prompt)
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     print(f"example - completions with prompts and function call results")
     prompt = """
         You run in a loop of Thought, Action, PAUSE, Observation.
@@ -114,7 +149,7 @@ if __name__ == '__main__':
     next_prompt = "Observation: {}".format(average_dog_weight("Scottish Terrier"))
     print(next_prompt)
     abot(next_prompt)
-    next_prompt = "Observation: {}".format(eval("37 + 20"))
+    next_prompt = "Observation: {}".format(known_actions["calculate"]("37 + 20"))
     print(next_prompt)
     abot(next_prompt)
     print(f"=================================================================================================")
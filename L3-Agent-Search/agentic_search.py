@@ -1,11 +1,11 @@
 import json
-from pygments import highlight, lexers, formatters
 
 from agents_in_langgraph.utils.tavily_search import new_trvily_client
+from agents_in_langgraph.utils.search_cache import SearchCache
 
 class tavily_search:
-    def __init__(self):
-        self.client = new_trvily_client()
+    def __init__(self, cache: SearchCache | None = None):
+        self.client = new_trvily_client(cache=cache)
 
     def search(self, query):
         # run search
@@ -15,16 +15,21 @@ class tavily_search:
         
         return result
     
-    def parse_result(self, date):
+    def parse_result(self, data):
         # parse JSON
         parsed_json = json.loads(data.replace("'", '"'))
 
-        # pretty print JSON with syntax highlighting
+        # pretty print JSON with syntax highlighting, pygments comes with the viz extra
         formatted_json = json.dumps(parsed_json, indent=4)
+        try:
+            from pygments import highlight, lexers, formatters
+        except ImportError:
+            return formatted_json
         colorful_json = highlight(
             formatted_json,
             lexers.JsonLexer(),
             formatters.TerminalFormatter())
+        return colorful_json
         
 
 if __name__ == "__main__":
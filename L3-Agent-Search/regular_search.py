@@ -1,20 +1,30 @@
-import requests
 from bs4 import BeautifulSoup
 from duckduckgo_search import DDGS
 import re
 
+from agents_in_langgraph.utils.search_cache import SearchCache
+from agents_in_langgraph.utils.clients import requests_session
+from agents_in_langgraph.utils.scrape import scrape_text, scrape_many
+
 class regular_search:
-    def __init__(self, max_results: int = 6):
+    def __init__(self, max_results: int = 6, cache: SearchCache | None = None):
         self.max_results = max_results
         self.ddg = DDGS()
+        self.cache = cache
+
+    def _search(self, query, max_results):
+        results = self.ddg.text(query, max_results=max_results)
+        return [i["href"] for i in results]
 
     def search(self, query, max_results=6):
         if not max_results:
             max_results = self.max_results
         
         try:
-            results = self.ddg.text(query, max_results=max_results)
-            return [i["href"] for i in results]
+            if self.cache is not None:
+                # a stale cached answer beats the static list below
+                return self.cache.call("ddg", self._search, query, max_results=max_results)
+            return self._search(query, max_results)
         except Exception as e:
             print(f"returning previous results due to exception reaching ddg.")
             results = [ # cover case where DDG rate limits due to high deeplearning.ai volume
@@ -30,15 +40,31 @@ class regular_search:
         
         # fetch data
         headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers)
+        # pooled session, repeated scrapes of a host reuse the connection
+        response = requests_session().get(url, headers=headers)
         if response.status_code != 200:
             return "Failed to retrieve the webpage."
 
         # parse result
         soup = BeautifulSoup(response.text, 'html.parser')
         print(f"Website: {url}\n\n")
-        print(str(soup.body)[:50000]) # limit long outputs
         return soup
+
+    def scrape_text(self, url, max_bytes: int = 1 << 20):
+        """Stream the page and keep only its h1/h2/h3/p text, no soup is built"""
+        if not url:
+            return "Weather information could not be found."
+        text = scrape_text(url, max_bytes=max_bytes)
+        if text is None:
+            return "Failed to retrieve the webpage."
+        return text
+
+    def scrape_all(self, urls, max_workers: int = 6, max_bytes: int = 1 << 20):
+        """Scrape every url returned by search() concurrently"""
+        return [
+            (url, "Failed to retrieve the webpage." if text is None else text)
+            for url, text in scrape_many(urls, max_workers=max_workers, max_bytes=max_bytes)
+        ]
     
     def extract_text(self, soup):
         # extract text
@@ -53,9 +79,6 @@ class regular_search:
         # remove all spaces from the combined text
         weather_data = re.sub(r'\s+', ' ', weather_data)
 
-        print(f"Website: {url}\n\n")
-        print(weather_data)
-        
         return weather_data
 
 
@@ -82,4 +105,9 @@ if __name__ == '__main__':
 
     # extract text
     weather_data = reg_search.extract_text(soup)
+    print(weather_data)
+
+    # or stream and extract all of them at once
+    for url, weather_data in reg_search.scrape_all(result):
+        print(f"Website: {url}\n\n{weather_data[:500]}\n")
     
\ No newline at end of file
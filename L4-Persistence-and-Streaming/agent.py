@@ -1,87 +1,62 @@
-import operator
 import asyncio
 
-from typing import TypedDict, Annotated
-from langchain_core.messages import AnyMessage, SystemMessage, HumanMessage, ToolMessage
-from langgraph.graph import StateGraph, END
-from IPython.display import Image
-from langgraph.checkpoint.sqlite import SqliteSaver
-from langgraph.checkpoint.aiosqlite import AsyncSqliteSaver
+from langchain_core.messages import HumanMessage
 
+# the graph is compiled once in core.agent and shared by every Agent,
+# the checkpointer is attached per agent
+from agents_in_langgraph.core.agent import Agent, AsyncAgent
 from agents_in_langgraph.utils.open_ai import new_chat_open_ai
 from agents_in_langgraph.utils.tavily_search import new_tavily_search
+from agents_in_langgraph.utils.viz import draw_graph
 
-class AgentState(TypedDict):
-    messages: Annotated[list[AnyMessage], operator.add]
-
-
-class Agent():
-    def __init__(self, model, tools, checkpointer, system:str=""):
-        self.system = system
-        graph = StateGraph(AgentState)
-        graph.add_node("llm", self.call_openai)
-        graph.add_node("action", self.take_action)
-        graph.add_conditional_edges(
-            "llm", # where the conditional edge starts
-            self.exists_action, # function where to go after LLM returns
-            {True: "action", False: END}, # dict of possible destinations nodes
-        )
-        graph.add_edge("action", "llm") # add an edge from action to llm
-        graph.set_entry_point("llm") # set the entry point to llm
-
-        # compile the graph, returning a langchain runnable
-        # here we use a sqlite checkpointer
-        self.graph = graph.compile(checkpointer=checkpointer)
-        self.tools = {t.name: t for t in tools}
-        self.model = model.bind_tools(tools) # bind the tools to the model
-
-    def exists_action(self, state: AgentState):
-        result = state['messages'][-1]
-        return len(result.tool_calls) > 0
-    
-    def call_openai(self, state: AgentState):
-        messages = state['messages']
-        if self.system:
-            messages = [SystemMessage(content=self.system)] + messages
-        message = self.model.invoke(messages)
-        return {'messages': [message]}
-    
-    def take_action(self, state: AgentState):
-        tool_calls = state['messages'][-1].tool_calls
-        results = []
-        for t in tool_calls:
-            print(f"Calling: {t}")
-            if not t['name'] in self.tools:      # check for bad tool name from LLM
-                print("\n ....bad tool name....")
-                result = "bad tool name, retry"  # instruct LLM to retry if bad
-            else:
-                result = self.tools[t['name']].invoke(t['args'])
-            results.append(ToolMessage(tool_call_id=t['id'], name=t['name'], content=str(result)))
-        print("Back to the model!")
-        return {'messages': results}
-    
-    def stream(self, input, config):
-        for event in self.graph.stream(input, config):
-            for v in event.values():
-                print(v['messages'])
 
-async def stream_token():
-    with AsyncSqliteSaver.from_conn_string(":memory:") as memory:
-                abot = Agent(model, [tool], system=prompt, checkpointer=memory)
-
-                messages = [HumanMessage(content="What is the weather in SF?")]
-                thread = {"configurable": {"thread_id": "4"}}
-                async for event in abot.graph.astream_events({"messages": messages}, thread, version="v1"):
-                    kind = event["event"]
-                    if kind == "on_chat_model_stream":
-                        content = event["data"]["chunk"].content
-                        if content:
-                            # Empty content in the context of OpenAI means
-                            # that the model is asking for a tool to be invoked.
-                            # So we only print non-empty content
-                            print(content, end="|")
+async def run_threads(abot: AsyncAgent, questions: dict[str, str], max_concurrency: int = 100):
+    """
+    Run one question per thread id concurrently on the current event loop,
+    at most `max_concurrency` at a time. Returns the final state per thread.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _run(thread_id: str, question: str):
+        async with semaphore:
+            thread = {"configurable": {"thread_id": thread_id}}
+            return await abot.graph.ainvoke({"messages": [HumanMessage(content=question)]}, thread)
+
+    results = await asyncio.gather(*(_run(k, q) for k, q in questions.items()))
+    return dict(zip(questions, results))
+
+
+async def stream_token(model, tool, prompt):
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    # the async saver is an async context manager, it must be entered with `async with`
+    async with AsyncSqliteSaver.from_conn_string(":memory:") as memory:
+        abot = AsyncAgent(model, [tool], system=prompt, checkpointer=memory)
+
+        messages = [HumanMessage(content="What is the weather in SF?")]
+        thread = {"configurable": {"thread_id": "4"}}
+        async for event in abot.graph.astream_events({"messages": messages}, thread, version="v1"):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                content = event["data"]["chunk"].content
+                if content:
+                    # Empty content in the context of OpenAI means
+                    # that the model is asking for a tool to be invoked.
+                    # So we only print non-empty content
+                    print(content, end="|")
+
+
+async def serve_many(model, tool, prompt, questions: list[str], max_concurrency: int = 100):
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    async with AsyncSqliteSaver.from_conn_string(":memory:") as memory:
+        abot = AsyncAgent(model, [tool], system=prompt, checkpointer=memory)
+        results = await run_threads(
+            abot, {str(i): q for i, q in enumerate(questions)}, max_concurrency=max_concurrency)
+        for thread_id, result in results.items():
+            print(f"thread {thread_id}: {result['messages'][-1].content}")
+
 
 if __name__ == '__main__':
+    from langgraph.checkpoint.sqlite import SqliteSaver
     
     # TODO: define a custom tool implemented by ourselves
     tool = new_tavily_search(max_results=2)
@@ -102,7 +77,7 @@ if __name__ == '__main__':
         model = new_chat_open_ai(model=model_name)
         abot = Agent(model, [tool], checkpointer=memory, system=prompt)
         # Comment temporarily
-        # Image(abot.graph.get_graph().draw_png())
+        # draw_graph(abot.graph)
 
         messages = [HumanMessage(content="What is the weather in sf?")]
         thread = {"configurable": {"thread_id": "1"}}
@@ -136,7 +111,8 @@ if __name__ == '__main__':
         print(f"=================================================================================================")
 
     # Streaming tokens
-    # TODO: need validations in the future
-    asyncio.to_thread(
-        stream_token()
-    )
\ No newline at end of file
+    asyncio.run(stream_token(model, tool, prompt))
+
+    # Many conversations on one event loop
+    questions = [f"What is the weather in {city}?" for city in ["SF", "LA", "NYC", "Seattle"]]
+    asyncio.run(serve_many(model, tool, prompt, questions))
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Benchmark: the L1, L2, L4 and L5 agents end to end against local fakes
+(benchmarks/fakes.py), so no Ollama server or Tavily key is needed.
+
+For each agent it reports graph steps per second, p50/p99 latency of one
+question, memory held per finished thread and checkpoint size per thread
+(L4/L5, SqliteSaver on disk). With --record, each run is appended to a
+JSON lines file (benchmarks/results.jsonl by default, not tracked by git)
+with the git commit it ran on, so numbers can be compared across commits
+with --history.
+
+    python -m agents_in_langgraph.benchmarks.bench_agents
+    python -m agents_in_langgraph.benchmarks.bench_agents --agents L2 L4 --latency 0.05 --tool-latency 0.2
+    python -m agents_in_langgraph.benchmarks.bench_agents --record
+    python -m agents_in_langgraph.benchmarks.bench_agents --history
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from agents_in_langgraph.benchmarks.fakes import FakeChatModel, FakeOpenAIClient, fake_search_tool
+from agents_in_langgraph.utils.batch import percentile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+RESULTS = os.path.join(HERE, "results.jsonl")
+
+LESSONS = {
+    "L1": "L1-Simple-Agent",
+    "L2": "L2-LangGraph-Components",
+    "L4": "L4-Persistence-and-Streaming",
+    "L5": "L5-Human-in-the-Loop",
+}
+QUESTION = "What is the weather in SF and LA?"
+
+
+def load_lesson(name: str):
+    """Import `<lesson dir>/agent.py`; the lesson directories are not valid package names."""
+    path = os.path.join(ROOT, LESSONS[name], "agent.py")
+    spec = importlib.util.spec_from_file_location(f"agents_in_langgraph.lessons.{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def git_commit() -> tuple[str, bool]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+# one agent per lesson: build(checkpointer) -> run(i) -> (steps, kept)
+
+def _l1(module, args):
+    client = FakeOpenAIClient(latency=args.latency, token_latency=args.token_latency)
+
+    def run(i: int):
+        agent = module.Agent("You run in a loop of Thought, Action, PAUSE, Observation.")
+        agent.client = client
+        agent.query(QUESTION)
+        # one step per model call and per action
+        steps = sum(m["role"] == "assistant" for m in agent.messages)
+        steps += sum(m["content"].startswith("Observation") for m in agent.messages if m["role"] == "user")
+        return steps, agent
+    return run
+
+
+def _graph_agent(module, args, checkpointer, resume: bool):
+    model = FakeChatModel(
+        latency=args.latency, token_latency=args.token_latency,
+        tool_turns=args.tool_turns, tool_calls_per_turn=args.tool_calls)
+    tool = fake_search_tool(latency=args.tool_latency)
+    kwargs = {"checkpointer": checkpointer} if checkpointer is not None else {}
+    abot = module.Agent(model, [tool], system="You are a smart research assistant.", **kwargs)
+
+    def run(i: int):
+        config = {"configurable": {"thread_id": str(i)}}
+        graph_input = {"messages": [HumanMessage(content=QUESTION)]}
+        steps, last = 0, None
+        while True:
+            for event in abot.graph.stream(graph_input, config, stream_mode="updates"):
+                steps += sum(node in ("llm", "action") for node in event)
+                last = event
+            # L5 stops before every action until it is approved
+            if not resume or not abot.graph.get_state(config).next:
+                break
+            graph_input = None
+        return steps, last
+    return run
+
+
+def _runner(name: str, module, args, checkpointer):
+    if name == "L1":
+        return _l1(module, args)
+    return _graph_agent(module, args, checkpointer, resume=name == "L5")
+
+
+def _timed_pass(run, threads: int) -> tuple[float, list[float]]:
+    steps, latencies = 0, []
+    start = time.perf_counter()
+    for i in range(threads):
+        t = time.perf_counter()
+        steps += run(i)[0]
+        latencies.append(time.perf_counter() - t)
+    return steps / (time.perf_counter() - start), latencies
+
+
+def bench(name: str, module, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        # timing and checkpoint size with the on-disk saver the lessons use
+        path = os.path.join(tmp, "checkpoints.sqlite")
+        with contextlib.ExitStack() as stack:
+            checkpointer = stack.enter_context(SqliteSaver.from_conn_string(path)) if name in ("L4", "L5") else None
+            rate, latencies = _timed_pass(_runner(name, module, args, checkpointer), args.threads)
+        size = sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+    # memory still held once every thread finished, with state kept in process
+    run = _runner(name, module, args, MemorySaver() if name in ("L4", "L5") else None)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [run(i)[1] for i in range(args.threads)]
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+
+    return {
+        "agent": name,
+        "steps_per_sec": round(rate, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "memory_kb_per_thread": round(held / args.threads / 1024, 1),
+        "checkpoint_kb_per_thread": round(size / args.threads / 1024, 1) if name in ("L4", "L5") else None,
+    }
+
+
+def print_rows(rows: list[dict]) -> None:
+    print(f"{'commit':>10} {'agent':>5} {'steps/sec':>10} {'p50 ms':>9} {'p99 ms':>9} {'KB/thread':>10} {'ckpt KB/thread':>15}")
+    for r in rows:
+        commit = r.get("commit", "") + ("+" if r.get("dirty") else "")
+        ckpt = "-" if r["checkpoint_kb_per_thread"] is None else f"{r['checkpoint_kb_per_thread']:.1f}"
+        print(f"{commit:>10} {r['agent']:>5} {r['steps_per_sec']:>10.1f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+              f"{r['memory_kb_per_thread']:>10.1f} {ckpt:>15}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", nargs="+", default=list(LESSONS), choices=list(LESSONS))
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="model seconds before the first token")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="model seconds per token")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="search seconds per call")
+    parser.add_argument("--tool-turns", type=int, default=1)
+    parser.add_argument("--tool-calls", type=int, default=2, help="tool calls per tool turn")
+    parser.add_argument("--record", nargs="?", const=RESULTS, metavar="PATH",
+                        help=f"append the results to PATH (default {os.path.relpath(RESULTS, ROOT)})")
+    parser.add_argument("--history", action="store_true", help="print the runs recorded in --record PATH and exit")
+    args = parser.parse_args()
+
+    if args.history:
+        path = args.record or RESULTS
+        if not os.path.exists(path):
+            print("no recorded runs")
+            return
+        with open(path) as f:
+            print_rows([json.loads(line) for line in f if line.strip()])
+        return
+
+    params = {k: getattr(args, k) for k in ("threads", "latency", "token_latency", "tool_latency", "tool_turns", "tool_calls")}
+    commit, dirty = git_commit()
+    rows = []
+    for name in args.agents:
+        # the lessons print every call; keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            module = load_lesson(name)
+            row = bench(name, module, args)
+        rows.append({"commit": commit, "dirty": dirty, **row})
+    print_rows(rows)
+
+    if args.record:
+        recorded_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        with open(args.record, "a") as f:
+            for row in rows:
+                f.write(json.dumps({**row, "time": recorded_at, "params": params}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark: utils.calc against eval on the kind of expressions the L1 ReAct
+loop sends to `calculate`, plus the batch and NumPy paths.
+
+    python -m agents_in_langgraph.benchmarks.bench_calculate
+"""
+import argparse
+import timeit
+
+from agents_in_langgraph.utils.calc import evaluate, evaluate_array, evaluate_many
+
+REACT_EXPRESSIONS = [
+    "37 + 20",
+    "4 * 7 / 3",
+    "20 + 37 + 7",
+    "(37 + 20) / 2",
+    "51 * 2.2",
+    "7.0 * 3 - 1.5",
+    "2 ** 10",
+    "round(100 / 3, 2)",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=20_000)
+    parser.add_argument("--array-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    assert [eval(e) for e in REACT_EXPRESSIONS] == [evaluate(e) for e in REACT_EXPRESSIONS]
+
+    def per_call(fn) -> float:
+        total = min(timeit.repeat(fn, number=args.number, repeat=3))
+        return total / (args.number * len(REACT_EXPRESSIONS)) * 1e6
+
+    print(f"{'path':>28} {'us / expression':>16}")
+    print(f"{'eval':>28} {per_call(lambda: [eval(e) for e in REACT_EXPRESSIONS]):>16.2f}")
+    print(f"{'evaluate (cached)':>28} {per_call(lambda: [evaluate(e) for e in REACT_EXPRESSIONS]):>16.2f}")
+    print(f"{'evaluate_many':>28} {per_call(lambda: evaluate_many(REACT_EXPRESSIONS)):>16.2f}")
+
+    import numpy as np
+    x = np.random.default_rng(0).random(args.array_size) * 100
+    values = x.tolist()
+    loop = min(timeit.repeat(lambda: [evaluate("x * 2.2 + 37", x=v) for v in values], number=1, repeat=3))
+    vector = min(timeit.repeat(lambda: evaluate_array("x * 2.2 + 37", x=x), number=1, repeat=3))
+    print(f"{'scalar loop over array':>28} {loop / args.array_size * 1e6:>16.3f}")
+    print(f"{'evaluate_array':>28} {vector / args.array_size * 1e6:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
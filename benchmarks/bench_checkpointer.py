@@ -0,0 +1,91 @@
+"""
+Benchmark: graph steps per second with the stock SqliteSaver against
+utils.checkpoint.BatchedSqliteSaver and DeltaSqliteSaver, all writing to a
+file on disk.
+
+The graph is a two-node llm/action loop without a model, so the numbers are
+checkpoint overhead only.
+
+    python -m agents_in_langgraph.benchmarks.bench_checkpointer
+"""
+import argparse
+import operator
+import os
+import tempfile
+import time
+
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, StateGraph
+
+from agents_in_langgraph.utils.checkpoint import BatchedSqliteSaver, DeltaSqliteSaver
+
+
+class LoopState(TypedDict):
+    messages: Annotated[list[AnyMessage], operator.add]
+
+
+def build_graph(checkpointer, turns: int):
+    def llm(state: LoopState):
+        return {'messages': [AIMessage(content="thinking " * 20)]}
+
+    def action(state: LoopState):
+        return {'messages': [ToolMessage(content="result " * 50, tool_call_id="call")]}
+
+    def more(state: LoopState):
+        return len(state['messages']) < 2 * turns
+
+    graph = StateGraph(LoopState)
+    graph.add_node("llm", llm)
+    graph.add_node("action", action)
+    graph.add_conditional_edges("llm", more, {True: "action", False: END})
+    graph.add_edge("action", "llm")
+    graph.set_entry_point("llm")
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run(checkpointer, threads: int, turns: int) -> float:
+    graph = build_graph(checkpointer, turns)
+    start = time.perf_counter()
+    steps = 0
+    for i in range(threads):
+        thread = {"configurable": {"thread_id": str(i)}, "recursion_limit": 4 * turns}
+        result = graph.invoke({"messages": [HumanMessage(content="go")]}, thread)
+        steps += len(result['messages'])
+    return steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--keep-last", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stock_path = os.path.join(tmp, "stock.sqlite")
+        with SqliteSaver.from_conn_string(stock_path) as stock:
+            stock_rate = run(stock, args.threads, args.turns)
+
+        batched_path = os.path.join(tmp, "batched.sqlite")
+        with BatchedSqliteSaver.from_conn_string(batched_path, keep_last=args.keep_last) as batched:
+            batched_rate = run(batched, args.threads, args.turns)
+
+        delta_path = os.path.join(tmp, "delta.sqlite")
+        with DeltaSqliteSaver.from_conn_string(delta_path, keep_last=args.keep_last) as delta:
+            delta_rate = run(delta, args.threads, args.turns)
+
+        print(f"{'saver':>22} {'steps/sec':>10} {'db size (KB)':>13}")
+        for name, rate, path in [
+            ("SqliteSaver", stock_rate, stock_path),
+            ("BatchedSqliteSaver", batched_rate, batched_path),
+            ("DeltaSqliteSaver", delta_rate, delta_path),
+        ]:
+            size = sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+            print(f"{name:>22} {rate:>10.1f} {size / 1024:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: cold import time of the utils factories, the agent core and the
+lesson agents, measured with `python -X importtime` in fresh interpreters,
+checked against a per-module budget.
+
+Exits with status 1 when a module goes over its budget, so it can guard
+against a heavy dependency creeping back into an eager import.
+
+    python -m agents_in_langgraph.benchmarks.bench_import
+    python -m agents_in_langgraph.benchmarks.bench_import --repeat 7 --scale 1.5
+"""
+import argparse
+import functools
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# milliseconds of import time, roughly 3x what they take today so noise does
+# not trip them; langgraph, openai, tavily and IPython are imported on first use
+BUDGET_MS = {
+    "agents_in_langgraph.utils.clients": 30,
+    "agents_in_langgraph.utils.open_ai": 60,
+    "agents_in_langgraph.utils.tavily_search": 80,
+    "agents_in_langgraph.utils.util": 60,
+    "agents_in_langgraph.core.agent": 500,
+    "L1-Simple-Agent": 100,
+    "L2-LangGraph-Components": 550,
+    "L4-Persistence-and-Streaming": 550,
+    "L5-Human-in-the-Loop": 550,
+}
+
+# modules that must stay out of a plain import
+HEAVY = ("openai", "langchain_openai", "tavily", "langchain_tavily", "IPython", "pygraphviz")
+
+
+def _statement(target: str) -> str:
+    if target.startswith("agents_in_langgraph."):
+        return f"import {target}"
+    # lesson directories are not importable by name
+    path = os.path.join(ROOT, target, "agent.py")
+    return ("import importlib.util; "
+            f"spec = importlib.util.spec_from_file_location('lesson', {path!r}); "
+            "spec.loader.exec_module(importlib.util.module_from_spec(spec))")
+
+
+def _importtime(statement: str) -> list[tuple[int, str]]:
+    """(cumulative us, name) of every import `statement` makes in a fresh interpreter."""
+    run = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, env={**os.environ, "PYTHONWARNINGS": "ignore"})
+    if run.returncode != 0:
+        raise RuntimeError(f"{statement} failed:\n{run.stderr[-2000:]}")
+    entries = []
+    for line in run.stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative_us, name = line.split("|", 2)
+            entries.append((int(cumulative_us), name[1:]))
+    return entries
+
+
+@functools.cache
+def _startup() -> frozenset[str]:
+    # what the interpreter imports on its own (site, encodings, ...)
+    return frozenset(name for _, name in _importtime("pass"))
+
+
+def import_time(target: str) -> tuple[float, set[str]]:
+    """Import time in ms of `target` in a fresh interpreter, and which HEAVY modules it loaded."""
+    entries = _importtime(_statement(target))
+    # top-level entries are not indented; their cumulative times add up to the total
+    total = sum(us for us, name in entries if not name.startswith(" ") and name not in _startup())
+    loaded = {name.strip() for _, name in entries}
+    return total / 1000, {m for m in HEAVY if m in loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module, the median counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget, e.g. on slow CI machines")
+    parser.add_argument("targets", nargs="*", default=list(BUDGET_MS))
+    args = parser.parse_args()
+
+    over = []
+    print(f"{'module':>42} {'median ms':>10} {'budget ms':>10}  heavy imports")
+    for target in args.targets:
+        runs = [import_time(target) for _ in range(args.repeat)]
+        median = statistics.median(ms for ms, _ in runs)
+        heavy = set().union(*(h for _, h in runs))
+        budget = BUDGET_MS.get(target, float("inf")) * args.scale
+        if median > budget or heavy:
+            over.append(target)
+        flag = " OVER" if median > budget else ""
+        print(f"{target:>42} {median:>10.1f} {budget:>10.0f}  {', '.join(sorted(heavy)) or '-'}{flag}")
+
+    if over:
+        print(f"\nover budget or importing heavy modules: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Microbenchmark: the id-indexed `utils.reducers.reduce_messages` against the
+original linear-scan reducer from L5-Human-in-the-Loop.
+
+One graph step is modelled as the reducer receiving one replaced message
+(the human-in-the-loop edit of the last AI message) plus one new message.
+
+    python -m agents_in_langgraph.benchmarks.bench_reduce_messages
+"""
+import argparse
+import timeit
+
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage
+
+from agents_in_langgraph.utils.reducers import reduce_messages
+
+
+def legacy_reduce_messages(left: list[AnyMessage], right: list[AnyMessage]) -> list[AnyMessage]:
+    # verbatim copy of the reducer L5 shipped with, kept here as the baseline
+    for message in right:
+        if not message.id:
+            message.id = str(uuid4())
+    merged = left.copy()
+    for message in right:
+        for i, existing in enumerate(merged):
+            if existing.id == message.id:
+                merged[i] = message
+                break
+        else:
+            merged.append(message)
+    return merged
+
+
+def make_history(n: int) -> list[AnyMessage]:
+    return [
+        HumanMessage(content=f"question {i}", id=str(uuid4())) if i % 2 == 0
+        else AIMessage(content=f"answer {i}", id=str(uuid4()))
+        for i in range(n)
+    ]
+
+
+def make_step(history: list[AnyMessage]) -> list[AnyMessage]:
+    return [
+        AIMessage(content="edited answer", id=history[-1].id),
+        HumanMessage(content="follow up", id=str(uuid4())),
+    ]
+
+
+def bench(reducer, n: int, steps: int) -> float:
+    """Average seconds per step over `steps` chained steps on a history of `n`."""
+    history = make_history(n)
+    updates = [make_step(history) for _ in range(steps)]
+
+    def run():
+        left = history
+        for right in updates:
+            left = reducer(left, right)
+
+    return min(timeit.repeat(run, number=1, repeat=3)) / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+
+    # both reducers must agree before their speed means anything
+    history = make_history(100)
+    step = make_step(history)
+    assert [m.id for m in legacy_reduce_messages(history, step)] == \
+        [m.id for m in reduce_messages(history, step)]
+
+    print(f"{'messages':>10} {'legacy (ms)':>12} {'indexed (ms)':>13} {'speedup':>8}")
+    for n in args.sizes:
+        legacy = bench(legacy_reduce_messages, n, args.steps)
+        indexed = bench(reduce_messages, n, args.steps)
+        print(f"{n:>10} {legacy * 1e3:>12.3f} {indexed * 1e3:>13.3f} {legacy / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
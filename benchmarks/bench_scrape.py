@@ -0,0 +1,61 @@
+"""
+Benchmark: text extraction from saved HTML pages, the original
+BeautifulSoup path of regular_search against the streaming
+utils.scrape.TextExtractor fed in download-sized chunks.
+
+    python -m agents_in_langgraph.benchmarks.bench_scrape [page.html ...]
+"""
+import argparse
+import glob
+import os
+import re
+import timeit
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from agents_in_langgraph.utils.scrape import extract_chunks
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def soup_extract(raw: bytes) -> str:
+    # what scrape_weather_info + extract_text did per page, debug print included
+    soup = BeautifulSoup(raw.decode("utf-8", errors="replace"), 'html.parser')
+    str(soup.body)[:50000]
+    weather_data = [tag.get_text(" ", strip=True) for tag in soup.find_all(['h1', 'h2', 'h3', 'p'])]
+    return re.sub(r'\s+', ' ', "\n".join(weather_data))
+
+
+def streaming_extract(raw: bytes, chunk_size: int = 16 << 10) -> str:
+    return extract_chunks(raw[i:i + chunk_size] for i in range(0, len(raw), chunk_size))
+
+
+def peak_kb(fn, raw: bytes) -> float:
+    tracemalloc.start()
+    fn(raw)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pages", nargs="*", default=sorted(glob.glob(os.path.join(FIXTURES, "*.html"))))
+    parser.add_argument("--number", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'page':>24} {'KB':>7} {'soup (ms)':>10} {'stream (ms)':>12} {'soup peak KB':>13} {'stream peak KB':>15}")
+    for page in args.pages:
+        with open(page, "rb") as f:
+            raw = f.read()
+        # same words out of both paths, modulo spacing between tags
+        assert soup_extract(raw).split() == streaming_extract(raw).split()
+        soup = min(timeit.repeat(lambda: soup_extract(raw), number=args.number, repeat=3)) / args.number
+        stream = min(timeit.repeat(lambda: streaming_extract(raw), number=args.number, repeat=3)) / args.number
+        print(f"{os.path.basename(page):>24} {len(raw) / 1024:>7.0f} {soup * 1e3:>10.2f} {stream * 1e3:>12.2f} "
+              f"{peak_kb(soup_extract, raw):>13.0f} {peak_kb(streaming_extract, raw):>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: time to first token against the local Ollama server, with a
+byte-stable prompt prefix and with one that changes on every request.
+
+Each round sends a growing research conversation (system prompt, tool
+schemas, history) turn after turn. In "stable" mode the prompt only grows at
+the end, so the server can reuse its KV cache for everything sent before; in
+"unstable" mode a nonce leads the system prompt, so every request prefills
+from scratch. The gap between the two is what prefix reuse saves. Needs the
+model of config.open_ai served by Ollama.
+
+    python -m agents_in_langgraph.benchmarks.bench_ttft
+    python -m agents_in_langgraph.benchmarks.bench_ttft --model qwen2.5-it:3b --turns 6 --rounds 3
+"""
+import argparse
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from agents_in_langgraph.benchmarks.fakes import fake_search_tool
+from agents_in_langgraph.config import open_ai as open_ai_config
+from agents_in_langgraph.config import service as service_config
+from agents_in_langgraph.core.agent import bind_tools
+from agents_in_langgraph.utils.batch import percentile
+from agents_in_langgraph.utils.open_ai import new_chat_open_ai, warm_up
+from agents_in_langgraph.utils.prompt import PrefixTracker, tool_schemas
+
+CITIES = ["SF", "LA", "NYC", "Seattle", "Boston", "Austin", "Denver", "Chicago"]
+
+
+def ttft(model, messages: list) -> float:
+    """Seconds until the first streamed chunk; the rest of the answer is drained."""
+    start = time.perf_counter()
+    first = None
+    for _ in model.stream(messages, max_tokens=16):
+        if first is None:
+            first = time.perf_counter() - start
+    if first is None:
+        raise RuntimeError("the model streamed no chunk, there is no first token to time")
+    return first
+
+
+def run(model, system: str, turns: int, stable: bool, tracker: PrefixTracker, schemas: str):
+    """TTFT of each turn of one conversation, and (prefix characters reused, total characters)."""
+    history, times, reused, total = [], [], 0, 0
+    for turn in range(turns):
+        # the nonce changes the very first bytes of the prompt
+        prompt = system if stable else f"[request {time.time_ns()}]\n{system}"
+        history.append(HumanMessage(content=f"What is the weather in {CITIES[turn % len(CITIES)]}?"))
+        messages = [SystemMessage(content=prompt)] + history
+        r, t = tracker.observe(messages, schemas)
+        reused, total = reused + r, total + t
+        times.append(ttft(model, messages))
+        # a fixed answer, so both modes grow the history the same way
+        history.append(AIMessage(content=f"It is sunny in {CITIES[turn % len(CITIES)]}."))
+    return times, reused, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=service_config.MODEL_NAME)
+    parser.add_argument("--turns", type=int, default=6, help="requests per conversation")
+    parser.add_argument("--rounds", type=int, default=3, help="conversations per mode")
+    parser.add_argument("--keep-alive", default=open_ai_config.KEEP_ALIVE)
+    args = parser.parse_args()
+
+    model = bind_tools(new_chat_open_ai(model=args.model, keep_alive=args.keep_alive), [fake_search_tool()])
+    # time spent loading the model must not count as prefill
+    if warm_up(args.model, keep_alive=args.keep_alive) is None:
+        raise SystemExit("the Ollama server is not reachable")
+    schemas = tool_schemas(model)
+
+    print(f"{'mode':>8} {'ttft p50 ms':>12} {'ttft p99 ms':>12} {'first turn ms':>14} {'prefix reused':>14}")
+    for stable in (True, False):
+        tracker = PrefixTracker()
+        times, firsts, reused, total = [], [], 0, 0
+        for _ in range(args.rounds):
+            round_times, r, t = run(model, service_config.SYSTEM_PROMPT, args.turns, stable, tracker, schemas)
+            # the first turn of a conversation has no earlier prompt to reuse
+            firsts.append(round_times[0])
+            times += round_times[1:]
+            reused, total = reused + r, total + t
+        name = "stable" if stable else "unstable"
+        print(f"{name:>8} {percentile(times, 50) * 1000:>12.0f} {percentile(times, 99) * 1000:>12.0f} "
+              f"{percentile(firsts, 50) * 1000:>14.0f} {reused / max(total, 1):>14.0%}")
+
+
+if __name__ == "__main__":
+    main()
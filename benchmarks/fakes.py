@@ -0,0 +1,182 @@
+"""
+Deterministic local stand-ins for the services the lessons talk to, so the
+agents can be benchmarked without Ollama or a Tavily key:
+
+- FakeChatModel: a tool-calling chat model with configurable latency and
+  tool-call pattern, usable wherever ChatOpenAI is (L2, L4, L5).
+- FakeOpenAIClient: the `client.chat.completions.create` surface the L1
+  ReAct agent uses, answering in the Thought/Action/Answer format.
+- fake_search_tool / FakeSearchClient: Tavily- and DDG-shaped search.
+"""
+import time
+import zlib
+
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import StructuredTool
+
+WORDS = "the weather in san francisco is sunny with a light breeze and mild temperatures".split()
+
+
+def _words(n: int) -> list[str]:
+    return [WORDS[i % len(WORDS)] for i in range(n)]
+
+
+def _turn(messages: list) -> int:
+    # model turns already taken since the last user message
+    turn = 0
+    for m in reversed(messages):
+        if isinstance(m, HumanMessage):
+            break
+        turn += isinstance(m, AIMessage)
+    return turn
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Calls `tool_calls_per_turn` tools on each of its first `tool_turns`
+    turns, then answers with `answer_tokens` words. `latency` is spent
+    before the first token and `token_latency` per token, also when
+    streaming. Every output is a function of the conversation so far.
+    """
+    tool_turns: int = 1
+    tool_calls_per_turn: int = 2
+    answer_tokens: int = 32
+    latency: float = 0.0
+    token_latency: float = 0.0
+    tool_name: str = "tavily_search"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        names = [getattr(t, "name", None) for t in tools]
+        return self.model_copy(update={"tool_name": names[0]}) if names and names[0] else self
+
+    def _plan(self, messages: list) -> tuple[list[str], list[dict]]:
+        turn = _turn(messages)
+        if turn < self.tool_turns:
+            calls = [{
+                "name": self.tool_name,
+                "args": {"query": f"query {turn}.{i} for message {len(messages)}"},
+                "id": f"call_{len(messages)}_{turn}_{i}",
+            } for i in range(self.tool_calls_per_turn)]
+            return [], calls
+        return _words(self.answer_tokens), []
+
+    def _usage(self, messages: list, words: list[str], calls: list[dict]) -> dict:
+        prompt = sum(len(str(m.content).split()) for m in messages)
+        completion = len(words) + 8 * len(calls)
+        return {"input_tokens": prompt, "output_tokens": completion, "total_tokens": prompt + completion}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        words, calls = self._plan(messages)
+        time.sleep(self.latency + self.token_latency * (len(words) + 8 * len(calls)))
+        message = AIMessage(
+            content=" ".join(words), tool_calls=calls,
+            usage_metadata=self._usage(messages, words, calls),
+            response_metadata={"model_name": "fake"})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        words, calls = self._plan(messages)
+        time.sleep(self.latency)
+        for i, word in enumerate(words):
+            time.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+        for index, t in enumerate(calls):
+            # name first, then the arguments in pieces, like the OpenAI API
+            args = f'{{"query": "{t["args"]["query"]}"}}'
+            pieces = [args[:len(args) // 2], args[len(args) // 2:]]
+            time.sleep(self.token_latency * 4)
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"index": index, "id": t["id"], "name": t["name"], "args": pieces[0]}]))
+            time.sleep(self.token_latency * 4)
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"index": index, "id": None, "name": None, "args": pieces[1]}]))
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="", usage_metadata=self._usage(messages, words, calls),
+            response_metadata={"model_name": "fake"}))
+
+
+def _results(query: str, max_results: int) -> list[dict]:
+    return [{
+        "url": f"https://example.com/{zlib.crc32(query.encode()) % 1000}/{i}",
+        "title": f"result {i} for {query}",
+        "content": " ".join(_words(40)),
+    } for i in range(max_results)]
+
+
+def fake_search_tool(latency: float = 0.0, max_results: int = 4, name: str = "tavily_search") -> StructuredTool:
+    """A search tool returning Tavily-shaped results after `latency` seconds."""
+    def search(query: str) -> dict:
+        time.sleep(latency)
+        return {"query": query, "results": _results(query, max_results)}
+
+    return StructuredTool.from_function(
+        func=search, name=name,
+        description="A search engine. Useful for when you need to answer questions about current events. "
+                    "Input should be a search query.")
+
+
+class FakeSearchClient:
+    """Answers like a TavilyClient (`search`) and like DDGS (`text`)."""
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def search(self, query: str, max_results: int = 5, **kwargs) -> dict:
+        self.calls += 1
+        time.sleep(self.latency)
+        return {"query": query, "results": _results(query, max_results)}
+
+    def text(self, query: str, max_results: int = 5, **kwargs) -> list[dict]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return [{"href": r["url"], "title": r["title"], "body": r["content"]} for r in _results(query, max_results)]
+
+
+class FakeOpenAIClient:
+    """
+    The `chat.completions.create` surface of openai.OpenAI for the L1 agent:
+    one `Action:` per observation-free turn, then an `Answer:`.
+    """
+    def __init__(self, action: str = "average_dog_weight: Border Collie", latency: float = 0.0, token_latency: float = 0.0):
+        self.action = action
+        self.latency = latency
+        self.token_latency = token_latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _reply(self, messages: list[dict]) -> str:
+        if messages[-1]["content"].startswith("Observation"):
+            return "Thought: I have what I need\nAnswer: " + " ".join(_words(16))
+        return f"Thought: I should look this up\nAction: {self.action}\nPAUSE"
+
+    def create(self, model: str = "", messages: list[dict] = (), stream: bool = False, **kwargs) -> Any:
+        text = self._reply(list(messages))
+        tokens = text.split(" ")
+        if not stream:
+            time.sleep(self.latency + self.token_latency * len(tokens))
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+        return self._stream(tokens)
+
+    def _stream(self, tokens: list[str]):
+        time.sleep(self.latency)
+        for i, token in enumerate(tokens):
+            time.sleep(self.token_latency)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token if i == 0 else " " + token))])
+
+
+def fake_agent(checkpointer, latency: float = 0.0, token_latency: float = 0.0, tool_latency: float = 0.0,
+               tool_turns: int = 1, tool_calls: int = 2):
+    """A core Agent on FakeChatModel and fake_search_tool, an agent factory for core.service."""
+    from agents_in_langgraph.core.agent import Agent
+    model = FakeChatModel(latency=latency, token_latency=token_latency,
+                          tool_turns=tool_turns, tool_calls_per_turn=tool_calls)
+    return Agent(model, [fake_search_tool(latency=tool_latency)], checkpointer=checkpointer,
+                 system="You are a smart research assistant.")
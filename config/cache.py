@@ -0,0 +1,4 @@
+import os
+
+# where the on-disk caches (model responses, search results) live
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "agents_in_langgraph")
@@ -0,0 +1,8 @@
+# connection pool sizes for the shared HTTP clients in utils.clients
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 30.0  # seconds an idle keep-alive connection is kept
+
+# requests.Session pool used for scraping web pages
+SCRAPE_POOL_CONNECTIONS = 10  # number of hosts kept in the pool
+SCRAPE_POOL_MAXSIZE = 20      # connections kept per host
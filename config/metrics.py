@@ -0,0 +1,5 @@
+# histogram bucket bounds in seconds, from fast checkpoint writes to slow model calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# service.name resource attribute of the OTLP export
+SERVICE_NAME = "agents-in-langgraph"
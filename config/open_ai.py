@@ -14,4 +14,8 @@
 # https://github.com/jmorganca/ollama/blob
 
 BASE_URL="http://127.0.0.1:11434/v1"
-API_KEY="ollama"
\ No newline at end of file
+API_KEY="ollama"
+
+# how long Ollama keeps a model (and its prompt cache) loaded after a request,
+# as an Ollama duration ("30m", "24h"); "-1" keeps it until the server stops
+KEEP_ALIVE = "30m"
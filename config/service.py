@@ -0,0 +1,30 @@
+import os
+
+from agents_in_langgraph.config.cache import CACHE_DIR
+
+# where the job queue and the per-shard checkpoint files of the worker service live
+SERVICE_DIR = os.path.join(CACHE_DIR, "service")
+
+# threads are hashed onto this many shards, fixed when the queue is created;
+# each shard (and its checkpoint file) belongs to exactly one worker
+NUM_SHARDS = 16
+
+WORKERS = min(4, os.cpu_count() or 1)
+# graph runs in flight per worker process
+WORKER_CONCURRENCY = 8
+
+# seconds between queue polls of an idle worker, and between stats updates
+POLL_INTERVAL = 0.1
+HEARTBEAT_INTERVAL = 1.0
+# seconds a stopping pool waits for workers to finish their jobs
+DRAIN_TIMEOUT = 60.0
+
+# attempts per job before it is marked failed
+MAX_ATTEMPTS = 3
+
+MODEL_NAME = "qwen2.5-it:3b"
+SYSTEM_PROMPT = """You are a smart research assistant. Use the search engine to look up information. \
+You are allowed to make multiple calls (either together or in sequence). \
+Only look up information when you are sure of what you want. \
+If you need to look up some information before asking a follow up question, you are allowed to do that!
+"""
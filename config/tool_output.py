@@ -0,0 +1,19 @@
+# characters of a tool output kept in its ToolMessage, per tool; anything
+# else gets DEFAULT_MAX_CHARS
+DEFAULT_MAX_CHARS = 4000
+TOOL_MAX_CHARS = {
+    "tavily_search": 2000,
+    "tavily_search_results_json": 2000,
+    "federated_search": 2000,
+}
+
+# search results kept by the extractor, and characters of each snippet
+SEARCH_TOP_K = 3
+SNIPPET_CHARS = 400
+
+# outputs at least this long go to the blob store, the message keeps a reference
+BLOB_MIN_CHARS = 2000
+
+# blobs at least this many bytes are zlib-compressed on disk
+COMPRESS_MIN_BYTES = 512
+COMPRESS_LEVEL = 6
@@ -0,0 +1,299 @@
+import inspect
+import operator
+import threading
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TypedDict, Annotated
+
+from langchain_core.messages import AnyMessage, SystemMessage
+
+from agents_in_langgraph.utils.context import apply_policy
+from agents_in_langgraph.utils.metrics import MetricsCallbackHandler, instrument_checkpointer
+from agents_in_langgraph.utils.prompt import PrefixTracker, tool_schemas
+from agents_in_langgraph.utils.reducers import reduce_messages
+from agents_in_langgraph.utils.streaming import (
+    AsyncToolDispatcher, ToolDispatcher, astream_model, stream_model)
+from agents_in_langgraph.utils.tool_executor import run_tool_calls, arun_tool_calls, report_timings
+
+class AgentState(TypedDict):
+    messages: Annotated[list[AnyMessage], operator.add]
+
+
+class ReducedAgentState(TypedDict):
+    # messages with an id already in the state replace it instead of being appended
+    messages: Annotated[list[AnyMessage], reduce_messages]
+
+
+def exists_action(state: dict) -> bool:
+    result = state['messages'][-1]
+    return len(result.tool_calls) > 0
+
+
+def _unbound(state: dict):
+    raise RuntimeError("the shared graph has no agent, run Agent.graph instead")
+
+
+@lru_cache(maxsize=None)
+def compiled_graph(state_schema: type, interrupt_before: tuple[str, ...] = ()):
+    """
+    The llm/action loop, compiled once per state schema and interrupt points.
+    Its nodes are placeholders: `bind_graph` swaps in an agent's methods.
+    """
+    # langgraph is most of the import time of an agent module, so it is
+    # imported when the first graph is built rather than with the module
+    from langgraph.graph import StateGraph, END
+    graph = StateGraph(state_schema)
+    graph.add_node("llm", _unbound)
+    graph.add_node("action", _unbound)
+    graph.add_conditional_edges(
+        "llm", # where the conditional edge starts
+        exists_action, # function where to go after LLM returns
+        {True: "action", False: END}, # dict of possible destinations nodes
+    )
+    graph.add_edge("action", "llm") # add an edge from action to llm
+    graph.set_entry_point("llm") # set the entry point to llm
+    return graph.compile(interrupt_before=list(interrupt_before))
+
+
+def _node_runnable(func, name: str):
+    # what StateGraph.add_node builds, minus the signature inspection: the
+    # nodes take the state only, never config/writer/store
+    from langgraph.utils.runnable import RunnableCallable
+    if inspect.iscoroutinefunction(func):
+        return RunnableCallable(None, func, name=name, trace=False, func_accepts_config=False)
+    return RunnableCallable(func, name=name, trace=False, func_accepts_config=False)
+
+
+def bind_graph(graph, nodes: dict, checkpointer=None, config: dict | None = None):
+    """
+    A shallow copy of a compiled graph running `nodes` (name -> callable)
+    instead of its own, with its own checkpointer and default config.
+    Channels, edges and writers are shared with `graph`, nothing is recompiled.
+    """
+    from langchain_core.runnables.config import merge_configs
+    bound = {
+        name: node.copy({"bound": _node_runnable(nodes[name], name)}) if name in nodes else node
+        for name, node in graph.nodes.items()
+    }
+    return graph.copy(update={
+        "nodes": bound,
+        "checkpointer": checkpointer,
+        "config": merge_configs(graph.config, config) if config else graph.config,
+        "auto_validate": False,
+    })
+
+
+_bound = OrderedDict()
+_bound_lock = threading.Lock()
+BOUND_CACHE_SIZE = 128
+
+
+def bind_tools(model, tools: list):
+    """
+    `model.bind_tools(tools)`, memoized per (model, tools) instances.
+
+    The cache holds the model and tools themselves, so their ids cannot be
+    reused by other objects while an entry is alive. Tools are bound in name
+    order, so the schemas at the start of every prompt are byte-identical
+    whatever order an agent lists them in.
+    """
+    tools = sorted(tools, key=lambda t: t.name)
+    key = (id(model), tuple(id(t) for t in tools))
+    with _bound_lock:
+        entry = _bound.get(key)
+        if entry is not None:
+            _bound.move_to_end(key)
+            return entry[2]
+    bound = model.bind_tools(tools)
+    with _bound_lock:
+        _bound[key] = (model, list(tools), bound)
+        if len(_bound) > BOUND_CACHE_SIZE:
+            _bound.popitem(last=False)
+    return bound
+
+
+class Agent():
+    """
+    Tool-calling agent on a shared, pre-compiled LangGraph loop.
+
+    Subclasses pick the graph with `state_schema` and `interrupt_before`;
+    building an Agent only binds the tools (memoized) and copies the
+    compiled graph with this agent's nodes and checkpointer. A streaming
+    agent owns the threads of its tool dispatcher: `close` it, or use it as
+    a context manager.
+    """
+    state_schema = AgentState
+    interrupt_before: tuple[str, ...] = ()
+
+    def __init__(self, model, tools, checkpointer=None, system:str="", max_workers: int=4, tool_timeout: float | None=None, context_policy=None, streaming: bool=False, on_token=None, metrics=None, output_policy=None):
+        self.system = system
+        # one message object, so the prompt prefix is the same every call
+        self.system_message = SystemMessage(content=system) if system else None
+        # concurrency cap and per-call timeout for tool calls of one turn
+        self.max_workers = max_workers
+        self.tool_timeout = tool_timeout
+        # optional callable trimming the history sent to the model, see utils.context
+        self.context_policy = context_policy
+        # stream the model: tokens go to `on_token` and each tool call starts
+        # as soon as its arguments are complete, see utils.streaming
+        self.streaming = streaming or on_token is not None
+        self.on_token = on_token
+        # optional utils.tool_output.ToolOutputPolicy: caps tool outputs and
+        # keeps the full text out of the messages and checkpoints
+        self.output_policy = output_policy
+        self.tools = {t.name: t for t in tools}
+        self.model = bind_tools(model, tools) # bind the tools to the model
+        # tools never start early when a human approves them first
+        self.dispatcher = self.new_dispatcher() if self.streaming and "action" not in self.interrupt_before else None
+
+        config = None
+        # how much of each prompt repeats an earlier prefix, see utils.prompt
+        self.prefix_tracker = PrefixTracker(metrics) if metrics is not None else None
+        self._tool_schemas = tool_schemas(self.model) if metrics is not None else ""
+        if metrics is not None:
+            # node, tool, token and checkpoint write metrics, see utils.metrics
+            config = {"callbacks": [MetricsCallbackHandler(metrics)]}
+            if checkpointer is not None:
+                instrument_checkpointer(checkpointer, metrics)
+        # the graph is compiled once per schema and interrupt points, each
+        # agent gets a copy running its own nodes and checkpointer
+        self.graph = bind_graph(
+            compiled_graph(self.state_schema, tuple(self.interrupt_before)),
+            {"llm": self.call_openai, "action": self.take_action},
+            checkpointer=checkpointer, config=config)
+
+    def close(self) -> None:
+        """Stop the tool dispatcher of a streaming agent; calls still running are not waited for."""
+        if self.dispatcher is not None:
+            self.dispatcher.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def new_dispatcher(self):
+        return ToolDispatcher(self.tools, max_workers=self.max_workers, output_policy=self.output_policy)
+
+    def exists_action(self, state: AgentState):
+        return exists_action(state)
+
+    def prompt_messages(self, state: AgentState):
+        messages = state['messages']
+        if self.context_policy:
+            messages = self.context_policy(messages)
+        return self._with_system(messages)
+
+    def _with_system(self, messages: list[AnyMessage]):
+        if self.system_message is not None:
+            messages = [self.system_message] + messages
+        if self.prefix_tracker is not None:
+            self.prefix_tracker.observe(messages, self._tool_schemas)
+        return messages
+
+    def early_tool_calls(self):
+        """An `on_tool_call` for the dispatcher, and the list of ids it submitted."""
+        if self.dispatcher is None:
+            return None, []
+        submitted = []
+
+        def on_tool_call(t: dict) -> None:
+            submitted.append(t['id'])
+            self.dispatcher.submit(t)
+        return on_tool_call, submitted
+
+    def discard_uncollected(self, submitted: list, message) -> None:
+        # early calls the action node will never collect: the stream failed
+        # (message is None) or the final message does not carry them
+        kept = {t['id'] for t in message.tool_calls} if message is not None else set()
+        if submitted:
+            self.dispatcher.discard([i for i in submitted if i not in kept])
+
+    def call_openai(self, state: AgentState):
+        if self.streaming:
+            on_tool_call, submitted = self.early_tool_calls()
+            message = None
+            try:
+                message = stream_model(
+                    self.model, self.prompt_messages(state),
+                    on_token=self.on_token, on_tool_call=on_tool_call)
+            finally:
+                self.discard_uncollected(submitted, message)
+        else:
+            message = self.model.invoke(self.prompt_messages(state))
+        return {'messages': [message]}
+
+    def pending_tool_calls(self, state: AgentState):
+        # bad tool names are answered with an error message, see report_timings
+        return state['messages'][-1].tool_calls
+
+    def take_action(self, state: AgentState):
+        tool_calls = self.pending_tool_calls(state)
+        # run the calls concurrently, the LLM is told to retry on bad tool names
+        if self.dispatcher is not None:
+            results = self.dispatcher.collect(tool_calls, timeout=self.tool_timeout)
+        else:
+            results = run_tool_calls(
+                self.tools, tool_calls,
+                max_workers=self.max_workers, timeout=self.tool_timeout,
+                output_policy=self.output_policy)
+        report_timings(results)
+        print("Back to the model!")
+        return {'messages': results}
+
+    def stream(self, input, config):
+        for event in self.graph.stream(input, config):
+            for v in event.values():
+                print(v['messages'])
+
+
+class AsyncAgent(Agent):
+    """
+    Same graph as Agent, but `llm` and `action` are coroutine nodes built on
+    `ainvoke`, so the graph must be driven with ainvoke/astream and an async
+    checkpointer such as AsyncSqliteSaver. Waiting on the model or on tools
+    never blocks the event loop, so one process can serve many threads.
+    """
+    def new_dispatcher(self):
+        return AsyncToolDispatcher(self.tools, max_concurrency=self.max_workers, output_policy=self.output_policy)
+
+    async def aprompt_messages(self, state: AgentState):
+        messages = state['messages']
+        if self.context_policy:
+            # a summarizing policy calls the model too, with ainvoke here
+            messages = await apply_policy(self.context_policy, messages)
+        return self._with_system(messages)
+
+    async def call_openai(self, state: AgentState):
+        if self.streaming:
+            on_tool_call, submitted = self.early_tool_calls()
+            message = None
+            try:
+                message = await astream_model(
+                    self.model, await self.aprompt_messages(state),
+                    on_token=self.on_token, on_tool_call=on_tool_call)
+            finally:
+                self.discard_uncollected(submitted, message)
+        else:
+            message = await self.model.ainvoke(await self.aprompt_messages(state))
+        return {'messages': [message]}
+
+    async def take_action(self, state: AgentState):
+        tool_calls = self.pending_tool_calls(state)
+        if self.dispatcher is not None:
+            results = await self.dispatcher.collect(tool_calls, timeout=self.tool_timeout)
+        else:
+            results = await arun_tool_calls(
+                self.tools, tool_calls,
+                max_concurrency=self.max_workers, timeout=self.tool_timeout,
+                output_policy=self.output_policy)
+        report_timings(results)
+        print("Back to the model!")
+        return {'messages': results}
+
+    async def astream(self, input, config):
+        async for event in self.graph.astream(input, config):
+            for v in event.values():
+                print(v['messages'])
@@ -0,0 +1,292 @@
+"""
+Long-lived agent service: a pool of worker processes serving jobs from a
+local JobQueue (utils.job_queue).
+
+Each worker owns a fixed set of shards, keeps one BatchedSqliteSaver file
+and one Agent per shard for its whole life, and reuses the process-wide
+clients of utils.clients, so nothing is rebuilt per job and no checkpoint
+file is ever written by two processes. See main.py for the CLI.
+"""
+import contextlib
+import importlib
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from agents_in_langgraph.config import service as service_config
+from agents_in_langgraph.utils.batch import percentile
+from agents_in_langgraph.utils.job_queue import JobQueue
+
+DEFAULT_FACTORY = "agents_in_langgraph.core.service:default_agent"
+
+
+def default_agent(checkpointer, model: str = service_config.MODEL_NAME, max_results: int = 2):
+    """The L4 research agent: Ollama chat model and Tavily search, loaded and prefilled on creation."""
+    from agents_in_langgraph.core.agent import Agent
+    from agents_in_langgraph.utils.clients import get_or_create
+    from agents_in_langgraph.utils.open_ai import new_chat_open_ai, warm_up
+    from agents_in_langgraph.utils.tavily_search import new_tavily_search
+    tool = new_tavily_search(max_results=max_results)
+    agent = Agent(new_chat_open_ai(model=model), [tool], checkpointer=checkpointer, system=service_config.SYSTEM_PROMPT)
+    # every prompt starts with the system prompt and the tool schemas; once per
+    # process, but a failed warm up (None, e.g. Ollama not up yet) is retried
+    get_or_create(("warm_up", model), lambda: warm_up(model, prefix=(agent.model, [agent.system_message])))
+    return agent
+
+
+def load_factory(spec: str):
+    """`package.module:function` -> the function; it builds an agent from a checkpointer."""
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def shards_of(worker: int, workers: int, num_shards: int) -> list[int]:
+    return [s for s in range(num_shards) if s % workers == worker]
+
+
+class Worker:
+    """One worker process: claims jobs of its shards and runs them on a thread pool."""
+    def __init__(
+            self,
+            index: int,
+            workers: int,
+            queue_path: str,
+            checkpoint_dir: str,
+            factory: str = DEFAULT_FACTORY,
+            factory_kwargs: dict | None = None,
+            concurrency: int = service_config.WORKER_CONCURRENCY,
+            stop=None,
+            ):
+        self.index = index
+        self.workers = workers
+        self.queue_path = queue_path
+        self.checkpoint_dir = checkpoint_dir
+        self.factory = factory
+        self.factory_kwargs = factory_kwargs or {}
+        self.concurrency = concurrency
+        self.stop = stop or threading.Event()
+        self._lock = threading.Lock()
+        self.done = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+
+    def _run(self, queue: JobQueue, agents: dict, job) -> None:
+        from langchain_core.messages import convert_to_messages
+        start = time.perf_counter()
+        try:
+            graph = agents[job.shard].graph
+            config = {"configurable": {"thread_id": job.thread_id}}
+            state = graph.get_state(config)
+            head = (state.config or {}).get("configurable", {}).get("checkpoint_id")
+            graph_input = {**job.input, "messages": convert_to_messages(job.input.get("messages", []))}
+            if job.attempts == 1:
+                queue.set_checkpoint(job.id, head)
+            elif head != job.checkpoint_id:
+                # an earlier attempt already wrote the input to the thread: resume it, don't append it again
+                graph_input = None
+            if graph_input is None and not state.next:
+                output = state.values   # that attempt finished but could not report it
+            else:
+                output = graph.invoke(graph_input, config)
+            queue.complete(job.id, str(output["messages"][-1].content))
+            outcome = "done"
+        except Exception as e:
+            # requeued until MAX_ATTEMPTS, then failed
+            outcome = "retry" if queue.fail(job.id, f"{type(e).__name__}: {e}") else "failed"
+        with self._lock:
+            self.busy_seconds += time.perf_counter() - start
+            if outcome == "done":
+                self.done += 1
+            elif outcome == "failed":
+                self.failed += 1
+
+    def _heartbeat(self, queue: JobQueue, state: str) -> None:
+        with self._lock:
+            done, failed, busy = self.done, self.failed, self.busy_seconds
+        queue.heartbeat(self.index, state=state, done=done, failed=failed, busy_seconds=busy)
+
+    def run(self) -> None:
+        from agents_in_langgraph.utils.checkpoint import BatchedSqliteSaver
+
+        queue = JobQueue(self.queue_path)
+        shards = shards_of(self.index, self.workers, queue.num_shards)
+        # whatever a crashed predecessor left running on these shards
+        queue.requeue_running(shards)
+        queue.heartbeat(self.index, pid=os.getpid(), shards=shards, state="starting", started_at=time.time(),
+                        done=0, failed=0, busy_seconds=0.0)
+        factory = load_factory(self.factory)
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        with contextlib.ExitStack() as stack:
+            # one checkpoint file per shard, only ever opened by its owner
+            agents = {
+                shard: factory(stack.enter_context(BatchedSqliteSaver.from_conn_string(
+                    os.path.join(self.checkpoint_dir, f"checkpoints-{shard:03d}.sqlite"))), **self.factory_kwargs)
+                for shard in shards
+            }
+            inflight = set()
+            # set when a job finishes, so its slot is refilled without waiting for the next poll
+            freed = threading.Event()
+
+            def _finished(future):
+                inflight.discard(future)
+                freed.set()
+
+            executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"worker{self.index}")
+            last_beat = 0.0
+            while not self.stop.is_set():
+                if time.monotonic() - last_beat >= service_config.HEARTBEAT_INTERVAL:
+                    self._heartbeat(queue, "running")
+                    last_beat = time.monotonic()
+                freed.clear()
+                jobs = queue.claim(shards, self.index, self.concurrency - len(inflight))
+                for job in jobs:
+                    future = executor.submit(self._run, queue, agents, job)
+                    inflight.add(future)
+                    future.add_done_callback(_finished)
+                if not jobs:
+                    freed.wait(service_config.POLL_INTERVAL)
+            # graceful drain: no new claims, finish what is running, flush checkpoints
+            self._heartbeat(queue, "draining")
+            executor.shutdown(wait=True)
+        self._heartbeat(queue, "stopped")
+        queue.close()
+
+
+def worker_main(index: int, workers: int, queue_path: str, checkpoint_dir: str, factory: str,
+                factory_kwargs: dict, concurrency: int, stop, quiet: bool = True) -> None:
+    # Ctrl-C reaches the whole process group; only the pool decides when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    if quiet:
+        # the agents print every tool call
+        sys.stdout = open(os.devnull, "w")
+    Worker(index, workers, queue_path, checkpoint_dir, factory, factory_kwargs, concurrency, stop).run()
+
+
+class WorkerPool:
+    """
+    `workers` processes over one queue file. `start` returns at once;
+    `serve` blocks until SIGINT/SIGTERM or `JobQueue.request_drain`, then
+    drains: workers finish their running jobs and exit. A worker that dies
+    while the pool is up is restarted on the same shards.
+    """
+    def __init__(
+            self,
+            workers: int = service_config.WORKERS,
+            queue_path: str | None = None,
+            checkpoint_dir: str | None = None,
+            factory: str = DEFAULT_FACTORY,
+            factory_kwargs: dict | None = None,
+            concurrency: int = service_config.WORKER_CONCURRENCY,
+            quiet: bool = True,
+            ):
+        self.workers = workers
+        self.queue = JobQueue(queue_path)
+        self.checkpoint_dir = checkpoint_dir or os.path.join(service_config.SERVICE_DIR, "checkpoints")
+        self.factory = factory
+        self.factory_kwargs = factory_kwargs or {}
+        self.concurrency = concurrency
+        self.quiet = quiet
+        # spawn, not fork: the parent may already hold sqlite connections and threads
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._processes = {}
+
+    def _spawn(self, index: int) -> None:
+        process = self._ctx.Process(
+            target=worker_main, name=f"agent-worker-{index}",
+            args=(index, self.workers, self.queue.path, self.checkpoint_dir, self.factory,
+                  self.factory_kwargs, self.concurrency, self._stop, self.quiet))
+        process.start()
+        self._processes[index] = process
+
+    def start(self) -> None:
+        self.queue.request_drain(False)
+        self.queue.clear_workers()
+        for index in range(self.workers):
+            self._spawn(index)
+
+    def check(self) -> None:
+        """Restart workers that died, unless the pool is stopping."""
+        if self._stop.is_set():
+            return
+        for index, process in list(self._processes.items()):
+            if not process.is_alive():
+                print(f"worker {index} exited with {process.exitcode}, restarting", file=sys.stderr)
+                self._spawn(index)
+
+    def stop(self, timeout: float = service_config.DRAIN_TIMEOUT) -> None:
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for process in self._processes.values():
+            process.join(max(deadline - time.monotonic(), 0.0))
+        for index, process in self._processes.items():
+            if process.is_alive():
+                print(f"worker {index} did not drain in {timeout}s, terminating", file=sys.stderr)
+                process.kill()
+                process.join()
+
+    def serve(self, drain_timeout: float = service_config.DRAIN_TIMEOUT) -> None:
+        stopping = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stopping.set())
+        self.start()
+        while not stopping.wait(service_config.HEARTBEAT_INTERVAL):
+            if self.queue.drain_requested():
+                break
+            self.check()
+        print("draining workers", file=sys.stderr)
+        self.stop(drain_timeout)
+
+
+def generate_load(
+        queue: JobQueue,
+        jobs: int,
+        threads: int,
+        rate: float | None = None,
+        question: str = "What is the weather in {city}?",
+        cities: tuple[str, ...] = ("SF", "LA", "NYC", "Seattle", "Boston", "Austin"),
+        timeout: float | None = None,
+        ) -> dict:
+    """
+    Submit `jobs` questions spread over `threads` thread ids, at `rate` jobs
+    per second (all at once when None), wait for them and summarize
+    throughput and latency from submission to completion.
+    """
+    run = f"load-{time.time_ns()}-"
+    items = [(f"{run}{i % threads}", question.format(city=cities[i % len(cities)])) for i in range(jobs)]
+    start = time.time()
+    if rate is None:
+        queue.submit_many(items)
+    else:
+        for i, item in enumerate(items):
+            time.sleep(max(start + i / rate - time.time(), 0.0))
+            queue.submit(*item)
+    while True:
+        # only this run's jobs: the queue may hold other runs' or real traffic
+        depth = queue.depth(thread_prefix=run)
+        if depth["queued"] == 0 and depth["running"] == 0:
+            break
+        if timeout is not None and time.time() - start > timeout:
+            raise TimeoutError(f"load did not finish in {timeout}s: {depth}")
+        time.sleep(service_config.POLL_INTERVAL)
+    elapsed = time.time() - start
+    finished = queue.latencies(since=start, thread_prefix=run)
+    waits = [w for w, _ in finished]
+    totals = [t for _, t in finished]
+    return {
+        "jobs": jobs,
+        "threads": threads,
+        "done": len(finished),
+        "failed": depth["failed"],
+        "seconds": elapsed,
+        "jobs_per_sec": len(finished) / elapsed,
+        "wait_p50": percentile(waits, 50),
+        "p50": percentile(totals, 50),
+        "p99": percentile(totals, 99),
+    }
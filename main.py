@@ -1,6 +1,126 @@
-def main():
-    print("Hello from agents-in-langgraph!")
+"""
+Run the agents as a long-lived local service (core.service).
+
+    python -m agents_in_langgraph.main serve --workers 4
+    python -m agents_in_langgraph.main submit "What is the weather in SF?" --thread 1 --wait
+    python -m agents_in_langgraph.main stats
+    python -m agents_in_langgraph.main drain
+    python -m agents_in_langgraph.main load --jobs 500 --threads 100 --serve 4 \\
+        --agent agents_in_langgraph.benchmarks.fakes:fake_agent --agent-kwargs '{"latency": 0.05}'
+"""
+import argparse
+import json
+import sys
+import time
+
+from agents_in_langgraph.config import service as service_config
+
+
+def _pool(args):
+    from agents_in_langgraph.core.service import WorkerPool
+    return WorkerPool(
+        workers=args.workers, queue_path=args.queue, checkpoint_dir=args.checkpoints,
+        factory=args.agent, factory_kwargs=json.loads(args.agent_kwargs),
+        concurrency=args.concurrency, quiet=not args.verbose)
+
+
+def serve(args):
+    _pool(args).serve(drain_timeout=args.drain_timeout)
+
+
+def submit(args):
+    from agents_in_langgraph.utils.job_queue import JobQueue
+    queue = JobQueue(args.queue)
+    job_id = queue.submit(args.thread, args.question)
+    print(f"job {job_id} on thread {args.thread}")
+    if args.wait:
+        job = queue.wait(job_id, timeout=args.timeout)
+        print(job["result"] if job["status"] == "done" else f"{job['status']}: {job['error']}")
+
+
+def stats(args):
+    from agents_in_langgraph.utils.job_queue import JobQueue
+    report = JobQueue(args.queue).stats()
+    print("jobs: " + ", ".join(f"{k} {v}" for k, v in report["jobs"].items()))
+    print(f"{'worker':>6} {'pid':>8} {'state':>9} {'done':>7} {'failed':>7} {'jobs/sec':>9} {'busy':>6} {'seen':>7}")
+    for w in report["workers"]:
+        print(f"{w['worker']:>6} {w['pid'] or '-':>8} {w['state']:>9} {w['done']:>7} {w['failed']:>7} "
+              f"{w['jobs_per_sec']:>9.2f} {w['utilization']:>6.0%} {w['heartbeat_age']:>6.1f}s")
+
+
+def drain(args):
+    from agents_in_langgraph.utils.job_queue import JobQueue
+    JobQueue(args.queue).request_drain()
+    print("drain requested, the pool stops once running jobs finish")
+
+
+def load(args):
+    from agents_in_langgraph.core.service import generate_load
+    from agents_in_langgraph.utils.job_queue import JobQueue
+    pool = None
+    if args.serve:
+        args.workers = args.serve
+        pool = _pool(args)
+        pool.start()
+    try:
+        summary = generate_load(
+            JobQueue(args.queue), jobs=args.jobs, threads=args.threads, rate=args.rate, timeout=args.timeout)
+    finally:
+        if pool is not None:
+            # let the workers write a last heartbeat before reporting
+            time.sleep(service_config.HEARTBEAT_INTERVAL)
+            stats(args)
+            pool.stop(args.drain_timeout)
+    print(f"{summary['done']}/{summary['jobs']} jobs on {summary['threads']} threads in {summary['seconds']:.1f}s: "
+          f"{summary['jobs_per_sec']:.1f} jobs/sec, p50 {summary['p50'] * 1000:.0f} ms, "
+          f"p99 {summary['p99'] * 1000:.0f} ms, queue wait p50 {summary['wait_p50'] * 1000:.0f} ms, "
+          f"{summary['failed']} failed")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="agents-in-langgraph worker service")
+    parser.add_argument("--queue", default=None, help="job queue file (default under the cache dir)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def pool_options(p):
+        p.add_argument("--workers", type=int, default=service_config.WORKERS)
+        p.add_argument("--concurrency", type=int, default=service_config.WORKER_CONCURRENCY, help="jobs in flight per worker")
+        p.add_argument("--checkpoints", default=None, help="directory of the per-shard checkpoint files")
+        p.add_argument("--agent", default="agents_in_langgraph.core.service:default_agent",
+                       help="module:function building an agent from a checkpointer")
+        p.add_argument("--agent-kwargs", default="{}", help="JSON keyword arguments of the agent factory")
+        p.add_argument("--drain-timeout", type=float, default=service_config.DRAIN_TIMEOUT)
+        p.add_argument("--verbose", action="store_true", help="keep the agents' prints")
+
+    p = commands.add_parser("serve", help="run the worker pool until SIGINT/SIGTERM or drain")
+    pool_options(p)
+    p.set_defaults(func=serve)
+
+    p = commands.add_parser("submit", help="queue one question")
+    p.add_argument("question")
+    p.add_argument("--thread", default="1")
+    p.add_argument("--wait", action="store_true")
+    p.add_argument("--timeout", type=float, default=None)
+    p.set_defaults(func=submit)
+
+    p = commands.add_parser("stats", help="queue depth and per-worker throughput")
+    p.set_defaults(func=stats)
+
+    p = commands.add_parser("drain", help="ask a running pool to finish its jobs and exit")
+    p.set_defaults(func=drain)
+
+    p = commands.add_parser("load", help="local load generator")
+    pool_options(p)
+    p.add_argument("--jobs", type=int, default=200)
+    p.add_argument("--threads", type=int, default=50)
+    p.add_argument("--rate", type=float, default=None, help="jobs submitted per second, default all at once")
+    p.add_argument("--serve", type=int, default=0, metavar="WORKERS", help="start a pool of this size for the run")
+    p.add_argument("--timeout", type=float, default=None)
+    p.set_defaults(func=load)
+
+    args = parser.parse_args(argv)
+    args.func(args)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
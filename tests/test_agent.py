@@ -0,0 +1,36 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from agents_in_langgraph.benchmarks.fakes import FakeChatModel, fake_search_tool
+from agents_in_langgraph.core.agent import Agent, AgentState, AsyncAgent, bind_graph, compiled_graph
+
+# bind_graph relies on langgraph internals; these pin down what it must keep doing
+
+
+def test_bound_graphs_run_their_own_nodes_and_checkpointers():
+    first = Agent(FakeChatModel(), [fake_search_tool()], checkpointer=MemorySaver())
+    second = Agent(FakeChatModel(tool_turns=0), [fake_search_tool()], checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "t1"}}
+    first.graph.invoke({"messages": [HumanMessage(content="hi")]}, config)
+    second.graph.invoke({"messages": [HumanMessage(content="hi")]}, config)
+    assert [m.type for m in first.graph.get_state(config).values["messages"]] == ["human", "ai", "tool", "tool", "ai"]
+    assert [m.type for m in second.graph.get_state(config).values["messages"]] == ["human", "ai"]
+
+
+def test_bind_graph_leaves_the_compiled_graph_alone():
+    graph = compiled_graph(AgentState, ())
+    calls = []
+    bound = bind_graph(graph, {"llm": lambda state: calls.append(state) or {"messages": [AIMessage(content="done")]}},
+                       checkpointer=MemorySaver(), config={"tags": ["bound"]})
+    bound.invoke({"messages": [HumanMessage(content="hi")]}, {"configurable": {"thread_id": "t1"}})
+    assert len(calls) == 1
+    assert bound.config["tags"] == ["bound"] and not (graph.config or {}).get("tags")
+    assert graph.checkpointer is None and graph.nodes["llm"] is not bound.nodes["llm"]
+
+
+def test_bound_coroutine_nodes():
+    agent = AsyncAgent(FakeChatModel(), [fake_search_tool()])
+    output = asyncio.run(agent.graph.ainvoke({"messages": [HumanMessage(content="hi")]}))
+    assert [m.type for m in output["messages"]] == ["human", "ai", "tool", "tool", "ai"]
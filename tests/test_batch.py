@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from agents_in_langgraph.benchmarks.fakes import FakeChatModel, fake_search_tool
+from agents_in_langgraph.core.agent import Agent, AsyncAgent
+from agents_in_langgraph.utils.batch import astream_batch, run_batch, stream_batch
+
+
+class FlakyModel(FakeChatModel):
+    """Fails once, on the turn after the first tool results came back."""
+    failures: list = []
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if messages[-1].type == "tool" and not self.failures:
+            self.failures.append(len(messages))
+            raise ConnectionError("model went away")
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+def flaky_agent(agent_class=Agent):
+    return agent_class(FlakyModel(failures=[]), [fake_search_tool()], checkpointer=MemorySaver())
+
+
+def test_retry_on_an_existing_thread_does_not_repeat_the_input():
+    agent = flaky_agent()
+    [result] = run_batch(agent.graph, ["What is the weather in SF?"], thread_ids=["t1"], backoff=0.0)
+    assert result.ok and result.attempts == 2
+    messages = agent.graph.get_state({"configurable": {"thread_id": "t1"}}).values["messages"]
+    assert [m.type for m in messages] == ["human", "ai", "tool", "tool", "ai"]
+
+
+def test_async_retry_on_an_existing_thread_does_not_repeat_the_input():
+    agent = flaky_agent(AsyncAgent)
+
+    async def run():
+        return [r async for r in astream_batch(agent.graph, ["hi"], thread_ids=["t1"], backoff=0.0)]
+
+    [result] = asyncio.run(run())
+    assert result.ok and result.attempts == 2
+    messages = agent.graph.get_state({"configurable": {"thread_id": "t1"}}).values["messages"]
+    assert [m.type for m in messages] == ["human", "ai", "tool", "tool", "ai"]
+
+
+class SlowGraph:
+    def __init__(self):
+        self.started = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, state, config):
+        with self.lock:
+            self.started += 1
+        time.sleep(0.05)
+        return state
+
+
+def test_stopping_early_cancels_the_queued_items():
+    graph = SlowGraph()
+    start = time.perf_counter()
+    for result in stream_batch(graph, ["q"] * 40, max_workers=2):
+        break
+    assert time.perf_counter() - start < 0.5
+    time.sleep(0.1)
+    assert graph.started <= 4
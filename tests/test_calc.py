@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from agents_in_langgraph.utils.calc import CalculationError, evaluate, evaluate_array
+
+
+@pytest.mark.parametrize("expression", [
+    "9**9**9",
+    "(9**9999)**9999",
+    "(2**10000)**2",
+    "9**4000*9**4000*9**4000*9**4000",
+    "(9**4000)*(9**4000)*(9**4000)*(9**4000)*(9**4000)",
+])
+def test_huge_integers_are_refused_quickly(expression):
+    start = time.perf_counter()
+    with pytest.raises(CalculationError):
+        evaluate(expression)
+    assert time.perf_counter() - start < 0.1
+
+
+def test_large_results_within_the_limit_still_work():
+    assert evaluate("2**10000") == 2 ** 10000
+    assert evaluate("9**4000*9**400") == 9 ** 4400
+    assert str(evaluate("2**5000*2**5000*2**3000"))
+    assert evaluate("2.5**100") == 2.5 ** 100
+    assert evaluate("(-1)**9999") == -1
+
+
+@pytest.mark.parametrize("expression", ["+".join(["1"] * 3000), "-" * 3000 + "1"])
+def test_long_inputs_are_refused_with_a_calculation_error(expression):
+    with pytest.raises(CalculationError, match="nested too deeply"):
+        evaluate(expression)
+
+
+def test_deeply_parenthesized_input_is_a_calculation_error():
+    with pytest.raises(CalculationError):
+        evaluate("(" * 5000 + "1" + ")" * 5000)
+
+
+def test_long_but_shallow_inputs_still_work():
+    assert evaluate("+".join(["1"] * 150)) == 150
+
+
+def test_evaluate_array_without_numpy(monkeypatch):
+    import builtins
+    real_import = builtins.__import__
+
+    def no_numpy(name, *args, **kwargs):
+        if name == "numpy":
+            raise ImportError("no numpy here")
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", no_numpy)
+    assert evaluate_array("x * 2 + y", x=[1, 2, 3], y=1) == [3, 5, 7]
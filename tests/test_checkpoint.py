@@ -0,0 +1,35 @@
+from langchain_core.messages import HumanMessage
+
+from agents_in_langgraph.benchmarks.fakes import fake_agent
+from agents_in_langgraph.utils.checkpoint import BatchedSqliteSaver, DeltaSqliteSaver
+
+
+def freelist(saver) -> int:
+    return saver.conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+
+def test_vacuum_returns_every_free_page(tmp_path):
+    with BatchedSqliteSaver.from_conn_string(str(tmp_path / "checkpoints.sqlite"), vacuum_interval=None) as saver:
+        saver.setup()
+        saver.conn.execute("CREATE TABLE junk (blob BLOB)")
+        saver.conn.executemany("INSERT INTO junk VALUES (?)", [(b"x" * 4000,) for _ in range(500)])
+        saver.conn.commit()
+        saver.conn.execute("DROP TABLE junk")
+        saver.conn.commit()
+        assert freelist(saver) > 100
+        saver.vacuum()
+        assert freelist(saver) == 0
+
+
+def test_delta_heads_are_bounded(tmp_path):
+    with DeltaSqliteSaver.from_conn_string(str(tmp_path / "checkpoints.sqlite"), cache_size=2) as saver:
+        agent = fake_agent(saver)
+        for thread in range(5):
+            agent.graph.invoke({"messages": [HumanMessage(content="hi")]}, {"configurable": {"thread_id": str(thread)}})
+        assert len(saver._heads) == 2
+        # a thread whose head fell out writes a full snapshot and reads back whole
+        config = {"configurable": {"thread_id": "0"}}
+        agent.graph.invoke({"messages": [HumanMessage(content="again")]}, config)
+        saver._resolved.clear()
+        messages = agent.graph.get_state(config).values["messages"]
+        assert [m.type for m in messages] == ["human", "ai", "tool", "tool", "ai"] * 2
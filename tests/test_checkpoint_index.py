@@ -0,0 +1,28 @@
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from agents_in_langgraph.benchmarks.fakes import fake_agent
+from agents_in_langgraph.utils.checkpoint_index import CheckpointIndex
+
+
+def indexed_thread():
+    index = CheckpointIndex()
+    agent = fake_agent(index.attach(MemorySaver()))
+    agent.graph.invoke({"messages": [HumanMessage(content="hi")]}, {"configurable": {"thread_id": "t1"}})
+    return index
+
+
+def test_only_graph_nodes_are_recorded_as_nodes():
+    index = indexed_thread()
+    entries = list(reversed(index.history("t1")))
+    assert [(e.step, e.source, e.node) for e in entries] == [
+        (-1, "input", None), (0, "loop", None), (1, "loop", "llm"), (2, "loop", "action"), (3, "loop", "llm")]
+    assert index.query("t1", node="") == []
+
+
+def test_before_tool_and_diff():
+    index = indexed_thread()
+    entry = index.before_tool("t1", "tavily_search")
+    assert (entry.step, entry.node, entry.next) == (1, "llm", ("action",))
+    changes = index.diff(index.at_step("t1", 0), entry)
+    assert changes["steps"] == (0, 1) and [m.type for m in changes["added"]] == ["ai"]
@@ -0,0 +1,63 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agents_in_langgraph.utils.context import (
+    ContextPolicy, DropOldToolOutputs, KeepLastN, SummarizeThenTruncate, TokenBudget)
+
+
+def tool_turn(question: str, calls: int) -> list:
+    tool_calls = [{"name": "search", "args": {"q": question}, "id": f"{question}-{i}"} for i in range(calls)]
+    return [
+        HumanMessage(content=question, id=f"h-{question}"),
+        AIMessage(content="", tool_calls=tool_calls, id=f"a-{question}"),
+        *(ToolMessage(content="x" * 400, tool_call_id=t["id"], id=f"t-{t['id']}") for t in tool_calls),
+    ]
+
+
+def test_keep_last_n_widens_to_the_tool_calling_message():
+    messages = tool_turn("first", 1) + [AIMessage(content="done", id="end")] + tool_turn("second", 3)
+    # the last 2 messages are both ToolMessages of the second turn
+    window = KeepLastN(2)(messages)
+    assert window == messages[-5:]
+    assert isinstance(window[0], HumanMessage) and window[0].content == "second"
+
+
+def test_token_budget_keeps_the_last_question_when_over_budget():
+    messages = tool_turn("first", 1) + [AIMessage(content="done", id="end")] + tool_turn("second", 2)
+    window = TokenBudget(max_tokens=10)(messages)
+    assert window == messages[-4:]
+    assert isinstance(window[1], AIMessage) and len(window[1].tool_calls) == 2
+
+
+def test_window_never_opens_on_a_tool_message():
+    messages = tool_turn("q", 4)
+    for n in range(1, len(messages) + 1):
+        window = KeepLastN(n)(messages)
+        assert window and not isinstance(window[0], ToolMessage)
+
+
+class FakeSummarizer:
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append("invoke")
+        return AIMessage(content="summary")
+
+    async def ainvoke(self, messages):
+        self.calls.append("ainvoke")
+        return AIMessage(content="summary")
+
+
+def test_summarize_then_truncate_has_an_async_path():
+    model = FakeSummarizer()
+    policy = ContextPolicy(DropOldToolOutputs(keep_last=1), SummarizeThenTruncate(model, max_tokens=50))
+    messages = tool_turn("first", 1) + [AIMessage(content="done", id="end")] + tool_turn("second", 1)
+    window = asyncio.run(policy.acall(messages))
+    assert model.calls == ["ainvoke"]
+    assert window[0].content == "Summary of the earlier conversation: summary"
+    assert window[1:] == messages[-3:]
+    # the summary is remembered, the sync path does not call the model again
+    assert policy(messages)[0].content == window[0].content
+    assert model.calls == ["ainvoke"]
@@ -0,0 +1,38 @@
+import time
+
+from agents_in_langgraph.utils.federated_search import FederatedSearch
+
+
+def engine(site: str, latency: float = 0.0, shared: int = 0):
+    def _search(query: str, max_results: int) -> list[dict]:
+        time.sleep(latency)
+        hits = [{"url": f"https://{site}.com/{i}", "title": f"{site} {i}", "content": f"{site} says {i}"}
+                for i in range(max_results - shared)]
+        # the same pages both engines found, ranked first
+        return [{"url": f"https://both.com/{i}", "title": "", "content": f"both say {i}"} for i in range(shared)] + hits
+    return _search
+
+
+def test_merges_more_than_the_fastest_engine():
+    with FederatedSearch({"fast": engine("fast", shared=2), "slow": engine("slow", 0.05, shared=2)}) as search:
+        results = search.search("weather in SF")
+    assert len(results) == 5
+    assert sorted(results[0]["engines"]) == ["fast", "slow"]
+    assert {e for r in results for e in r["engines"]} == {"fast", "slow"}
+
+
+def test_returns_in_about_the_fast_engine_latency():
+    engines = {"fast": engine("fast", 0.02), "stuck": engine("stuck", 1.0)}
+    with FederatedSearch(engines, deadline=0.5, grace=0.05) as search:
+        start = time.monotonic()
+        results = search.search("weather in SF")
+    assert time.monotonic() - start < 0.02 + 0.05 + 0.05
+    assert len(results) == 5 and all(r["engines"] == ["fast"] for r in results)
+
+
+def test_failed_engine_does_not_start_the_grace_window():
+    def broken(query, max_results):
+        raise ConnectionError("down")
+    with FederatedSearch({"broken": broken, "slow": engine("slow", 0.1)}, grace=0.0) as search:
+        results = search.search("weather in SF")
+    assert len(results) == 5 and all(r["engines"] == ["slow"] for r in results)
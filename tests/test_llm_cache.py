@@ -0,0 +1,45 @@
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agents_in_langgraph.benchmarks.fakes import FakeChatModel
+from agents_in_langgraph.utils.llm_cache import ResponseCache
+from agents_in_langgraph.utils.streaming import stream_model
+
+
+def conversation(call_id: str) -> list:
+    return [
+        HumanMessage(content="What is the weather in SF?"),
+        AIMessage(content="", tool_calls=[{"name": "search", "args": {"query": "sf"}, "id": call_id}]),
+        ToolMessage(content="sunny", tool_call_id=call_id),
+    ]
+
+
+def test_tool_call_ids_do_not_change_the_key():
+    a, b = (ResponseCache.key(dumps(conversation(i)), "llm") for i in ("call_a", "call_b"))
+    assert a == b
+
+
+def test_hits_across_runs_with_fresh_tool_call_ids(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+    model = FakeChatModel(cache=cache, tool_turns=2)
+    first = model.invoke(conversation("call_a"))
+    second = model.invoke(conversation("call_b"))
+    assert cache.stats()["hits"] == 1
+    assert [t["args"] for t in second.tool_calls] == [t["args"] for t in first.tool_calls]
+    # replies replayed from the cache must not share tool call ids
+    assert {t["id"] for t in second.tool_calls}.isdisjoint(t["id"] for t in first.tool_calls)
+
+
+def test_streaming_reads_and_fills_the_cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+    model = FakeChatModel(cache=cache)
+    messages = [HumanMessage(content="hi")]
+    streamed = stream_model(model, messages)
+    tokens, calls = [], []
+    replayed = stream_model(model, messages, on_token=tokens.append, on_tool_call=calls.append)
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+    assert [t["args"] for t in replayed.tool_calls] == [t["args"] for t in streamed.tool_calls]
+    assert calls == replayed.tool_calls
+    # and invoke finds what streaming stored
+    model.invoke(messages)
+    assert cache.stats()["hits"] == 2
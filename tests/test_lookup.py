@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents_in_langgraph.utils.lookup import LookupTable, data_path
+
+
+@pytest.mark.parametrize("filename", ["dogs.csv", "dogs.jsonl"])
+def test_empty_file(tmp_path, filename):
+    path = tmp_path / filename
+    path.write_bytes(b"")
+    table = LookupTable(str(path))
+    assert len(table) == 0
+    assert table.exact("Toy Poodle") is None
+    assert table.prefix("toy") == []
+
+
+def test_concurrent_first_lookups(tmp_path):
+    path = tmp_path / "dogs.csv"
+    path.write_text("name,weight\n" + "".join(f"Dog {i},{i} lbs\n" for i in range(20_000)))
+    for _ in range(5):
+        table = LookupTable(str(path))
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(lambda _: table.prefix("dog 1999"), range(8)))
+        assert all([r["name"] for r in rows] == ["Dog 1999", "Dog 19990", "Dog 19991", "Dog 19992", "Dog 19993",
+                                                  "Dog 19994", "Dog 19995", "Dog 19996", "Dog 19997", "Dog 19998"]
+                   for rows in results)
+
+
+def test_lookup_by_last_words():
+    table = LookupTable(data_path("dog_weights.csv"))
+    assert table.lookup("Collie")["name"] == "Border Collie"
+    assert table.lookup("poodle")["name"] == "Toy Poodle"
+
+
+def test_ambiguous_word_match_is_not_guessed():
+    table = LookupTable(rows=[{"name": "Scottish Terrier"}, {"name": "Yorkshire Terrier"}])
+    assert [r["name"] for r in table.words("terrier")] == ["Scottish Terrier", "Yorkshire Terrier"]
+    assert table.lookup("terrier") is None
@@ -0,0 +1,24 @@
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from agents_in_langgraph.benchmarks.fakes import fake_agent
+from agents_in_langgraph.utils.metrics import MetricsRegistry, instrument_checkpointer
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.inc("agent_tool_calls_total", tool='say "hi"\\\nbye')
+    assert 'agent_tool_calls_total{tool="say \\"hi\\"\\\\\\nbye"} 1.0' in registry.to_prometheus()
+
+
+def test_a_checkpointer_reports_to_every_registry():
+    checkpointer = MemorySaver()
+    first, second = MetricsRegistry(), MetricsRegistry()
+    instrument_checkpointer(checkpointer, first)
+    instrument_checkpointer(checkpointer, second)
+    instrument_checkpointer(checkpointer, second)
+    agent = fake_agent(checkpointer)
+    agent.graph.invoke({"messages": [HumanMessage(content="hi")]}, {"configurable": {"thread_id": "t1"}})
+    writes = [r.snapshot()["agent_checkpoint_write_seconds"] for r in (first, second)]
+    assert writes[0].keys() == writes[1].keys()
+    assert all(writes[0][k]["count"] == writes[1][k]["count"] > 0 for k in writes[0])
@@ -0,0 +1,28 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents_in_langgraph.utils.reducers import reduce_messages
+
+
+def history():
+    return reduce_messages([], [HumanMessage(content="q", id="h"), AIMessage(content="a", id="a")])
+
+
+def test_in_place_replacement_invalidates_the_index():
+    messages = history()
+    # same length, different ids at the same positions
+    messages[0], messages[1] = AIMessage(content="a", id="a"), HumanMessage(content="q", id="h")
+    merged = reduce_messages(messages, [AIMessage(content="edited", id="a")])
+    assert [(m.id, m.content) for m in merged] == [("a", "edited"), ("h", "q")]
+
+
+def test_stale_index_of_the_same_length_is_rebuilt():
+    messages = history()
+    # bypass the list wrappers, as code holding a plain list reference might
+    list.__setitem__(messages, slice(None), [AIMessage(content="a", id="a"), HumanMessage(content="q", id="h")])
+    merged = reduce_messages(messages, [HumanMessage(content="edited", id="h")])
+    assert [(m.id, m.content) for m in merged] == [("a", "a"), ("h", "edited")]
+
+
+def test_replaces_by_id_and_appends_the_rest():
+    merged = reduce_messages(history(), [AIMessage(content="b", id="a"), HumanMessage(content="next", id="n")])
+    assert [(m.id, m.content) for m in merged] == [("h", "q"), ("a", "b"), ("n", "next")]
@@ -0,0 +1,31 @@
+import time
+
+from langchain_core.tools import StructuredTool
+
+from agents_in_langgraph.utils.search_cache import SearchCache, cached_tool
+
+
+def search_tool(responses: list):
+    def tavily_search(query: str) -> dict:
+        """Search the web."""
+        return responses.pop(0)
+    return StructuredTool.from_function(tavily_search)
+
+
+def test_error_dict_is_returned_and_not_cached(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.sqlite"))
+    error = {"error": ConnectionError("search is down")}
+    tool = cached_tool(search_tool([error, {"results": ["sunny"]}]), cache)
+    assert tool.invoke({"query": "weather in SF"}) is error
+    assert cache.stats()["entries"] == 0
+    assert tool.invoke({"query": "weather in SF"}) == {"results": ["sunny"]}
+    assert cache.stats()["entries"] == 1
+
+
+def test_error_dict_serves_the_stale_entry(tmp_path):
+    cache = SearchCache(str(tmp_path / "search.sqlite"), ttls={"tavily_search": 0.01})
+    tool = cached_tool(search_tool([{"results": ["sunny"]}, {"error": ConnectionError("search is down")}]), cache)
+    assert tool.invoke({"query": "weather in SF"}) == {"results": ["sunny"]}
+    time.sleep(0.02)
+    assert tool.invoke({"query": "weather in SF"}) == {"results": ["sunny"]}
+    assert cache.stats()["stale_hits"] == 1
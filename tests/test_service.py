@@ -0,0 +1,87 @@
+import threading
+import time
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from agents_in_langgraph.benchmarks.fakes import FakeChatModel, fake_search_tool
+from agents_in_langgraph.core import service
+from agents_in_langgraph.core.agent import Agent
+from agents_in_langgraph.utils import clients, open_ai
+from agents_in_langgraph.utils.job_queue import JobQueue
+
+
+def test_failed_warm_up_is_retried(monkeypatch):
+    calls = []
+    outcomes = [None, 0.5]
+
+    def warm_up(model, prefix=None):
+        calls.append(model)
+        return outcomes.pop(0) if outcomes else 0.1
+
+    monkeypatch.setattr(open_ai, "warm_up", warm_up)
+    monkeypatch.setattr(clients, "_registry", {})
+    for _ in range(3):
+        service.default_agent(None, model="warm-up-test")
+    # failed, then succeeded and was remembered
+    assert calls == ["warm-up-test", "warm-up-test"]
+
+
+class FlakyModel(FakeChatModel):
+    """Fails once, on the turn after the first tool results came back."""
+    failures: list = []
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if messages[-1].type == "tool" and not self.failures:
+            self.failures.append(len(messages))
+            raise ConnectionError("model went away")
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+def test_retried_job_resumes_its_thread():
+    queue = JobQueue(":memory:", num_shards=1)
+    agent = Agent(FlakyModel(failures=[]), [fake_search_tool()], checkpointer=MemorySaver())
+    worker = service.Worker(0, 1, ":memory:", "")
+    queue.submit("t1", "What is the weather in SF?")
+    for _ in range(2):
+        [job] = queue.claim([0], worker=0, limit=1)
+        worker._run(queue, {0: agent}, job)
+    assert queue.get(job.id)["status"] == "done" and job.attempts == 2
+    messages = agent.graph.get_state({"configurable": {"thread_id": "t1"}}).values["messages"]
+    assert [m.type for m in messages] == ["human", "ai", "tool", "tool", "ai"]
+
+
+def test_requeued_job_that_did_not_start_runs_its_input():
+    queue = JobQueue(":memory:", num_shards=1)
+    agent = Agent(FakeChatModel(), [fake_search_tool()], checkpointer=MemorySaver())
+    worker = service.Worker(0, 1, ":memory:", "")
+    queue.submit("t1", "What is the weather in SF?")
+    [job] = queue.claim([0], worker=0, limit=1)
+    queue.set_checkpoint(job.id, None)
+    queue.requeue_running([0])      # crashed before invoking the graph
+    [job] = queue.claim([0], worker=0, limit=1)
+    worker._run(queue, {0: agent}, job)
+    messages = agent.graph.get_state({"configurable": {"thread_id": "t1"}}).values["messages"]
+    assert [m.type for m in messages] == ["human", "ai", "tool", "tool", "ai"]
+
+
+def test_generate_load_only_counts_its_own_jobs():
+    queue = JobQueue(":memory:", num_shards=1)
+    queue.submit("someone-else", "still running")
+    stop = threading.Event()
+
+    def serve():
+        # complete the load's jobs; the other thread's job stays running forever
+        while not stop.is_set():
+            for job in queue.claim([0], worker=0, limit=10):
+                if job.thread_id.startswith("load-"):
+                    queue.complete(job.id, "ok")
+            time.sleep(0.01)
+
+    server = threading.Thread(target=serve)
+    server.start()
+    try:
+        report = service.generate_load(queue, jobs=6, threads=3, timeout=5.0)
+    finally:
+        stop.set()
+        server.join()
+    assert report["done"] == 6 and report["failed"] == 0
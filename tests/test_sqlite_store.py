@@ -0,0 +1,34 @@
+import time
+
+from agents_in_langgraph.utils.sqlite_store import SQLiteStore
+
+
+def test_evicts_least_recently_used_in_batches(tmp_path):
+    store = SQLiteStore(str(tmp_path / "kv.sqlite"), max_entries=10, low_water=0.5)
+    for i in range(10):
+        store.set(f"k{i}", b"v")
+        time.sleep(0.001)
+    store.get("k0")     # now the most recently used
+    assert len(store) == 10
+    store.set("k10", b"v")
+    # over the limit: trimmed to the low-water mark, oldest reads first
+    assert len(store) == 5
+    assert store.get("k0") is not None and store.get("k10") is not None
+    assert store.get("k1") is None
+
+
+def test_replacing_a_key_does_not_count_as_a_new_row(tmp_path):
+    store = SQLiteStore(str(tmp_path / "kv.sqlite"), max_entries=3)
+    for _ in range(10):
+        store.set("same", b"v")
+    assert store._count == 1 and len(store) == 1
+
+
+def test_count_survives_reopening(tmp_path):
+    path = str(tmp_path / "kv.sqlite")
+    first = SQLiteStore(path, max_entries=4, low_water=0.5)
+    for i in range(4):
+        first.set(f"k{i}", b"v")
+    second = SQLiteStore(path, max_entries=4, low_water=0.5)
+    second.set("k4", b"v")
+    assert len(second) == 2
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from langchain_core.messages import HumanMessage
+
+from agents_in_langgraph.benchmarks.fakes import FakeChatModel, fake_search_tool
+from agents_in_langgraph.core.agent import Agent, AsyncAgent
+
+
+class BrokenStreamModel(FakeChatModel):
+    """Streams its tool calls, then the connection drops."""
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        chunks = list(super()._stream(messages, stop, run_manager, **kwargs))
+        yield from chunks[:-1]
+        raise ConnectionError("stream reset")
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for chunk in self._stream(messages, stop, run_manager, **kwargs):
+            yield chunk
+
+
+def test_failed_stream_leaves_no_pending_calls():
+    agent = Agent(BrokenStreamModel(), [fake_search_tool(latency=0.05)], streaming=True)
+    with pytest.raises(ConnectionError):
+        agent.graph.invoke({"messages": [HumanMessage(content="hi")]})
+    assert agent.dispatcher._pending == {}
+
+
+def test_failed_async_stream_cancels_its_tasks():
+    agent = AsyncAgent(BrokenStreamModel(), [fake_search_tool(latency=0.05)], streaming=True)
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await agent.graph.ainvoke({"messages": [HumanMessage(content="hi")]})
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+    assert agent.dispatcher._pending == {}
+
+
+def test_collected_turns_leave_no_pending_calls():
+    agent = Agent(FakeChatModel(), [fake_search_tool()], streaming=True)
+    agent.graph.invoke({"messages": [HumanMessage(content="hi")]})
+    assert agent.dispatcher._pending == {}
+
+
+def test_close_stops_the_dispatcher_threads():
+    with Agent(FakeChatModel(), [fake_search_tool()], streaming=True) as agent:
+        agent.graph.invoke({"messages": [HumanMessage(content="hi")]})
+        executor = agent.dispatcher._executor
+        assert executor._threads
+    for thread in executor._threads:
+        thread.join(1.0)
+        assert not thread.is_alive()
+
+
+def test_async_agent_survives_a_second_event_loop():
+    # one slot for two tool calls, so the second call waits on the semaphore
+    agent = AsyncAgent(FakeChatModel(), [fake_search_tool(latency=0.01)], streaming=True, max_workers=1)
+    for _ in range(2):
+        output = asyncio.run(agent.graph.ainvoke({"messages": [HumanMessage(content="hi")]}))
+        assert output["messages"][-1].type == "ai"
@@ -0,0 +1,286 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from agents_in_langgraph.utils.batch import BatchResult, astream_batch, stream_batch
+
+REJECTED = "rejected by reviewer"
+
+
+@dataclass
+class PendingApproval:
+    thread_id: str
+    tool_calls: list[dict]
+    message_id: str | None
+    paused_at: float                # wall clock, seconds
+    decision: str | None = None     # "approve", "reject" or "edit"; None while waiting
+    decided_at: float | None = None
+
+
+def paused_message(output) -> AIMessage | None:
+    """The AIMessage waiting for approval, when graph values `output` end on tool calls."""
+    messages = (output or {}).get("messages") or []
+    if messages and isinstance(messages[-1], AIMessage) and messages[-1].tool_calls:
+        return messages[-1]
+    return None
+
+
+class ApprovalQueue:
+    """
+    Threads of a graph compiled with `interrupt_before=["action"]` that are
+    waiting for a human, indexed in a small SQLite table next to the
+    checkpointer.
+
+    Runs started through `run` (or recorded with `track`/`scan`) land in the
+    index with their pending tool calls, so reviewers can list them without
+    loading any checkpoint. `approve`, `reject` and `edit` only record a
+    decision; `resume` applies the decisions and resumes the threads through
+    the bounded-concurrency batch runner, and threads that pause again are
+    indexed again. Edits replace the AIMessage by id, so the graph needs a
+    state like core.agent.ReducedAgentState.
+
+    With a `metrics` registry, queue depth per state and the time each
+    thread waited for its decision are recorded.
+    """
+    def __init__(self, graph, path: str = ":memory:", metrics=None, config: dict | None = None):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.graph = graph
+        self.metrics = metrics
+        self.config = config
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS approvals ("
+            "thread_id TEXT PRIMARY KEY, message_id TEXT, tool_calls TEXT NOT NULL, "
+            "paused_at REAL NOT NULL, decision TEXT, payload TEXT, decided_at REAL, "
+            "running INTEGER NOT NULL DEFAULT 0)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS approvals_decision ON approvals (decision, paused_at)")
+
+    # indexing
+
+    def add(self, thread_id: str, message: AIMessage) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO approvals (thread_id, message_id, tool_calls, paused_at) VALUES (?, ?, ?, ?)",
+                (thread_id, message.id, json.dumps(message.tool_calls, default=str), time.time()))
+        self._report_depth()
+
+    def remove(self, thread_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM approvals WHERE thread_id = ?", (thread_id,))
+        self._report_depth()
+
+    def track(self, result: BatchResult) -> bool:
+        """Index the thread of a finished batch item if it paused; True when it did."""
+        if not result.ok:
+            return False
+        message = paused_message(result.output)
+        if message is None:
+            self.remove(result.thread_id)
+            return False
+        self.add(result.thread_id, message)
+        return True
+
+    def scan(self, thread_ids: list[str]) -> int:
+        """Index threads run elsewhere by loading their state once; returns how many are paused."""
+        paused = 0
+        for thread_id in thread_ids:
+            state = self.graph.get_state(self._thread_config(thread_id))
+            message = paused_message(state.values) if "action" in state.next else None
+            if message is not None:
+                self.add(thread_id, message)
+                paused += 1
+        return paused
+
+    def run(self, inputs: list, **kwargs) -> Iterator[BatchResult]:
+        """`stream_batch` over new inputs, indexing every thread that pauses."""
+        kwargs.setdefault("config", self.config)
+        kwargs.setdefault("metrics", self.metrics)
+        for result in stream_batch(self.graph, inputs, **kwargs):
+            self.track(result)
+            yield result
+
+    # listing, from the index only
+
+    def pending(self, limit: int | None = None, decided: bool = False) -> list[PendingApproval]:
+        """Threads waiting for a decision, oldest first; with `decided`, those waiting to resume."""
+        condition = "decision IS NOT NULL AND running = 0" if decided else "decision IS NULL"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT thread_id, tool_calls, message_id, paused_at, decision, decided_at "
+                f"FROM approvals WHERE {condition} ORDER BY paused_at LIMIT ?",
+                (-1 if limit is None else limit,)).fetchall()
+        return [PendingApproval(thread_id, json.loads(calls), message_id, paused_at, decision, decided_at)
+                for thread_id, calls, message_id, paused_at, decision, decided_at in rows]
+
+    def depth(self) -> dict:
+        """Number of indexed threads per state: waiting, decided and running."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT CASE WHEN running THEN 'running' WHEN decision IS NULL THEN 'waiting' "
+                "ELSE 'decided' END, COUNT(*) FROM approvals GROUP BY 1").fetchall()
+        return {"waiting": 0, "decided": 0, "running": 0, **dict(rows)}
+
+    def _report_depth(self) -> None:
+        if self.metrics is not None:
+            for state, n in self.depth().items():
+                self.metrics.set("agent_approval_queue_depth", n, state=state)
+
+    # decisions
+
+    def approve(self, thread_ids: list[str]) -> int:
+        return self._decide([(t, "approve", None) for t in thread_ids])
+
+    def reject(self, thread_ids: list[str], reason: str = REJECTED) -> int:
+        """The model gets `reason` back as the result of every pending tool call."""
+        return self._decide([(t, "reject", reason) for t in thread_ids])
+
+    def edit(self, edits: dict[str, list[dict]]) -> int:
+        """Replace the pending tool calls of each thread (thread_id -> tool_calls) and approve them."""
+        return self._decide([(t, "edit", tool_calls) for t, tool_calls in edits.items()])
+
+    def _decide(self, decisions: list[tuple[str, str, object]]) -> int:
+        now = time.time()
+        waited = []
+        with self._lock:
+            for thread_id, decision, payload in decisions:
+                rows = self._conn.execute(
+                    "UPDATE approvals SET decision = ?, payload = ?, decided_at = ? "
+                    "WHERE thread_id = ? AND running = 0 RETURNING paused_at",
+                    (decision, json.dumps(payload), now, thread_id)).fetchall()
+                if rows:
+                    waited.append((decision, now - rows[0][0]))
+        if self.metrics is not None:
+            for decision, seconds in waited:
+                self.metrics.observe("agent_approval_wait_seconds", seconds, decision=decision)
+                self.metrics.inc("agent_approval_decisions_total", decision=decision)
+            self._report_depth()
+        return len(waited)
+
+    # resumption
+
+    def _thread_config(self, thread_id: str) -> dict:
+        config = dict(self.config or {})
+        config["configurable"] = {**config.get("configurable", {}), "thread_id": thread_id}
+        return config
+
+    def _claim(self, thread_ids: list[str] | None) -> list[str]:
+        with self._lock:
+            if thread_ids is None:
+                thread_ids = [row[0] for row in self._conn.execute(
+                    "SELECT thread_id FROM approvals WHERE decision IS NOT NULL AND running = 0 "
+                    "ORDER BY decided_at")]
+            claimed = [t for t in thread_ids if self._conn.execute(
+                "UPDATE approvals SET running = 1 WHERE thread_id = ? AND decision IS NOT NULL AND running = 0",
+                (t,)).rowcount]
+        self._report_depth()
+        return claimed
+
+    def _decision(self, thread_id: str) -> tuple | None:
+        """(decision, payload, message_id, tool_calls) still to apply to a thread, None to just resume."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT decision, payload, message_id, tool_calls FROM approvals WHERE thread_id = ?",
+                (thread_id,)).fetchone()
+        if row is None or row[0] == "approve":
+            return None
+        return row[0], json.loads(row[1]), row[2], json.loads(row[3])
+
+    def _applied(self, thread_id: str) -> None:
+        # the state holds the decision now; a retry only has to resume
+        with self._lock:
+            self._conn.execute("UPDATE approvals SET decision = 'approve' WHERE thread_id = ?", (thread_id,))
+
+    def _finished(self, result: BatchResult) -> None:
+        if result.ok:
+            self.track(result)
+        else:
+            # keep the decision, the next resume tries again
+            with self._lock:
+                self._conn.execute("UPDATE approvals SET running = 0 WHERE thread_id = ?", (result.thread_id,))
+            self._report_depth()
+
+    def resume(self, thread_ids: list[str] | None = None, **kwargs) -> Iterator[BatchResult]:
+        """
+        Apply the decisions and resume the decided threads (all of them, or
+        `thread_ids`) with `stream_batch`; kwargs such as max_workers and
+        retries go to the runner.
+        """
+        claimed = self._claim(thread_ids)
+        if not claimed:
+            return
+        kwargs.setdefault("config", self.config)
+        kwargs.setdefault("metrics", self.metrics)
+        for result in stream_batch(_Resumer(self), [None] * len(claimed), thread_ids=claimed, **kwargs):
+            self._finished(result)
+            yield result
+
+    async def aresume(self, thread_ids: list[str] | None = None, **kwargs) -> AsyncIterator[BatchResult]:
+        """`resume` on the event loop with `astream_batch`, for graphs with async nodes and checkpointer."""
+        claimed = self._claim(thread_ids)
+        if not claimed:
+            return
+        kwargs.setdefault("config", self.config)
+        kwargs.setdefault("metrics", self.metrics)
+        async for result in astream_batch(_Resumer(self), [None] * len(claimed), thread_ids=claimed, **kwargs):
+            self._finished(result)
+            yield result
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _rejection(tool_calls: list[dict], reason: str) -> dict:
+    # answer every pending call, as if the action node had run
+    return {"messages": [
+        ToolMessage(tool_call_id=t["id"], name=t["name"], content=reason, status="error")
+        for t in tool_calls]}
+
+
+def _edited(state, thread_id: str, message_id: str, tool_calls: list[dict]) -> dict:
+    # same message id, so the reducer replaces the pending tool calls
+    message = state.values["messages"][-1]
+    if message.id != message_id:
+        raise RuntimeError(f"thread {thread_id} moved on since it was indexed")
+    return {"messages": [message.model_copy(update={"tool_calls": tool_calls})]}
+
+
+class _Resumer:
+    """Graph stand-in for the batch runner: applies a thread's decision, then resumes it."""
+    def __init__(self, queue: ApprovalQueue):
+        self.queue = queue
+        self.graph = queue.graph
+
+    def invoke(self, input, config: dict):
+        thread_id = config["configurable"]["thread_id"]
+        pending = self.queue._decision(thread_id)
+        if pending is not None:
+            decision, payload, message_id, tool_calls = pending
+            if decision == "reject":
+                self.graph.update_state(config, _rejection(tool_calls, payload), as_node="action")
+            else:
+                self.graph.update_state(config, _edited(self.graph.get_state(config), thread_id, message_id, payload))
+            self.queue._applied(thread_id)
+        return self.graph.invoke(None, config)
+
+    async def ainvoke(self, input, config: dict):
+        thread_id = config["configurable"]["thread_id"]
+        pending = self.queue._decision(thread_id)
+        if pending is not None:
+            decision, payload, message_id, tool_calls = pending
+            if decision == "reject":
+                await self.graph.aupdate_state(config, _rejection(tool_calls, payload), as_node="action")
+            else:
+                state = await self.graph.aget_state(config)
+                await self.graph.aupdate_state(config, _edited(state, thread_id, message_id, payload))
+            self.queue._applied(thread_id)
+        return await self.graph.ainvoke(None, config)
@@ -0,0 +1,197 @@
+import asyncio
+import time
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator
+from uuid import uuid4
+
+from langchain_core.messages import HumanMessage
+
+
+@dataclass
+class BatchResult:
+    index: int
+    thread_id: str
+    input: Any
+    output: Any = None
+    error: BaseException | None = None
+    attempts: int = 0
+    latency: float = 0.0    # seconds spent in the graph over all attempts
+    wait: float = 0.0       # seconds queued before the first attempt started
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _to_state(item) -> dict:
+    # plain strings are questions, anything else is already a graph input
+    if isinstance(item, str):
+        return {"messages": [HumanMessage(content=item)]}
+    return item
+
+
+def _config(base: dict | None, thread_id: str) -> dict:
+    config = dict(base or {})
+    config["configurable"] = {**config.get("configurable", {}), "thread_id": thread_id}
+    return config
+
+
+def _thread_id(prefix: str, index: int, attempt: int) -> str:
+    # every retry starts a fresh thread, so it does not resume a half-run one
+    thread_id = f"{prefix}-{index}"
+    return thread_id if attempt == 0 else f"{thread_id}-retry{attempt}"
+
+
+def _retry_input(state, item):
+    # a failed attempt on an existing thread may already have stored the input
+    # and run some nodes: resume from the last checkpoint rather than send it twice
+    return None if state.next else _to_state(item)
+
+
+def _record(metrics, result: BatchResult) -> BatchResult:
+    if metrics is not None:
+        metrics.observe("agent_queue_wait_seconds", result.wait)
+        metrics.observe("agent_run_seconds", result.latency, status="ok" if result.ok else "error")
+        metrics.inc("agent_run_attempts_total", result.attempts)
+    return result
+
+
+def _run_one(graph, index: int, item, prefix: str, retries: int, backoff: float,
+             config: dict | None, submitted: float, metrics=None, thread_id: str | None = None) -> BatchResult:
+    result = BatchResult(index=index, thread_id="", input=item, wait=time.perf_counter() - submitted)
+    for attempt in range(retries + 1):
+        result.attempts = attempt + 1
+        result.thread_id = thread_id or _thread_id(prefix, index, attempt)
+        start = time.perf_counter()
+        try:
+            graph_input = _to_state(item)
+            if thread_id is not None and attempt > 0 and item is not None:
+                graph_input = _retry_input(graph.get_state(_config(config, thread_id)), item)
+            result.output = graph.invoke(graph_input, _config(config, result.thread_id))
+            result.error = None
+        except Exception as e:
+            result.error = e
+        result.latency += time.perf_counter() - start
+        if result.error is None:
+            break
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt)
+    return _record(metrics, result)
+
+
+def stream_batch(
+        graph,
+        inputs: list,
+        max_workers: int = 16,
+        retries: int = 2,
+        backoff: float = 0.5,
+        config: dict | None = None,
+        thread_prefix: str | None = None,
+        metrics=None,
+        thread_ids: list[str] | None = None,
+        ) -> Iterator[BatchResult]:
+    """
+    Drive `inputs` through a compiled graph on a thread pool, one thread id
+    per input, yielding each BatchResult as soon as it finishes.
+
+    Inputs are question strings or graph inputs. Failed items are retried up
+    to `retries` times with exponential backoff; the error of the last attempt
+    is kept on the result instead of being raised. With a `metrics`
+    registry (utils.metrics) queue wait and run time are recorded per item.
+
+    With `thread_ids`, item i runs on the existing thread `thread_ids[i]`,
+    retries included; a `None` input then resumes a thread from its last
+    checkpoint, e.g. one paused for approval (utils.approvals). A retry
+    resumes from the last checkpoint too when the failed attempt got as far
+    as storing the input, so it is never added to the thread twice.
+
+    Items not started yet are cancelled when the caller stops iterating.
+    """
+    prefix = thread_prefix or f"batch-{uuid4().hex[:8]}"
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        submitted = time.perf_counter()
+        futures = [
+            executor.submit(_run_one, graph, i, item, prefix, retries, backoff, config, submitted, metrics,
+                            thread_ids[i] if thread_ids is not None else None)
+            for i, item in enumerate(inputs)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # on GeneratorExit too: drop queued items, running ones finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def astream_batch(
+        graph,
+        inputs: list,
+        max_concurrency: int = 64,
+        retries: int = 2,
+        backoff: float = 0.5,
+        config: dict | None = None,
+        thread_prefix: str | None = None,
+        metrics=None,
+        thread_ids: list[str] | None = None,
+        ) -> AsyncIterator[BatchResult]:
+    """Async counterpart of `stream_batch`, bounded by a semaphore on one event loop."""
+    prefix = thread_prefix or f"batch-{uuid4().hex[:8]}"
+    semaphore = asyncio.Semaphore(max_concurrency)
+    submitted = time.perf_counter()
+
+    async def _run(index: int, item) -> BatchResult:
+        async with semaphore:
+            result = BatchResult(index=index, thread_id="", input=item, wait=time.perf_counter() - submitted)
+            for attempt in range(retries + 1):
+                result.attempts = attempt + 1
+                result.thread_id = thread_ids[index] if thread_ids is not None else _thread_id(prefix, index, attempt)
+                start = time.perf_counter()
+                try:
+                    graph_input = _to_state(item)
+                    if thread_ids is not None and attempt > 0 and item is not None:
+                        graph_input = _retry_input(
+                            await graph.aget_state(_config(config, result.thread_id)), item)
+                    result.output = await graph.ainvoke(graph_input, _config(config, result.thread_id))
+                    result.error = None
+                except Exception as e:
+                    result.error = e
+                result.latency += time.perf_counter() - start
+                if result.error is None:
+                    break
+                if attempt < retries:
+                    await asyncio.sleep(backoff * 2 ** attempt)
+            return _record(metrics, result)
+
+    tasks = [asyncio.ensure_future(_run(i, item)) for i, item in enumerate(inputs)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def run_batch(graph, inputs: list, **kwargs) -> list[BatchResult]:
+    """Run `stream_batch` to the end and return the results in input order."""
+    return sorted(stream_batch(graph, inputs, **kwargs), key=lambda r: r.index)
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def summarize(results: list[BatchResult]) -> dict:
+    latencies = [r.latency for r in results if r.ok]
+    return {
+        "items": len(results),
+        "errors": sum(not r.ok for r in results),
+        "retries": sum(r.attempts - 1 for r in results),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
@@ -0,0 +1,181 @@
+import ast
+import math
+import operator
+
+from functools import lru_cache
+
+MAX_EXPONENT = 10_000   # keeps 9**9**9 style inputs from hanging the agent
+# largest integer result, in bits: about 4200 decimal digits, which is also
+# under Python's limit for turning an int into text
+MAX_INT_BITS = 14_000
+# deepest expression tree accepted; evaluating it recurses once per level
+MAX_DEPTH = 200
+
+_CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf}
+
+# name -> (scalar implementation, numpy ufunc name)
+_FUNCTIONS = {
+    "abs": (abs, "abs"),
+    "round": (round, "round"),
+    "min": (min, "minimum"),
+    "max": (max, "maximum"),
+    "sqrt": (math.sqrt, "sqrt"),
+    "exp": (math.exp, "exp"),
+    "log": (math.log, "log"),
+    "log10": (math.log10, "log10"),
+    "sin": (math.sin, "sin"),
+    "cos": (math.cos, "cos"),
+    "tan": (math.tan, "tan"),
+    "floor": (math.floor, "floor"),
+    "ceil": (math.ceil, "ceil"),
+}
+
+
+class CalculationError(ValueError):
+    """Raised for expressions the calculator refuses or cannot evaluate."""
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _pow(a, b):
+    if isinstance(b, (int, float)) and abs(b) > MAX_EXPONENT:
+        raise CalculationError(f"exponent {b} is too large")
+    # bound the result before computing it, (9**9999)**9999 passes the check above
+    if _is_int(a) and _is_int(b) and b > 0 and abs(a) > 1 and b * math.log2(abs(a)) > MAX_INT_BITS:
+        raise CalculationError(f"result of {a}**{b} is too large")
+    return operator.pow(a, b)
+
+
+def _mul(a, b):
+    # products of large integers chain up just as well: 9**9999*9**9999*...
+    if _is_int(a) and _is_int(b) and a.bit_length() + b.bit_length() > MAX_INT_BITS + 1:
+        raise CalculationError("result of the multiplication is too large")
+    return operator.mul(a, b)
+
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _pow,
+}
+_UNARY = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+
+def _build(node: ast.AST, functions: dict):
+    """Turn a whitelisted AST into nested closures taking a variables dict."""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = node.value
+        return lambda env: value
+    if isinstance(node, ast.Name):
+        if node.id in _CONSTANTS:
+            value = _CONSTANTS[node.id]
+            return lambda env: value
+        name = node.id
+        return lambda env: env[name]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op, left, right = _BINARY[type(node.op)], _build(node.left, functions), _build(node.right, functions)
+        return lambda env: op(left(env), right(env))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        op, operand = _UNARY[type(node.op)], _build(node.operand, functions)
+        return lambda env: op(operand(env))
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in functions and not node.keywords):
+        fn, args = functions[node.func.id], [_build(a, functions) for a in node.args]
+        return lambda env: fn(*(a(env) for a in args))
+    raise CalculationError(f"unsupported syntax: {ast.dump(node)[:80]}")
+
+
+def _check_depth(node: ast.AST, expression: str) -> None:
+    # iterative, so the check itself cannot hit the recursion limit
+    stack = [(node, 1)]
+    while stack:
+        node, depth = stack.pop()
+        if depth > MAX_DEPTH:
+            raise CalculationError(f"expression {expression[:40]!r}... is nested too deeply")
+        stack.extend((child, depth + 1) for child in ast.iter_child_nodes(node))
+
+
+def _parse(expression: str) -> ast.AST:
+    try:
+        tree = ast.parse(expression.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise CalculationError(f"invalid expression {expression!r}: {e.msg}") from None
+    except (RecursionError, MemoryError):
+        raise CalculationError(f"expression {expression[:40]!r}... is nested too deeply") from None
+    _check_depth(tree, expression)
+    return tree
+
+
+@lru_cache(maxsize=4096)
+def compile_expression(expression: str):
+    """Parse, validate and compile `expression` once; cached by its text."""
+    return _build(_parse(expression), {name: fn for name, (fn, _) in _FUNCTIONS.items()})
+
+
+@lru_cache(maxsize=1024)
+def _compile_vectorized(expression: str):
+    import numpy as np
+    functions = {name: getattr(np, ufunc) for name, (_, ufunc) in _FUNCTIONS.items()}
+    return _build(_parse(expression), functions)
+
+
+def _run(compiled, expression: str, variables: dict):
+    try:
+        return compiled(variables)
+    except KeyError as e:
+        raise CalculationError(f"unknown name {e.args[0]!r} in {expression!r}") from None
+    except RecursionError:
+        raise CalculationError(f"expression {expression[:40]!r}... is nested too deeply") from None
+    except (ArithmeticError, TypeError, ValueError) as e:
+        if isinstance(e, CalculationError):
+            raise
+        raise CalculationError(f"cannot evaluate {expression!r}: {e}") from None
+
+
+def evaluate(expression: str, **variables):
+    """Evaluate an arithmetic expression without eval: numbers, + - * / // % **, math functions."""
+    return _run(compile_expression(expression), expression, variables)
+
+
+def evaluate_many(expressions: list[str]) -> list:
+    """Evaluate a batch of expressions; failures come back as CalculationError instances."""
+    results = []
+    for expression in expressions:
+        try:
+            results.append(evaluate(expression))
+        except CalculationError as e:
+            results.append(e)
+    return results
+
+
+def evaluate_array(expression: str, **arrays):
+    """
+    Evaluate one expression over NumPy arrays bound to its variable names, in
+    one vectorized pass. NumPy is not a dependency of this package: without
+    it the expression is evaluated element by element and a list comes back.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return _evaluate_elementwise(expression, arrays)
+    arrays = {name: np.asarray(value) for name, value in arrays.items()}
+    return _run(_compile_vectorized(expression), expression, arrays)
+
+
+def _evaluate_elementwise(expression: str, arrays: dict) -> list:
+    compiled = compile_expression(expression)
+    columns = {name: list(v) if isinstance(v, (list, tuple, range)) else None for name, v in arrays.items()}
+    sizes = {len(c) for c in columns.values() if c is not None}
+    if len(sizes) > 1:
+        raise CalculationError(f"arrays of different lengths {sorted(sizes)} in {expression!r}")
+    # plain numbers broadcast like NumPy scalars
+    return [
+        _run(compiled, expression, {n: c[i] if c is not None else arrays[n] for n, c in columns.items()})
+        for i in range(sizes.pop() if sizes else 1)
+    ]
@@ -0,0 +1,331 @@
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+class BatchedSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver tuned for many graph steps per second.
+
+    - WAL journal with synchronous=NORMAL, so a commit does not fsync.
+    - Commits are grouped: writes are committed every `commit_every` writes
+      or `commit_interval` seconds, whichever comes first. A crash loses at
+      most that window, reads on the saver always see everything.
+    - `keep_last` keeps only the newest K checkpoints (and their writes) per
+      thread and namespace; None keeps full history for time travel.
+    - A background thread commits idle batches and, every `vacuum_interval`
+      seconds, returns freed pages to the OS with an incremental vacuum.
+    """
+    _pruned_tables = ("checkpoints", "writes")
+
+    def __init__(
+            self,
+            conn: sqlite3.Connection,
+            *,
+            serde=None,
+            commit_every: int = 64,
+            commit_interval: float = 0.2,
+            keep_last: int | None = None,
+            vacuum_interval: float | None = 60.0,
+            ) -> None:
+        super().__init__(conn, serde=serde)
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.keep_last = keep_last
+        self.vacuum_interval = vacuum_interval
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self._last_vacuum = time.monotonic()
+        self._stop = threading.Event()
+        self._maintenance = threading.Thread(target=self._maintain, name="checkpoint-maintenance", daemon=True)
+        self._maintenance.start()
+
+    @classmethod
+    @contextmanager
+    def from_conn_string(cls, conn_string: str, **kwargs) -> Iterator["BatchedSqliteSaver"]:
+        conn = sqlite3.connect(conn_string, check_same_thread=False)
+        saver = cls(conn, **kwargs)
+        try:
+            yield saver
+        finally:
+            saver.close()
+            conn.close()
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        # auto_vacuum only takes effect before the first table is created
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        super().setup()
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        with self.lock:
+            self.setup()
+            cur = self.conn.cursor()
+            try:
+                yield cur
+            finally:
+                if transaction:
+                    self._pending += 1
+                    if (self._pending >= self.commit_every
+                            or time.monotonic() - self._last_commit >= self.commit_interval):
+                        self._commit()
+                cur.close()
+
+    def _commit(self) -> None:
+        # callers hold self.lock
+        self.conn.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def flush(self) -> None:
+        """Commit every write made so far."""
+        with self.lock:
+            if self._pending:
+                self._commit()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        if self.keep_last:
+            self.prune(next_config["configurable"]["thread_id"], next_config["configurable"]["checkpoint_ns"])
+        return next_config
+
+    def prune(self, thread_id: str, checkpoint_ns: str = "") -> None:
+        """Drop all but the newest `keep_last` checkpoints of one thread."""
+        with self.cursor() as cur:
+            cutoff = self._prune_cutoff(cur, str(thread_id), checkpoint_ns)
+            if cutoff is None:
+                return
+            for table in self._pruned_tables:
+                cur.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                    (str(thread_id), checkpoint_ns, cutoff),
+                )
+
+    def _prune_cutoff(self, cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str) -> str | None:
+        # the oldest checkpoint to keep, everything before it goes
+        cur.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.keep_last - 1),
+        )
+        row = cur.fetchone()
+        return row[0] if row else None
+
+    def vacuum(self) -> None:
+        with self.lock:
+            if not self.is_setup:
+                return
+            self._commit()
+            # the pragma frees one page per row fetched, so read them all
+            self.conn.execute("PRAGMA incremental_vacuum").fetchall()
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            self._last_vacuum = time.monotonic()
+
+    def _maintain(self) -> None:
+        while not self._stop.wait(self.commit_interval):
+            try:
+                self.flush()
+                if self.vacuum_interval is not None and time.monotonic() - self._last_vacuum >= self.vacuum_interval:
+                    self.vacuum()
+            except sqlite3.ProgrammingError:
+                # the connection was closed under us
+                return
+
+    def close(self) -> None:
+        self._stop.set()
+        self._maintenance.join()
+        try:
+            self.flush()
+        except sqlite3.ProgrammingError:
+            pass
+
+
+# marker stored in place of a channel value that is written as a delta
+DELTA_KEY = "__delta_base__"
+
+
+class DeltaSqliteSaver(BatchedSqliteSaver):
+    """
+    BatchedSqliteSaver that stores append-only list channels as deltas.
+
+    When a channel in `delta_channels` (the agents' `messages`) still starts
+    with the exact list of the parent checkpoint, only the appended items are
+    written, next to the parent's id. Every `snapshot_every` steps, and
+    whenever the list was edited rather than appended to (L5 replaces
+    messages by id), the full list is written instead, so rebuilding a
+    checkpoint never reads more than `snapshot_every` rows.
+
+    Rebuilding happens on read (get_tuple / list, i.e. get_state and
+    get_state_history), and rebuilt lists are kept in a small LRU.
+    """
+    _pruned_tables = ("checkpoints", "writes", "checkpoint_deltas")
+
+    def __init__(
+            self,
+            conn: sqlite3.Connection,
+            *,
+            delta_channels: tuple[str, ...] = ("messages",),
+            snapshot_every: int = 16,
+            cache_size: int = 256,
+            **kwargs,
+            ) -> None:
+        self.delta_channels = delta_channels
+        self.snapshot_every = snapshot_every
+        self.cache_size = cache_size
+        # (thread_id, ns) -> (checkpoint_id, {channel: list}, steps since snapshot),
+        # for the `cache_size` most recently written threads; a thread that
+        # fell out writes a full snapshot next
+        self._heads = OrderedDict()
+        # (thread_id, ns, checkpoint_id, channel) -> full list
+        self._resolved = OrderedDict()
+        self._cache_lock = threading.Lock()
+        super().__init__(conn, **kwargs)
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_deltas ("
+            "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL DEFAULT '', "
+            "checkpoint_id TEXT NOT NULL, base_checkpoint_id TEXT NOT NULL, "
+            "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))"
+        )
+
+    def _cached(self, key: tuple) -> list | None:
+        with self._cache_lock:
+            value = self._resolved.get(key)
+            if value is not None:
+                self._resolved.move_to_end(key)
+            return value
+
+    def _remember(self, key: tuple, value: list) -> None:
+        with self._cache_lock:
+            self._resolved[key] = value
+            self._resolved.move_to_end(key)
+            if len(self._resolved) > self.cache_size:
+                self._resolved.popitem(last=False)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        parent_id = config["configurable"].get("checkpoint_id")
+        values = checkpoint["channel_values"]
+        lists = {ch: values[ch] for ch in self.delta_channels if isinstance(values.get(ch), list)}
+
+        with self._cache_lock:
+            head = self._heads.get((thread_id, checkpoint_ns))
+        depth = head[2] + 1 if head is not None else 0
+        appended_only = (
+            head is not None and parent_id == head[0] and depth < self.snapshot_every
+            and all(
+                ch in head[1] and len(value) >= len(head[1][ch])
+                # identity, not equality: the channel hands us the same objects
+                and all(a is b for a, b in zip(head[1][ch], value))
+                for ch, value in lists.items()
+            )
+        )
+        if appended_only and lists:
+            values = dict(values)
+            for ch, value in lists.items():
+                values[ch] = {DELTA_KEY: parent_id, "appended": value[len(head[1][ch]):]}
+            checkpoint = {**checkpoint, "channel_values": values}
+        else:
+            depth = 0
+
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        checkpoint_id = next_config["configurable"]["checkpoint_id"]
+        if appended_only and lists:
+            with self.cursor() as cur:
+                cur.execute(
+                    "INSERT OR REPLACE INTO checkpoint_deltas (thread_id, checkpoint_ns, checkpoint_id, base_checkpoint_id) "
+                    "VALUES (?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint_id, parent_id),
+                )
+        with self._cache_lock:
+            self._heads[(thread_id, checkpoint_ns)] = (checkpoint_id, lists, depth)
+            self._heads.move_to_end((thread_id, checkpoint_ns))
+            if len(self._heads) > self.cache_size:
+                self._heads.popitem(last=False)
+        for ch, value in lists.items():
+            self._remember((thread_id, checkpoint_ns, checkpoint_id, ch), value)
+        return next_config
+
+    def _load_channel(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, ch: str) -> list:
+        cached = self._cached((thread_id, checkpoint_ns, checkpoint_id, ch))
+        if cached is not None:
+            return cached
+        with self.cursor(transaction=False) as cur:
+            row = cur.execute(
+                "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchone()
+        if row is None:
+            raise ValueError(f"delta base checkpoint {checkpoint_id} of thread {thread_id} is missing")
+        value = self.serde.loads_typed(row)["channel_values"].get(ch, [])
+        return self._rebuild(thread_id, checkpoint_ns, checkpoint_id, ch, value)
+
+    def _rebuild(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, ch: str, value):
+        if isinstance(value, dict) and DELTA_KEY in value:
+            key = (thread_id, checkpoint_ns, checkpoint_id, ch)
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
+            base = self._load_channel(thread_id, checkpoint_ns, value[DELTA_KEY], ch)
+            value = base + value["appended"]
+            self._remember(key, value)
+        return value
+
+    def _resolve_tuple(self, saved):
+        configurable = saved.config["configurable"]
+        values = saved.checkpoint["channel_values"]
+        if not any(isinstance(values.get(ch), dict) and DELTA_KEY in values[ch] for ch in self.delta_channels):
+            return saved
+        values = dict(values)
+        for ch in self.delta_channels:
+            if ch in values:
+                values[ch] = self._rebuild(
+                    str(configurable["thread_id"]), configurable["checkpoint_ns"],
+                    configurable["checkpoint_id"], ch, values[ch])
+        return saved._replace(checkpoint={**saved.checkpoint, "channel_values": values})
+
+    def get_tuple(self, config):
+        saved = super().get_tuple(config)
+        return self._resolve_tuple(saved) if saved is not None else None
+
+    def list(self, config, **kwargs):
+        # the parent holds the lock while it yields, so collect before rebuilding
+        for saved in [*super().list(config, **kwargs)]:
+            yield self._resolve_tuple(saved)
+
+    def _prune_cutoff(self, cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str) -> str | None:
+        cutoff = super()._prune_cutoff(cur, thread_id, checkpoint_ns)
+        # move the cutoff back to the snapshot the oldest kept delta builds on
+        while cutoff is not None:
+            row = cur.execute(
+                "SELECT base_checkpoint_id FROM checkpoint_deltas WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, cutoff),
+            ).fetchone()
+            if row is None:
+                break
+            cutoff = row[0]
+        return cutoff
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM checkpoint_deltas WHERE thread_id = ?", (str(thread_id),))
+        with self._cache_lock:
+            for key in [k for k in self._heads if k[0] == str(thread_id)]:
+                del self._heads[key]
+            for key in [k for k in self._resolved if k[0] == str(thread_id)]:
+                del self._resolved[key]
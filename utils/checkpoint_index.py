@@ -0,0 +1,271 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from dataclasses import dataclass
+
+BRANCH_PREFIX = "branch:to:"
+
+
+@dataclass
+class CheckpointEntry:
+    thread_id: str
+    checkpoint_ns: str
+    checkpoint_id: str
+    parent_id: str | None
+    step: int
+    source: str             # input, loop, update or fork
+    node: str | None        # node whose step wrote the checkpoint; None unless a graph node did
+    next: tuple[str, ...]   # nodes that run from it; ("action",) while tool calls wait
+    tools: tuple[str, ...]  # tool calls waiting to run
+    messages: int
+    created_at: float
+
+    @property
+    def config(self) -> dict:
+        return {"configurable": {
+            "thread_id": self.thread_id,
+            "checkpoint_ns": self.checkpoint_ns,
+            "checkpoint_id": self.checkpoint_id,
+        }}
+
+
+def _summary(checkpoint: dict) -> tuple[tuple[str, ...], tuple[str, ...], int]:
+    # (next nodes, pending tool names, message count) without touching the saver
+    values = checkpoint["channel_values"]
+    next_nodes = tuple(sorted(ch[len(BRANCH_PREFIX):] for ch in values if ch.startswith(BRANCH_PREFIX)))
+    messages = values.get("messages")
+    messages = messages if isinstance(messages, list) else []
+    tools = ()
+    if "action" in next_nodes and messages:
+        tools = tuple(t["name"] for t in getattr(messages[-1], "tool_calls", None) or ())
+    return next_nodes, tools, len(messages)
+
+
+def _message_key(i: int, m) -> str:
+    # messages without an id (operator.add states) are matched by position
+    return getattr(m, "id", None) or f"#{i}"
+
+
+class CheckpointIndex:
+    """
+    Metadata of every checkpoint a saver writes, kept in a small SQLite
+    table: step, source, node, next nodes, pending tool names and message
+    count.
+
+    `attach` wraps the saver's put/aput on the instance, like
+    utils.metrics.instrument_checkpointer. History queries (`history`,
+    `query`, `at_step`, `before_tool`) then read only the index, and
+    `load`, `fork` and `diff` deserialize just the checkpoints they return
+    instead of walking `get_state_history`.
+
+    Loading goes through the saver's sync methods. Entries of checkpoints
+    the saver pruned (BatchedSqliteSaver keep_last) stay in the index;
+    loading them raises KeyError.
+    """
+    def __init__(self, path: str = ":memory:"):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.checkpointer = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_index ("
+            "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+            "parent_id TEXT, step INTEGER NOT NULL, source TEXT NOT NULL, node TEXT, "
+            "next TEXT NOT NULL, messages INTEGER NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS checkpoint_index_step ON checkpoint_index (thread_id, checkpoint_ns, step)")
+        # one row per pending tool call, so "before tool X" is an index lookup
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_tools ("
+            "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, tool TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS checkpoint_tools_tool ON checkpoint_tools (tool, thread_id, checkpoint_id)")
+
+    # recording
+
+    def attach(self, checkpointer):
+        """Index every checkpoint `checkpointer` writes from now on; returns the saver."""
+        if getattr(checkpointer, "_checkpoint_index", None) is not None:
+            return checkpointer
+        checkpointer._checkpoint_index = self
+        self.checkpointer = checkpointer
+        put, aput = checkpointer.put, checkpointer.aput
+
+        def _put(config, checkpoint, metadata, new_versions):
+            next_config = put(config, checkpoint, metadata, new_versions)
+            self.record(next_config, config, checkpoint, metadata)
+            return next_config
+
+        async def _aput(config, checkpoint, metadata, new_versions):
+            next_config = await aput(config, checkpoint, metadata, new_versions)
+            self.record(next_config, config, checkpoint, metadata)
+            return next_config
+
+        checkpointer.put = _put
+        checkpointer.aput = _aput
+        return checkpointer
+
+    def record(self, next_config: dict, config: dict, checkpoint: dict, metadata: dict) -> None:
+        configurable = next_config["configurable"]
+        thread_id, ns = str(configurable["thread_id"]), configurable.get("checkpoint_ns", "")
+        checkpoint_id = configurable["checkpoint_id"]
+        parent_id = config["configurable"].get("checkpoint_id")
+        next_nodes, tools, messages = _summary(checkpoint)
+        source = metadata.get("source", "loop")
+        with self._lock:
+            node = None
+            if source == "loop" and parent_id is not None:
+                # a loop step runs whatever its parent had next; nothing (None)
+                # after the input checkpoint, whose step only ran __start__
+                row = self._conn.execute(
+                    "SELECT next FROM checkpoint_index WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, ns, parent_id)).fetchone()
+                node = (",".join(json.loads(row[0])) or None) if row else None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoint_index VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, ns, checkpoint_id, parent_id, metadata.get("step", -1), source, node,
+                 json.dumps(next_nodes), messages, time.time()))
+            self._conn.execute(
+                "DELETE FROM checkpoint_tools WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, ns, checkpoint_id))
+            self._conn.executemany(
+                "INSERT INTO checkpoint_tools VALUES (?, ?, ?, ?)",
+                [(thread_id, ns, checkpoint_id, tool) for tool in tools])
+
+    def backfill(self, thread_id: str, checkpoint_ns: str = "") -> int:
+        """Index a thread written before `attach`, with one walk over its history."""
+        config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}}
+        saved = list(self.checkpointer.list(config))
+        # oldest first, so every loop checkpoint finds its parent's next nodes
+        for s in reversed(saved):
+            self.record(s.config, s.parent_config or {"configurable": {}}, s.checkpoint, s.metadata)
+        return len(saved)
+
+    # queries, from the index only
+
+    _columns = ("thread_id, checkpoint_ns, checkpoint_id, parent_id, step, source, node, next, messages, created_at, "
+                "(SELECT json_group_array(tool) FROM checkpoint_tools t WHERE t.thread_id = i.thread_id "
+                "AND t.checkpoint_ns = i.checkpoint_ns AND t.checkpoint_id = i.checkpoint_id)")
+
+    def _select(self, where: str, params: tuple, order: str = "checkpoint_id DESC", limit: int | None = None):
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self._columns} FROM checkpoint_index i WHERE {where} ORDER BY {order} LIMIT ?",
+                (*params, -1 if limit is None else limit)).fetchall()
+        return [CheckpointEntry(
+            thread_id=r[0], checkpoint_ns=r[1], checkpoint_id=r[2], parent_id=r[3], step=r[4], source=r[5],
+            # index files written before nodes were stored as NULL hold "" or the source
+            node=r[6] if r[6] and r[5] == "loop" else None, next=tuple(json.loads(r[7])), messages=r[8], created_at=r[9],
+            tools=tuple(json.loads(r[10]))) for r in rows]
+
+    def history(self, thread_id: str, checkpoint_ns: str = "", limit: int | None = None) -> list[CheckpointEntry]:
+        """Entries of a thread, newest first, like get_state_history without loading any state."""
+        return self._select("thread_id = ? AND checkpoint_ns = ?", (thread_id, checkpoint_ns), limit=limit)
+
+    def query(
+            self,
+            thread_id: str | None = None,
+            checkpoint_ns: str = "",
+            node: str | None = None,
+            next_node: str | None = None,
+            tool: str | None = None,
+            source: str | None = None,
+            min_step: int | None = None,
+            max_step: int | None = None,
+            min_messages: int | None = None,
+            max_messages: int | None = None,
+            limit: int | None = None,
+            ) -> list[CheckpointEntry]:
+        """Entries matching every given predicate, across threads unless `thread_id` is set, newest first."""
+        where, params = ["checkpoint_ns = ?"], [checkpoint_ns]
+        for clause, value in (
+                ("thread_id = ?", thread_id),
+                ("node = ?", node),
+                ("EXISTS (SELECT 1 FROM json_each(next) WHERE value = ?)", next_node),
+                ("EXISTS (SELECT 1 FROM checkpoint_tools t WHERE t.thread_id = i.thread_id AND "
+                 "t.checkpoint_ns = i.checkpoint_ns AND t.checkpoint_id = i.checkpoint_id AND t.tool = ?)", tool),
+                ("source = ?", source),
+                ("step >= ?", min_step),
+                ("step <= ?", max_step),
+                ("messages >= ?", min_messages),
+                ("messages <= ?", max_messages)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        return self._select(" AND ".join(where), tuple(params), limit=limit)
+
+    def at_step(self, thread_id: str, step: int, checkpoint_ns: str = "") -> CheckpointEntry | None:
+        """The newest checkpoint of `thread_id` at `step` (there are several once a thread was forked)."""
+        found = self._select("thread_id = ? AND checkpoint_ns = ? AND step = ?", (thread_id, checkpoint_ns, step), limit=1)
+        return found[0] if found else None
+
+    def before_tool(self, thread_id: str, tool: str, checkpoint_ns: str = "", first: bool = False) -> CheckpointEntry | None:
+        """
+        The checkpoint where a call to `tool` was about to run: the latest one,
+        or with `first` the earliest. Resuming from it runs the call again.
+        """
+        found = self.query(thread_id, checkpoint_ns, tool=tool)
+        if not found:
+            return None
+        return found[-1] if first else found[0]
+
+    # loading, one deserialization per checkpoint
+
+    def load(self, entry: CheckpointEntry):
+        """The CheckpointTuple behind `entry`."""
+        saved = self.checkpointer.get_tuple(entry.config)
+        if saved is None:
+            raise KeyError(f"checkpoint {entry.checkpoint_id} of thread {entry.thread_id} is gone")
+        return saved
+
+    def fork(self, thread_id: str, step: int, new_thread_id: str | None = None, checkpoint_ns: str = "") -> dict:
+        """
+        Config to resume from `step` of `thread_id`.
+
+        Without `new_thread_id` this is the checkpoint's own config: running
+        or updating the graph with it branches the same thread. With one, the
+        checkpoint is copied to the new thread first.
+        """
+        entry = self.at_step(thread_id, step, checkpoint_ns)
+        if entry is None:
+            raise KeyError(f"thread {thread_id} has no checkpoint at step {step}")
+        if new_thread_id is None:
+            return entry.config
+        saved = self.load(entry)
+        config = {"configurable": {"thread_id": new_thread_id, "checkpoint_ns": checkpoint_ns}}
+        metadata = {**saved.metadata, "source": "fork", "parents": {}}
+        # pending writes are left behind, so the next step runs again instead of replaying
+        return self.checkpointer.put(config, saved.checkpoint, metadata, saved.checkpoint["channel_versions"])
+
+    def diff(self, a: CheckpointEntry, b: CheckpointEntry) -> dict:
+        """
+        What changed from checkpoint `a` to checkpoint `b`: messages added,
+        removed and edited (matched by id), and other channels whose value
+        differs.
+        """
+        before = self.load(a).checkpoint["channel_values"]
+        after = self.load(b).checkpoint["channel_values"]
+        old = {_message_key(i, m): m for i, m in enumerate(before.get("messages") or [])}
+        new = {_message_key(i, m): m for i, m in enumerate(after.get("messages") or [])}
+        channels = {
+            ch: (before.get(ch), after.get(ch))
+            for ch in sorted(set(before) | set(after))
+            if ch != "messages" and not ch.startswith(BRANCH_PREFIX) and before.get(ch) != after.get(ch)
+        }
+        return {
+            "steps": (a.step, b.step),
+            "next": (a.next, b.next),
+            "added": [m for k, m in new.items() if k not in old],
+            "removed": [m for k, m in old.items() if k not in new],
+            "changed": [(old[k], m) for k, m in new.items() if k in old and old[k] != m],
+            "channels": channels,
+        }
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,73 @@
+import threading
+
+from typing import TYPE_CHECKING
+
+from agents_in_langgraph.config import http as http_config
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+_registry = {}
+_lock = threading.RLock()  # factories may build their own shared dependencies
+
+
+def get_or_create(key, factory):
+    """
+    Return the process-wide object registered under `key`, creating it with
+    `factory()` on first use. All utils factories go through here, so every
+    agent in the process shares the same clients and connection pools.
+    A factory returning None is not remembered and runs again next time.
+    """
+    client = _registry.get(key)
+    if client is None:
+        with _lock:
+            client = _registry.get(key)
+            if client is None:
+                client = factory()
+                if client is not None:
+                    _registry[key] = client
+    return client
+
+
+def http_client(
+        max_connections: int = http_config.MAX_CONNECTIONS,
+        max_keepalive_connections: int = http_config.MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = http_config.KEEPALIVE_EXPIRY,
+        ) -> "httpx.Client":
+    """Shared httpx client with a keep-alive pool, used by the OpenAI clients."""
+    import httpx
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    key = ("httpx", max_connections, max_keepalive_connections, keepalive_expiry)
+    return get_or_create(key, lambda: httpx.Client(limits=limits, timeout=httpx.Timeout(600.0, connect=5.0)))
+
+
+def requests_session(
+        pool_connections: int = http_config.SCRAPE_POOL_CONNECTIONS,
+        pool_maxsize: int = http_config.SCRAPE_POOL_MAXSIZE,
+        ) -> "requests.Session":
+    """Shared requests.Session with a bounded urllib3 pool, used for scraping."""
+    def _session():
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=True)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    return get_or_create(("requests", pool_connections, pool_maxsize), _session)
+
+
+def close_all() -> None:
+    """Close every registered client, e.g. before a worker process exits."""
+    with _lock:
+        clients = list(_registry.values())
+        _registry.clear()
+    for client in clients:
+        close = getattr(client, "close", None)
+        if callable(close):
+            close()
@@ -0,0 +1,220 @@
+from collections import OrderedDict
+
+from langchain_core.messages import AnyMessage, HumanMessage, ToolMessage
+
+
+class TokenCounter:
+    """
+    Cheap token estimate per message, cached by message id.
+
+    The estimate is ~4 characters per token plus a small per-message overhead,
+    which is close enough for budgeting and needs no tokenizer. Entries are
+    keyed on (id, content length) so a message replaced under the same id
+    (L5 edits) is counted again.
+    """
+    def __init__(self, chars_per_token: float = 4.0, overhead: int = 4, maxsize: int = 100_000):
+        self.chars_per_token = chars_per_token
+        self.overhead = overhead
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+
+    def _estimate(self, message: AnyMessage) -> int:
+        chars = len(str(message.content))
+        for t in getattr(message, "tool_calls", None) or []:
+            chars += len(t['name']) + len(str(t['args']))
+        return int(chars / self.chars_per_token) + self.overhead
+
+    def count(self, message: AnyMessage) -> int:
+        if message.id is None:
+            return self._estimate(message)
+        key = (message.id, len(str(message.content)))
+        tokens = self._cache.get(key)
+        if tokens is None:
+            tokens = self._cache[key] = self._estimate(message)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return tokens
+
+    def total(self, messages: list[AnyMessage]) -> int:
+        return sum(self.count(m) for m in messages)
+
+
+def _align(messages: list[AnyMessage], start: int) -> int:
+    """
+    Move a cut back so the window keeps the last HumanMessage and whatever
+    answered it, and never opens on a ToolMessage: the cut is widened to the
+    AIMessage whose tool calls the ToolMessages answer.
+    """
+    last_human = next(
+        (i for i in range(len(messages) - 1, -1, -1) if isinstance(messages[i], HumanMessage)), None)
+    if last_human is not None:
+        start = min(start, last_human)
+    start = min(start, len(messages) - 1)
+    while start > 0 and isinstance(messages[start], ToolMessage):
+        start -= 1
+    return max(start, 0)
+
+
+class KeepLastN:
+    """Keep only the last `n` messages."""
+    def __init__(self, n: int):
+        self.n = n
+
+    def __call__(self, messages: list[AnyMessage]) -> list[AnyMessage]:
+        if len(messages) <= self.n:
+            return messages
+        return messages[_align(messages, len(messages) - self.n):]
+
+
+class DropOldToolOutputs:
+    """
+    Replace the content of all but the last `keep_last` ToolMessages with a
+    short placeholder. The messages themselves stay, so every tool call still
+    has its answer.
+    """
+    def __init__(self, keep_last: int = 2, placeholder: str = "[tool output omitted]"):
+        self.keep_last = keep_last
+        self.placeholder = placeholder
+
+    def __call__(self, messages: list[AnyMessage]) -> list[AnyMessage]:
+        tool_positions = [i for i, m in enumerate(messages) if isinstance(m, ToolMessage)]
+        old = tool_positions[:max(len(tool_positions) - self.keep_last, 0)]
+        if not old:
+            return messages
+        messages = list(messages)
+        for i in old:
+            messages[i] = messages[i].model_copy(update={"content": self.placeholder})
+        return messages
+
+
+class TokenBudget:
+    """Keep the newest messages whose estimated size fits in `max_tokens`."""
+    def __init__(self, max_tokens: int, counter: TokenCounter | None = None):
+        self.max_tokens = max_tokens
+        self.counter = counter or TokenCounter()
+
+    def start(self, messages: list[AnyMessage]) -> int:
+        used = 0
+        start = len(messages)
+        while start > 0:
+            used += self.counter.count(messages[start - 1])
+            if used > self.max_tokens:
+                break
+            start -= 1
+        return _align(messages, start)
+
+    def __call__(self, messages: list[AnyMessage]) -> list[AnyMessage]:
+        return messages[self.start(messages):]
+
+
+class SummarizeThenTruncate:
+    """
+    When the history no longer fits `max_tokens`, summarize the messages that
+    fall out of the budget with `model` and send that summary in their place.
+
+    Summaries are remembered by the id of the last message they cover, so a
+    later turn (of any thread) only summarizes what dropped out since, on
+    top of the earlier summary, instead of re-reading the whole prefix.
+    """
+    prompt = "Summarize the conversation so far in a few sentences, keeping facts and numbers:"
+
+    def __init__(self, model, max_tokens: int, counter: TokenCounter | None = None, maxsize: int = 10_000):
+        self.model = model
+        self.budget = TokenBudget(max_tokens, counter)
+        self.maxsize = maxsize
+        self._summaries = OrderedDict()
+
+    def _cached(self, dropped: list[AnyMessage]) -> tuple[str, list[AnyMessage]]:
+        # the longest prefix that is already summarized, and what is left
+        for i in range(len(dropped) - 1, -1, -1):
+            if dropped[i].id is not None and dropped[i].id in self._summaries:
+                self._summaries.move_to_end(dropped[i].id)
+                return self._summaries[dropped[i].id], dropped[i + 1:]
+        return "", dropped
+
+    def _request(self, summary: str, new: list[AnyMessage]) -> list[AnyMessage]:
+        text = "\n".join(f"{m.type}: {m.content}" for m in new)
+        if summary:
+            text = f"Earlier summary: {summary}\n{text}"
+        return [HumanMessage(content=f"{self.prompt}\n{text}")]
+
+    def _remember(self, dropped: list[AnyMessage], summary: str) -> str:
+        if dropped[-1].id is not None:
+            self._summaries[dropped[-1].id] = summary
+            if len(self._summaries) > self.maxsize:
+                self._summaries.popitem(last=False)
+        return summary
+
+    def _summarize(self, dropped: list[AnyMessage]) -> str:
+        summary, new = self._cached(dropped)
+        if not new:
+            return summary
+        return self._remember(dropped, self.model.invoke(self._request(summary, new)).content)
+
+    async def _asummarize(self, dropped: list[AnyMessage]) -> str:
+        summary, new = self._cached(dropped)
+        if not new:
+            return summary
+        return self._remember(dropped, (await self.model.ainvoke(self._request(summary, new))).content)
+
+    @staticmethod
+    def _window(summary: str, kept: list[AnyMessage]) -> list[AnyMessage]:
+        return [HumanMessage(content=f"Summary of the earlier conversation: {summary}")] + kept
+
+    def __call__(self, messages: list[AnyMessage]) -> list[AnyMessage]:
+        start = self.budget.start(messages)
+        if start == 0:
+            return messages
+        return self._window(self._summarize(messages[:start]), messages[start:])
+
+    async def acall(self, messages: list[AnyMessage]) -> list[AnyMessage]:
+        """Same as calling the policy, but summarizes with `model.ainvoke`, for AsyncAgent."""
+        start = self.budget.start(messages)
+        if start == 0:
+            return messages
+        return self._window(await self._asummarize(messages[:start]), messages[start:])
+
+
+async def apply_policy(policy, messages: list[AnyMessage]) -> list[AnyMessage]:
+    """Run a context policy on the event loop: its `acall` when it has one, else the policy itself."""
+    acall = getattr(policy, "acall", None)
+    if acall is not None:
+        return await acall(messages)
+    return policy(messages)
+
+
+class ContextPolicy:
+    """Apply several policies in order, e.g. drop old tool outputs then budget."""
+    def __init__(self, *policies):
+        self.policies = policies
+
+    def __call__(self, messages: list[AnyMessage]) -> list[AnyMessage]:
+        for policy in self.policies:
+            messages = policy(messages)
+        return messages
+
+    async def acall(self, messages: list[AnyMessage]) -> list[AnyMessage]:
+        for policy in self.policies:
+            messages = await apply_policy(policy, messages)
+        return messages
+
+
+class StableWindow:
+    """
+    Like KeepLastN, but the cut only moves every `step` messages: between
+    `n` and `n + step` messages are kept. A window sliding by one message a
+    turn changes the first message of every prompt, so the server's prompt
+    cache never hits; this one keeps the same prefix for `step` turns.
+    """
+    def __init__(self, n: int, step: int = 16):
+        self.n = n
+        self.step = step
+
+    def __call__(self, messages: list[AnyMessage]) -> list[AnyMessage]:
+        if len(messages) <= self.n + self.step:
+            return messages
+        # a function of the length only, so every process cuts at the same place
+        cut = (len(messages) - self.n) // self.step * self.step
+        return messages[_align(messages, cut):]
@@ -0,0 +1,163 @@
+import hashlib
+import re
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from langchain_core.tools import StructuredTool
+
+# an engine takes (query, max_results) and returns [{"url", "title", "content"}]
+Engine = Callable[[str, int], list[dict]]
+
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|ref|ref_src)$")
+_whitespace = re.compile(r"\s+")
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING_PARAMS.match(k)))
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme,
+                       host, parts.path.rstrip("/") or "/", query, ""))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(_whitespace.sub(" ", text).strip().lower().encode()).hexdigest()
+
+
+def tavily_engine(client=None) -> Engine:
+    from agents_in_langgraph.utils.tavily_search import new_trvily_client
+    client = client or new_trvily_client()
+
+    def _search(query: str, max_results: int) -> list[dict]:
+        results = client.search(query, max_results=max_results)["results"]
+        return [{"url": r["url"], "title": r.get("title", ""), "content": r.get("content", "")} for r in results]
+    return _search
+
+
+def ddg_engine(ddgs=None) -> Engine:
+    from duckduckgo_search import DDGS
+    ddgs = ddgs or DDGS()
+
+    def _search(query: str, max_results: int) -> list[dict]:
+        results = ddgs.text(query, max_results=max_results)
+        return [{"url": r["href"], "title": r.get("title", ""), "content": r.get("body", "")} for r in results]
+    return _search
+
+
+class FederatedSearch:
+    """
+    Send one query to every configured engine at once and merge the answers.
+
+    `search` waits for the first engine to answer, then at most `grace`
+    seconds more for the others (never past `deadline`), and merges
+    whatever arrived: the fastest healthy engine sets the latency, and
+    engines about as fast still get merged in. Stragglers finish in the
+    background and are simply not waited for. Results are de-duplicated by
+    normalized URL and by content hash and ranked with reciprocal rank
+    fusion. An engine that raises is skipped for `cooldown` seconds.
+    """
+    def __init__(
+            self,
+            engines: dict[str, Engine],
+            k: int = 5,
+            deadline: float = 5.0,
+            max_results: int = 8,
+            cooldown: float = 60.0,
+            grace: float = 0.1,
+            ):
+        self.engines = engines
+        self.k = k
+        self.deadline = deadline
+        self.grace = grace
+        self.max_results = max_results
+        self.cooldown = cooldown
+        self._executor = ThreadPoolExecutor(max_workers=4 * max(len(engines), 1), thread_name_prefix="search")
+        self._lock = threading.Lock()
+        self._down_until = {}
+        self.latency = {}   # engine -> moving average of successful call latency
+
+    def healthy_engines(self) -> dict[str, Engine]:
+        now = time.monotonic()
+        return {name: e for name, e in self.engines.items() if self._down_until.get(name, 0.0) <= now}
+
+    def _call(self, name: str, engine: Engine, query: str) -> list[dict]:
+        start = time.perf_counter()
+        try:
+            results = engine(query, self.max_results)
+        except Exception as e:
+            print(f"search engine {name} failed, skipping it for {self.cooldown}s: {e}")
+            with self._lock:
+                self._down_until[name] = time.monotonic() + self.cooldown
+            raise
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            previous = self.latency.get(name)
+            self.latency[name] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+        return results
+
+    def search(self, query: str) -> list[dict]:
+        engines = self.healthy_engines() or self.engines   # all down: try them all again
+        futures = {self._executor.submit(self._call, name, e, query): name for name, e in engines.items()}
+        answered = {}
+        end = time.monotonic() + self.deadline
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=max(end - time.monotonic(), 0.0), return_when=FIRST_COMPLETED)
+            if not done:
+                break   # deadline, or the grace window after the first answer
+            for future in done:
+                if future.exception() is None:
+                    if not answered:
+                        end = min(end, time.monotonic() + self.grace)
+                    answered[futures[future]] = future.result()
+        for future in pending:
+            future.cancel()     # only calls still queued can be; running ones are ignored
+        return self.merge(answered)[:self.k]
+
+    def close(self) -> None:
+        """Stop the engine threads; calls still running are not waited for."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "FederatedSearch":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def merge(answered: dict[str, list[dict]], rrf_k: int = 60) -> list[dict]:
+        merged = {}
+        by_content = {}
+        for name, results in answered.items():
+            for rank, r in enumerate(results):
+                key = normalize_url(r["url"])
+                digest = content_hash(r["content"]) if r.get("content") else None
+                # same text under another URL (mirrors, AMP pages) is the same hit
+                key = by_content.get(digest, key) if digest else key
+                hit = merged.get(key)
+                if hit is None:
+                    hit = merged[key] = {**r, "score": 0.0, "engines": []}
+                    if digest:
+                        by_content[digest] = key
+                hit["score"] += 1.0 / (rrf_k + rank + 1)
+                hit["engines"].append(name)
+        return sorted(merged.values(), key=lambda h: h["score"], reverse=True)
+
+    def as_tool(self, name: str = "federated_search") -> StructuredTool:
+        def federated_search(query: str) -> list[dict]:
+            return self.search(query)
+
+        return StructuredTool.from_function(
+            func=federated_search,
+            name=name,
+            description=(
+                "A search engine querying several web search providers at once. "
+                "Useful for when you need to answer questions about current events. "
+                "Input should be a search query."),
+        )
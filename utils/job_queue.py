@@ -0,0 +1,238 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from dataclasses import dataclass
+
+from agents_in_langgraph.config import service as service_config
+
+
+@dataclass
+class Job:
+    id: int
+    thread_id: str
+    shard: int
+    input: dict
+    attempts: int
+    checkpoint_id: str | None = None    # head of the thread when the job was first claimed
+
+
+def shard_of(thread_id: str, num_shards: int) -> int:
+    # crc32 rather than hash(), which differs between processes
+    return zlib.crc32(thread_id.encode()) % num_shards
+
+
+class JobQueue:
+    """
+    Agent jobs in a local SQLite file, shared by the submitting clients and
+    the worker processes of core.service.
+
+    Every job belongs to a conversation thread, and every thread to one of
+    `num_shards` shards, fixed when the file is created. A worker only
+    claims jobs of its own shards, and never two jobs of one thread at
+    once, so jobs of a thread run in submission order. Workers also report
+    their throughput here, see `heartbeat` and `stats`.
+
+    A job that fails is retried, so its worker records the head checkpoint
+    of the thread before the first attempt (`set_checkpoint`); a retry that
+    finds the thread past that checkpoint knows the input is already in it.
+    """
+    def __init__(self, path: str | None = None, num_shards: int = service_config.NUM_SHARDS):
+        path = path or os.path.join(service_config.SERVICE_DIR, "jobs.sqlite")
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, thread_id TEXT NOT NULL, shard INTEGER NOT NULL, "
+                "input TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'queued', worker INTEGER, "
+                "attempts INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT, "
+                "submitted_at REAL NOT NULL, started_at REAL, finished_at REAL, checkpoint_id TEXT)")
+            if "checkpoint_id" not in [c[1] for c in self._conn.execute("PRAGMA table_info(jobs)")]:
+                # queue files made before jobs remembered their checkpoint
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN checkpoint_id TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (shard, status, id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_thread ON jobs (thread_id, status)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS workers ("
+                "worker INTEGER PRIMARY KEY, pid INTEGER, shards TEXT, state TEXT, started_at REAL, "
+                "heartbeat_at REAL, done INTEGER, failed INTEGER, busy_seconds REAL)")
+            self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('num_shards', ?)", (str(num_shards),))
+            self.num_shards = int(self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'num_shards'").fetchone()[0])
+            self._conn.execute("COMMIT")
+
+    # clients
+
+    def submit(self, thread_id: str, input: dict | str) -> int:
+        """Queue a graph input (a question string is turned into one) for `thread_id`; returns the job id."""
+        if isinstance(input, str):
+            input = {"messages": [{"role": "user", "content": input}]}
+        with self._lock:
+            return self._conn.execute(
+                "INSERT INTO jobs (thread_id, shard, input, submitted_at) VALUES (?, ?, ?, ?)",
+                (thread_id, shard_of(thread_id, self.num_shards), json.dumps(input), time.time())).lastrowid
+
+    def submit_many(self, jobs: list[tuple[str, dict | str]]) -> None:
+        now = time.time()
+        rows = [(t, shard_of(t, self.num_shards),
+                 json.dumps({"messages": [{"role": "user", "content": i}]} if isinstance(i, str) else i), now)
+                for t, i in jobs]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "INSERT INTO jobs (thread_id, shard, input, submitted_at) VALUES (?, ?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+
+    def request_drain(self, drain: bool = True) -> None:
+        """Ask a running worker pool (in any process) to stop taking jobs and exit."""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('drain', ?)", ("1" if drain else "0",))
+
+    def drain_requested(self) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'drain'").fetchone()
+        return row is not None and row[0] == "1"
+
+    def get(self, job_id: int) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, thread_id, status, result, error, attempts, submitted_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "thread_id", "status", "result", "error", "attempts", "submitted_at", "started_at", "finished_at")
+        return dict(zip(keys, row))
+
+    def wait(self, job_id: int, timeout: float | None = None, poll: float = service_config.POLL_INTERVAL) -> dict:
+        """Poll until the job is done or failed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in ("done", "failed"):
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"job {job_id} is still {job['status']}")
+            time.sleep(poll)
+
+    # workers
+
+    def claim(self, shards: list[int], worker: int, limit: int) -> list[Job]:
+        """
+        Up to `limit` queued jobs of `shards`, oldest first, at most one per
+        thread and none of a thread that already has a job running.
+        """
+        if limit <= 0 or not shards:
+            return []
+        marks = ",".join("?" * len(shards))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute(
+                f"SELECT MIN(id) FROM jobs WHERE shard IN ({marks}) AND status IN ('queued', 'running') "
+                "GROUP BY thread_id HAVING SUM(status = 'running') = 0 ORDER BY MIN(id) LIMIT ?",
+                (*shards, limit)).fetchall()
+            jobs = []
+            now = time.time()
+            for (job_id,) in rows:
+                thread_id, shard, input, attempts, checkpoint_id = self._conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, attempts = attempts + 1 "
+                    "WHERE id = ? RETURNING thread_id, shard, input, attempts, checkpoint_id",
+                    (worker, now, job_id)).fetchall()[0]
+                jobs.append(Job(job_id, thread_id, shard, json.loads(input), attempts, checkpoint_id))
+            self._conn.execute("COMMIT")
+        return jobs
+
+    def set_checkpoint(self, job_id: int, checkpoint_id: str | None) -> None:
+        """Remember the thread's head checkpoint before the job first ran (None for a new thread)."""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET checkpoint_id = ? WHERE id = ?", (checkpoint_id, job_id))
+
+    def complete(self, job_id: int, result: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, finished_at = ? WHERE id = ?",
+                (result, time.time(), job_id))
+
+    def fail(self, job_id: int, error: str, max_attempts: int = service_config.MAX_ATTEMPTS) -> bool:
+        """Requeue the job, or mark it failed after `max_attempts`; True when it was requeued."""
+        with self._lock:
+            attempts = self._conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            retry = attempts < max_attempts
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                ("queued" if retry else "failed", error, None if retry else time.time(), job_id))
+        return retry
+
+    def requeue_running(self, shards: list[int]) -> int:
+        """Put back jobs left running on `shards`, e.g. by a worker that crashed."""
+        marks = ",".join("?" * len(shards))
+        with self._lock:
+            return self._conn.execute(
+                f"UPDATE jobs SET status = 'queued' WHERE status = 'running' AND shard IN ({marks})",
+                shards).rowcount
+
+    def heartbeat(self, worker: int, **fields) -> None:
+        """Upsert the row of `worker` (pid, shards, state, started_at, done, failed, busy_seconds)."""
+        fields = {**fields, "heartbeat_at": time.time()}
+        if "shards" in fields:
+            fields["shards"] = json.dumps(fields["shards"])
+        columns = ", ".join(fields)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in fields)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO workers (worker, {columns}) VALUES (?, {','.join('?' * len(fields))}) "
+                f"ON CONFLICT (worker) DO UPDATE SET {updates}",
+                (worker, *fields.values()))
+
+    def clear_workers(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM workers")
+
+    # stats
+
+    def depth(self, thread_prefix: str = "") -> dict:
+        """Jobs per status, only of threads whose id starts with `thread_prefix` when given."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE substr(thread_id, 1, ?) = ? GROUP BY status",
+                (len(thread_prefix), thread_prefix)).fetchall()
+        return {"queued": 0, "running": 0, "done": 0, "failed": 0, **dict(rows)}
+
+    def stats(self) -> dict:
+        """Queue depth per status and, per worker, jobs done/failed and jobs per second since it started."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT worker, pid, shards, state, started_at, heartbeat_at, done, failed, busy_seconds "
+                "FROM workers ORDER BY worker").fetchall()
+        workers = []
+        for worker, pid, shards, state, started_at, heartbeat_at, done, failed, busy in rows:
+            elapsed = max((heartbeat_at or 0) - (started_at or 0), 1e-9)
+            workers.append({
+                "worker": worker, "pid": pid, "shards": json.loads(shards or "[]"), "state": state,
+                "done": done or 0, "failed": failed or 0,
+                "jobs_per_sec": (done or 0) / elapsed,
+                "utilization": (busy or 0.0) / elapsed,
+                "heartbeat_age": time.time() - (heartbeat_at or 0),
+            })
+        return {"jobs": self.depth(), "workers": workers}
+
+    def latencies(self, since: float = 0.0, thread_prefix: str = "") -> list[tuple[float, float]]:
+        """(queue wait, total seconds) of jobs finished after `since`, of threads starting with `thread_prefix`."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT started_at - submitted_at, finished_at - submitted_at FROM jobs "
+                "WHERE status = 'done' AND finished_at >= ? AND substr(thread_id, 1, ?) = ?",
+                (since, len(thread_prefix), thread_prefix)).fetchall()
+
+    def close(self) -> None:
+        self._conn.close()
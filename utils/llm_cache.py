@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import uuid
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from agents_in_langgraph.config import cache as cache_config
+from agents_in_langgraph.utils.sqlite_store import SQLiteStore
+
+# per-call bookkeeping that must not take part in the cache key
+_VOLATILE_KWARGS = ("id", "response_metadata", "usage_metadata")
+
+
+def _renumber(ids: dict, tool_call_id):
+    # tool call ids are random per run; their position in the conversation is not
+    if tool_call_id is None:
+        return None
+    return ids.setdefault(tool_call_id, f"call_{len(ids)}")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Strip message ids and response/usage metadata from a serialized prompt,
+    and renumber tool call ids by position, so the same conversation
+    replayed in another thread hashes the same.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    ids = {}
+    for message in messages if isinstance(messages, list) else []:
+        kwargs = message.get("kwargs") if isinstance(message, dict) else None
+        if not isinstance(kwargs, dict):
+            continue
+        for key in _VOLATILE_KWARGS:
+            kwargs.pop(key, None)
+        calls = [*(kwargs.get("tool_calls") or ()), *(kwargs.get("invalid_tool_calls") or ()),
+                 *((kwargs.get("additional_kwargs") or {}).get("tool_calls") or ())]
+        for call in calls:
+            if isinstance(call, dict) and "id" in call:
+                call["id"] = _renumber(ids, call["id"])
+        if "tool_call_id" in kwargs:
+            kwargs["tool_call_id"] = _renumber(ids, kwargs["tool_call_id"])
+    return json.dumps(messages, sort_keys=True)
+
+
+def _fresh_ids(message) -> None:
+    # a fresh id per hit, otherwise id-based reducers would merge replies, and
+    # fresh tool call ids, which key the tool calls of utils.streaming
+    message.id = None
+    ids = {}
+    for call in [*getattr(message, "tool_calls", ()), *getattr(message, "invalid_tool_calls", ()),
+                 *message.additional_kwargs.get("tool_calls", ())]:
+        if call.get("id"):
+            call["id"] = ids.setdefault(call["id"], f"call_{uuid.uuid4().hex[:24]}")
+
+
+class ResponseCache(BaseCache):
+    """
+    Exact-match cache for chat model responses, stored in SQLite.
+
+    The key is a hash of the normalized messages plus LangChain's llm string,
+    which already carries the model name, its parameters and the tools bound
+    with `bind_tools`. Attach it through `new_chat_open_ai(..., cache=...)`.
+    """
+    def __init__(self, path: str | None = None, max_entries: int | None = 10_000, ttl: float | None = None):
+        self.store = SQLiteStore(
+            path or os.path.join(cache_config.CACHE_DIR, "responses.sqlite"),
+            table="responses", max_entries=max_entries)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{normalize_prompt(prompt)}\0{llm_string}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        row = self.store.get(self.key(prompt, llm_string))
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        generations = [loads(g) for g in json.loads(row[0])]
+        for g in generations:
+            if hasattr(g, "message"):
+                _fresh_ids(g.message)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        value = json.dumps([dumps(g) for g in return_val])
+        self.store.set(self.key(prompt, llm_string), value.encode(), ttl=self.ttl)
+
+    def clear(self, **kwargs) -> None:
+        self.store.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self.store),
+        }
+
+
+def _cache_key(model, messages: list):
+    # what BaseChatModel._generate_with_cache hashes for `model.invoke(messages)`;
+    # `model` may be a chat model or one bound with `bind_tools`
+    chat = getattr(model, "bound", model)
+    if not isinstance(getattr(chat, "cache", None), ResponseCache):
+        return None
+    return chat.cache, dumps(messages), chat._get_llm_string(stop=None, **getattr(model, "kwargs", {}))
+
+
+def lookup_message(model, messages: list):
+    """
+    The AIMessage `model.invoke(messages)` would return from its
+    ResponseCache, or None. `model.stream` never looks at the cache, so
+    utils.streaming asks here first.
+    """
+    key = _cache_key(model, messages)
+    if key is None:
+        return None
+    cache, prompt, llm_string = key
+    generations = cache.lookup(prompt, llm_string)
+    return generations[0].message if generations else None
+
+
+def update_message(model, messages: list, message) -> None:
+    """Store a streamed reply under the key `model.invoke(messages)` would use."""
+    from langchain_core.outputs import ChatGeneration
+    key = _cache_key(model, messages)
+    if key is not None:
+        cache, prompt, llm_string = key
+        cache.update(prompt, llm_string, [ChatGeneration(message=message)])
@@ -0,0 +1,202 @@
+import bisect
+import csv
+import difflib
+import json
+import mmap
+import os
+import re
+import threading
+
+from collections import Counter
+from typing import Callable
+
+_non_alnum = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_key(text: str) -> str:
+    return _non_alnum.sub(" ", str(text).casefold()).strip()
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LookupTable:
+    """
+    In-memory index over a reference table for exact, prefix, word and fuzzy
+    lookups.
+
+    Rows come from `rows` (a list of dicts) or from `path`: CSV with a header,
+    JSON lines (.jsonl) or a JSON array (.json). CSV and JSON lines files
+    must hold one record per line; they are memory-mapped and only the byte
+    offset of each record is indexed, so rows are decoded on demand. Nothing
+    is read until the first lookup, and the word and fuzzy trigram indexes
+    are only built on the first lookup that needs them.
+    """
+    def __init__(self, path: str | None = None, rows: list[dict] | None = None, key: str = "name"):
+        if (path is None) == (rows is None):
+            raise ValueError("pass exactly one of path or rows")
+        self.path = path
+        self.key = key
+        self._rows = rows
+        self._lock = threading.Lock()
+        self._index = None          # normalized key -> row position (or byte offset)
+        self._sorted_keys = None
+        self._word_index = None
+        self._trigram_index = None
+        self._mmap = None
+        self._columns = None
+
+    # loading
+
+    def _ensure_index(self) -> dict:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    index = self._build_index()
+                    # _index is what the unlocked check reads, so it is published last
+                    self._sorted_keys = sorted(index)
+                    self._index = index
+        return self._index
+
+    def _build_index(self) -> dict:
+        if self._rows is not None:
+            return {normalize_key(r[self.key]): i for i, r in enumerate(self._rows)}
+        if self.path.endswith(".json"):
+            with open(self.path) as f:
+                self._rows = json.load(f)
+            return {normalize_key(r[self.key]): i for i, r in enumerate(self._rows)}
+
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap refuses empty files
+                self._rows = []
+                return {}
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        index = {}
+        offset = 0
+        if self.path.endswith(".csv"):
+            header = self._mmap.readline()
+            self._columns = next(csv.reader([header.decode()]))
+            column = self._columns.index(self.key)
+            offset = len(header)
+        while offset < len(self._mmap):
+            end = self._mmap.find(b"\n", offset)
+            end = len(self._mmap) if end == -1 else end
+            line = self._mmap[offset:end].decode().rstrip("\r")
+            if line.strip():
+                value = next(csv.reader([line]))[column] if self._columns else json.loads(line)[self.key]
+                index.setdefault(normalize_key(value), offset)
+            offset = end + 1
+        return index
+
+    def _row(self, position: int) -> dict:
+        if self._mmap is None:
+            return self._rows[position]
+        end = self._mmap.find(b"\n", position)
+        line = self._mmap[position:end if end != -1 else len(self._mmap)].decode().rstrip("\r")
+        if self._columns:
+            return dict(zip(self._columns, next(csv.reader([line]))))
+        return json.loads(line)
+
+    # lookups
+
+    def exact(self, name: str) -> dict | None:
+        position = self._ensure_index().get(normalize_key(name))
+        return None if position is None else self._row(position)
+
+    def prefix(self, prefix: str, limit: int = 10) -> list[dict]:
+        self._ensure_index()
+        prefix = normalize_key(prefix)
+        if not prefix:
+            return []
+        start = bisect.bisect_left(self._sorted_keys, prefix)
+        rows = []
+        for key in self._sorted_keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            rows.append(self._row(self._index[key]))
+        return rows
+
+    def words(self, name: str, limit: int = 10) -> list[dict]:
+        """Rows whose key ends with `name` on a word boundary, so "collie" finds "border collie"."""
+        index = self._ensure_index()
+        if self._word_index is None:
+            with self._lock:
+                if self._word_index is None:
+                    word_index = {}
+                    for key in index:
+                        words = key.split()
+                        for i in range(1, len(words)):
+                            word_index.setdefault(" ".join(words[i:]), []).append(key)
+                    self._word_index = word_index
+        keys = self._word_index.get(normalize_key(name), ())
+        return [self._row(index[key]) for key in keys[:limit]]
+
+    def fuzzy(self, name: str, limit: int = 3, cutoff: float = 0.8) -> list[dict]:
+        index = self._ensure_index()
+        if self._trigram_index is None:
+            with self._lock:
+                if self._trigram_index is None:
+                    trigram_index = {}
+                    for key in index:
+                        for gram in _trigrams(key):
+                            trigram_index.setdefault(gram, []).append(key)
+                    self._trigram_index = trigram_index
+        name = normalize_key(name)
+        if not name:
+            return []
+        # shortlist keys sharing the most trigrams, then score only those;
+        # grams common to a large part of the table say little and cost a lot
+        postings = sorted((self._trigram_index.get(g, ()) for g in _trigrams(name)), key=len)
+        max_posting = max(1000, len(index) // 100)
+        shared = Counter()
+        for posting in [p for p in postings if len(p) <= max_posting] or postings[:1]:
+            shared.update(posting)
+        candidates = [key for key, _ in shared.most_common(50)]
+        matches = difflib.get_close_matches(name, candidates, n=limit, cutoff=cutoff)
+        return [self._row(index[key]) for key in matches]
+
+    def lookup(self, name: str) -> dict | None:
+        """Exact match, else the only prefix match, else the only word match, else the best fuzzy match."""
+        row = self.exact(name)
+        if row is not None:
+            return row
+        rows = self.prefix(name, limit=2)
+        if len(rows) == 1:
+            return rows[0]
+        rows = self.words(name, limit=2)
+        if len(rows) == 1:
+            return rows[0]
+        rows = self.fuzzy(name, limit=1)
+        return rows[0] if rows else None
+
+    def __len__(self) -> int:
+        return len(self._ensure_index())
+
+
+def build_lookup_tool(table: LookupTable, formatter: Callable[[dict], str], default: str) -> Callable[[str], str]:
+    """Turn a table into a ReAct action: name in, formatted row (or `default`) out."""
+    def _lookup(name: str) -> str:
+        row = table.lookup(name.strip())
+        return default if row is None else formatter(row)
+    return _lookup
+
+
+def register_lookup_tool(
+        actions: dict,
+        name: str,
+        table: LookupTable,
+        formatter: Callable[[dict], str],
+        default: str,
+        ) -> Callable[[str], str]:
+    """Build a lookup action and add it to an actions dict such as `known_actions`."""
+    action = build_lookup_tool(table, formatter, default)
+    action.__name__ = name
+    actions[name] = action
+    return action
+
+
+def data_path(filename: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", filename)
@@ -0,0 +1,267 @@
+import bisect
+import json
+import threading
+import time
+
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import ToolMessage
+
+from agents_in_langgraph.config.metrics import DEFAULT_BUCKETS, SERVICE_NAME
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape_label(value) -> str:
+    # the exposition format escapes backslash, double quote and line feed
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """
+    In-process counters, gauges and histograms, exportable as Prometheus text or
+    OTLP JSON lines.
+
+    Nothing in the project records metrics unless a registry is passed in,
+    so leaving it out costs nothing.
+    """
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters = {}     # (name, labels) -> value
+        self._gauges = {}       # (name, labels) -> last value set
+        self._histograms = {}   # (name, labels) -> [per-bucket counts (+inf last), sum, count]
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = float(value)
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, _label_key(labels))
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            h = self._histograms.get(key)
+            if h is None:
+                h = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            h[0][slot] += 1
+            h[1] += value
+            h[2] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict:
+        """Counters and histogram summaries, keyed by name then by label tuple."""
+        with self._lock:
+            counters = {**self._counters, **self._gauges}
+            histograms = {k: (list(v[0]), v[1], v[2]) for k, v in self._histograms.items()}
+        out = {}
+        for (name, labels), value in counters.items():
+            out.setdefault(name, {})[labels] = value
+        for (name, labels), (_, total, count) in histograms.items():
+            out.setdefault(name, {})[labels] = {"count": count, "sum": total, "mean": total / count}
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    # exporters
+
+    def to_prometheus(self) -> str:
+        def fmt(labels, extra=()):
+            pairs = [*labels, *extra]
+            return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._histograms.items())
+        lines = []
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{fmt(labels)} {value}")
+        for (name, labels), value in gauges:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{fmt(labels)} {value}")
+        for (name, labels), (counts, total, count) in histograms:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, n in zip((*self.buckets, "+Inf"), counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{fmt(labels)} {total}")
+            lines.append(f"{name}_count{fmt(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_otlp(self) -> dict:
+        """The registry as one OTLP/JSON ExportMetricsServiceRequest (cumulative temporality)."""
+        now = str(time.time_ns())
+
+        def attributes(labels):
+            return [{"key": k, "value": {"stringValue": v}} for k, v in labels]
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._histograms.items())
+        metrics = {}
+        for (name, labels), value in counters:
+            metric = metrics.setdefault(name, {"name": name, "sum": {
+                "dataPoints": [], "aggregationTemporality": 2, "isMonotonic": True}})
+            metric["sum"]["dataPoints"].append(
+                {"attributes": attributes(labels), "asDouble": value, "timeUnixNano": now})
+        for (name, labels), value in gauges:
+            metric = metrics.setdefault(name, {"name": name, "gauge": {"dataPoints": []}})
+            metric["gauge"]["dataPoints"].append(
+                {"attributes": attributes(labels), "asDouble": value, "timeUnixNano": now})
+        for (name, labels), (counts, total, count) in histograms:
+            metric = metrics.setdefault(name, {"name": name, "histogram": {
+                "dataPoints": [], "aggregationTemporality": 2}})
+            metric["histogram"]["dataPoints"].append({
+                "attributes": attributes(labels), "timeUnixNano": now,
+                "count": str(count), "sum": total,
+                "bucketCounts": [str(n) for n in counts], "explicitBounds": list(self.buckets)})
+        return {"resourceMetrics": [{
+            "resource": {"attributes": attributes([("service.name", SERVICE_NAME)])},
+            "scopeMetrics": [{"scope": {"name": "agents_in_langgraph"}, "metrics": list(metrics.values())}],
+        }]}
+
+    def export_otlp_file(self, path: str) -> None:
+        """Append the current state as one JSON line, the format of the collector's file exporter."""
+        with open(path, "a") as f:
+            f.write(json.dumps(self.to_otlp()) + "\n")
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Callback handler for a compiled Agent graph.
+
+    Records wall time per graph node (`llm`, `action`, ...), tool latency
+    from the ToolMessages the action node returns (see utils.tool_executor),
+    prompt/completion tokens from the model's usage metadata and, when the
+    model streams, time to first token, which is where a prompt-prefix
+    cache hit on the server shows.
+    """
+    run_inline = True
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._starts = {}   # run id -> (node, start time)
+        self._llm_starts = {}   # run id -> (model, start time), until the first token
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # only the node itself, not the runnables nested inside it
+        if node is not None and kwargs.get("name") == node:
+            self._starts[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        started = self._starts.pop(run_id, None)
+        if started is None:
+            return
+        node, start = started
+        self.registry.observe("agent_node_seconds", time.perf_counter() - start, node=node, status="ok")
+        if isinstance(outputs, dict):
+            for m in outputs.get("messages", ()):
+                if isinstance(m, ToolMessage) and "latency" in m.response_metadata:
+                    self.registry.observe(
+                        "agent_tool_seconds", m.response_metadata["latency"], tool=m.name, status=m.status)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        started = self._starts.pop(run_id, None)
+        if started is not None:
+            node, start = started
+            self.registry.observe("agent_node_seconds", time.perf_counter() - start, node=node, status="error")
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._llm_starts[run_id] = ((metadata or {}).get("ls_model_name", ""), time.perf_counter())
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        started = self._llm_starts.pop(run_id, None)
+        if started is not None:
+            model, start = started
+            self.registry.observe("agent_llm_ttft_seconds", time.perf_counter() - start, model=model)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._llm_starts.pop(run_id, None)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._llm_starts.pop(run_id, None)
+        model = (response.llm_output or {}).get("model_name", "")
+        for generations in response.generations:
+            for g in generations:
+                message = getattr(g, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if not usage:
+                    continue
+                model = model or message.response_metadata.get("model_name", "")
+                self.registry.inc("agent_llm_tokens_total", usage.get("input_tokens", 0), model=model, kind="prompt")
+                self.registry.inc("agent_llm_tokens_total", usage.get("output_tokens", 0), model=model, kind="completion")
+
+
+def instrument_checkpointer(checkpointer, registry: MetricsRegistry):
+    """
+    Time the checkpoint writes of `checkpointer` into `registry`.
+
+    The write methods are wrapped on the instance itself, so savers that
+    are never instrumented keep their plain methods. Instrumenting a saver
+    again with another registry adds that registry: every write is then
+    recorded in each of them.
+    """
+    registries = getattr(checkpointer, "_metrics_registries", None)
+    if registries is not None:
+        if not any(r is registry for r in registries):
+            registries.append(registry)
+        return checkpointer
+    registries = checkpointer._metrics_registries = [registry]
+
+    def _record(op: str, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        for r in registries:
+            r.observe("agent_checkpoint_write_seconds", elapsed, op=op)
+
+    def _timed(op: str, method):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                _record(op, start)
+        return wrapper
+
+    def _atimed(op: str, method):
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                _record(op, start)
+        return wrapper
+
+    for op in ("put", "put_writes"):
+        setattr(checkpointer, op, _timed(op, getattr(checkpointer, op)))
+        setattr(checkpointer, f"a{op}", _atimed(op, getattr(checkpointer, f"a{op}")))
+    return checkpointer
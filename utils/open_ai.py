@@ -1,8 +1,15 @@
-import openai
+# openai, langchain_openai and langchain_core (ResponseCache, see utils.llm_cache)
+# take a good part of a second to import, so they are only imported once a
+# client is actually built
+import time
 
-from langchain_openai import ChatOpenAI
+from typing import TYPE_CHECKING
 
 from agents_in_langgraph.config import open_ai as open_ai_config
+from agents_in_langgraph.utils.clients import get_or_create, http_client
+
+if TYPE_CHECKING:
+    from agents_in_langgraph.utils.llm_cache import ResponseCache
 
 def get_base_url() -> str:
     return open_ai_config.BASE_URL
@@ -10,14 +17,61 @@ def get_base_url() -> str:
 def get_api_key() -> str:
     return open_ai_config.API_KEY
 
+def get_ollama_url() -> str:
+    # Ollama's native API sits next to its OpenAI compatible one
+    return open_ai_config.BASE_URL.rstrip("/").removesuffix("/v1")
+
+def ollama_options(keep_alive: str | None = open_ai_config.KEEP_ALIVE) -> dict:
+    """Request body fields for Ollama, pass as `extra_body` of an OpenAI completion call."""
+    return {"keep_alive": keep_alive} if keep_alive is not None else {}
+
 def new_open_ai():
-    return openai.OpenAI(
-        base_url=open_ai_config.BASE_URL,
-        api_key=open_ai_config.API_KEY,  # this is also the default, it can be omitted
-    )
+    # one client per process, every agent reuses its keep-alive connections
+    def _client():
+        import openai
+        return openai.OpenAI(
+            base_url=open_ai_config.BASE_URL,
+            api_key=open_ai_config.API_KEY,  # this is also the default, it can be omitted
+            http_client=http_client(),
+        )
+    return get_or_create(("openai", get_base_url()), _client)
 
-def new_chat_open_ai(model: str, temperature: float = 0.0):
+def new_chat_open_ai(
+        model: str,
+        temperature: float = 0.0,
+        cache: "ResponseCache | None" = None,
+        keep_alive: str | None = open_ai_config.KEEP_ALIVE,
+        ):
+    # sampled answers are not reproducible, so only greedy decoding is cached
+    if cache is not None and temperature > 0:
+        cache = False
+    from langchain_openai import ChatOpenAI
     return ChatOpenAI(
         base_url=get_base_url(),
         api_key=get_api_key(),
-        temperature=temperature, model=model)
\ No newline at end of file
+        temperature=temperature, model=model,
+        cache=cache,
+        http_client=http_client(),
+        # keeps the model, and with it the cached prompt prefix, loaded between calls
+        extra_body=ollama_options(keep_alive) or None)
+
+def warm_up(model: str, keep_alive: str | None = open_ai_config.KEEP_ALIVE, prefix=None) -> float | None:
+    """
+    Load `model` in Ollama with `keep_alive` before the first real request,
+    and, given `prefix` (a chat model bound with the agent's tools and the
+    messages every prompt starts with, e.g. the system prompt), prefill it
+    so the server's prompt cache holds it. Returns the seconds it took, or
+    None when the server could not be reached.
+    """
+    start = time.perf_counter()
+    try:
+        # an empty generate request only loads the model, see Ollama's API docs
+        body = {"model": model, **ollama_options(keep_alive)}
+        http_client().post(f"{get_ollama_url()}/api/generate", json=body).raise_for_status()
+        if prefix is not None:
+            bound_model, messages = prefix
+            bound_model.invoke(messages, max_tokens=1)
+    except Exception as e:
+        print(f"warm up of {model} failed: {e}")
+        return None
+    return time.perf_counter() - start
\ No newline at end of file
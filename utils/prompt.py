@@ -0,0 +1,65 @@
+import hashlib
+import json
+import threading
+
+from collections import OrderedDict
+
+
+def _serialize(message) -> str:
+    # what decides the prompt bytes the server sees for one message
+    return json.dumps([
+        message.type,
+        message.content,
+        [[t["name"], t["args"]] for t in getattr(message, "tool_calls", None) or ()],
+        getattr(message, "tool_call_id", None),
+    ], sort_keys=True, ensure_ascii=False, default=str)
+
+
+def tool_schemas(model) -> str:
+    """The tool schemas `bind_tools` attached to `model`, as sent with every request."""
+    tools = getattr(model, "kwargs", {}).get("tools", ())
+    return json.dumps(tools, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class PrefixTracker:
+    """
+    How much of each prompt starts with a prefix an earlier prompt already
+    sent: the tool schemas, then message after message.
+
+    Ollama, like most servers, reuses the KV cache for the longest prompt
+    prefix it has seen, so this is an upper bound of what prefill can skip.
+    Prompts are remembered as a chain of digests, one per message, in an LRU
+    of `maxsize` digests. With a `metrics` registry the characters per
+    prompt are counted in agent_prompt_chars_total{part="reused"|"new"}.
+    """
+    def __init__(self, metrics=None, maxsize: int = 100_000):
+        self.metrics = metrics
+        self.maxsize = maxsize
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def observe(self, messages: list, tools: str = "") -> tuple[int, int]:
+        """Remember the prompt; returns (characters in a known prefix, total characters)."""
+        digest = hashlib.sha256(tools.encode())
+        chunks = [(tools, digest.copy().hexdigest())]
+        for m in messages:
+            text = _serialize(m)
+            digest.update(text.encode())
+            chunks.append((text, digest.copy().hexdigest()))
+        reused = total = 0
+        known = True
+        with self._lock:
+            for text, key in chunks:
+                total += len(text)
+                if known and key in self._seen:
+                    reused += len(text)
+                    self._seen.move_to_end(key)
+                else:
+                    known = False
+                    self._seen[key] = None
+            while len(self._seen) > self.maxsize:
+                self._seen.popitem(last=False)
+        if self.metrics is not None:
+            self.metrics.inc("agent_prompt_chars_total", reused, part="reused")
+            self.metrics.inc("agent_prompt_chars_total", total - reused, part="new")
+        return reused, total
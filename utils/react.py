@@ -0,0 +1,107 @@
+import logging
+import re
+
+from typing import Callable, Iterable, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+ACTION_RE = re.compile(r'^Action: (\w+): (.*)$')
+
+
+class Action(NamedTuple):
+    name: str
+    input: str
+
+
+class ActionError(Exception):
+    """Base class for errors that are reported back to the model as an Observation."""
+
+    def observation(self) -> str:
+        return f"Error: {self}"
+
+
+class UnknownActionError(ActionError):
+    def __init__(self, action: Action, known: Iterable[str]):
+        self.action = action
+        super().__init__(f"unknown action {action.name!r}, available actions: {', '.join(sorted(known))}")
+
+
+class ActionFailedError(ActionError):
+    def __init__(self, action: Action, error: Exception):
+        self.action = action
+        self.error = error
+        super().__init__(f"action {action.name}: {action.input} failed: {type(error).__name__}: {error}")
+
+
+class ReActParser:
+    """
+    Single-pass, incremental parser for ReAct completions.
+
+    Feed it text as it arrives (whole completions or streamed tokens); every
+    `Action: name: input` line is returned as soon as its newline is seen,
+    so an action can start before the model has finished the completion.
+    `close()` flushes a last line that has no trailing newline.
+    """
+    def __init__(self, action_re: re.Pattern = ACTION_RE):
+        self.action_re = action_re
+        self._line = []
+        self.answer = None
+
+    def feed(self, text: str) -> list[Action]:
+        actions = []
+        while text:
+            newline = text.find("\n")
+            if newline == -1:
+                self._line.append(text)
+                break
+            self._line.append(text[:newline])
+            text = text[newline + 1:]
+            action = self._end_line()
+            if action is not None:
+                actions.append(action)
+        return actions
+
+    def close(self) -> list[Action]:
+        action = self._end_line() if self._line else None
+        return [action] if action is not None else []
+
+    def _end_line(self) -> Action | None:
+        line = "".join(self._line).strip()
+        self._line = []
+        if line.startswith("Answer:"):
+            self.answer = line[len("Answer:"):].strip()
+        match = self.action_re.match(line)
+        return Action(*match.groups()) if match else None
+
+
+class ActionDispatcher:
+    """
+    Run parsed actions against a dict of callables.
+
+    Unknown actions and actions that raise never escape as exceptions; they
+    become an ActionError whose text is sent to the model as the
+    Observation, so it can correct itself on the next turn.
+    """
+    def __init__(self, actions: dict[str, Callable[[str], object]]):
+        self.actions = actions
+
+    def run(self, action: Action) -> str:
+        try:
+            if action.name not in self.actions:
+                raise UnknownActionError(action, self.actions)
+            logger.info("running action %s: %s", action.name, action.input)
+            try:
+                result = self.actions[action.name](action.input)
+            except Exception as e:
+                raise ActionFailedError(action, e) from e
+        except ActionError as e:
+            logger.warning("%s", e)
+            return e.observation()
+        logger.info("observation for %s: %s", action.name, result)
+        return str(result)
+
+
+def format_observations(actions: list[Action], observations: list[str]) -> str:
+    if len(observations) == 1:
+        return f"Observation: {observations[0]}"
+    return "\n".join(f"Observation {i + 1} ({a.name}): {o}" for i, (a, o) in enumerate(zip(actions, observations)))
@@ -0,0 +1,94 @@
+from uuid import uuid4
+
+from langchain_core.messages import AnyMessage
+
+
+class IndexedMessages(list):
+    """
+    A plain list of messages that also remembers where each message id sits.
+
+    `reduce_messages` returns one of these, so on the next graph step the
+    index comes back as `left` and does not need to be rebuilt. Lists loaded
+    from a checkpoint are plain lists again and get re-indexed once.
+    """
+    __slots__ = ("_positions", "_size")
+
+    def __init__(self, messages=(), positions: dict | None = None):
+        super().__init__(messages)
+        if positions is None:
+            positions = {}
+            for i, message in enumerate(self):
+                # keep the first occurrence, that is the one a linear scan finds
+                if message.id is not None and message.id not in positions:
+                    positions[message.id] = i
+        self._positions = positions
+        self._size = len(self)
+
+    def _invalidate(self) -> None:
+        # an in-place edit may move ids without changing the length
+        self._size = -1
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._invalidate()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._invalidate()
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        self._invalidate()
+
+    def pop(self, index=-1):
+        self._invalidate()
+        return super().pop(index)
+
+    def remove(self, value):
+        super().remove(value)
+        self._invalidate()
+
+    def sort(self, **kwargs):
+        super().sort(**kwargs)
+        self._invalidate()
+
+    def reverse(self):
+        super().reverse()
+        self._invalidate()
+
+
+def _positions_of(messages: list[AnyMessage]) -> dict:
+    # trust the carried index only while no resize or in-place edit invalidated it
+    if isinstance(messages, IndexedMessages) and messages._size == len(messages):
+        return messages._positions
+    return IndexedMessages(messages)._positions
+
+
+def reduce_messages(left: list[AnyMessage], right: list[AnyMessage]) -> list[AnyMessage]:
+    """
+    Replace messages with the same `id` and append the rest, like the
+    reducer in L5, but through an id -> position index: a step costs
+    O(len(left) + len(right)) instead of O(len(left) * len(right)).
+    """
+    # assign ids to messages that don't have them
+    for message in right:
+        if not message.id:
+            message.id = str(uuid4())
+    # copy the list and its index, both are C-level copies
+    merged = IndexedMessages(left, dict(_positions_of(left)))
+    positions = merged._positions
+    for message in right:
+        i = positions.get(message.id)
+        if i is not None and merged[i].id != message.id:
+            # the carried index is stale after all, rebuild it from the list
+            positions = merged._positions = IndexedMessages(merged)._positions
+            i = positions.get(message.id)
+        if i is None:
+            # append any new messages to the end
+            positions[message.id] = len(merged)
+            merged.append(message)
+        else:
+            # replace any existing messages with the same id
+            merged[i] = message
+    merged._size = len(merged)
+    return merged
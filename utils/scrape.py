@@ -0,0 +1,120 @@
+import codecs
+import re
+
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Iterable
+
+from agents_in_langgraph.utils.clients import requests_session
+
+# tags whose text is kept, the same set regular_search.extract_text uses
+TEXT_TAGS = frozenset({"h1", "h2", "h3", "p"})
+SKIP_TAGS = frozenset({"script", "style", "noscript", "template"})
+
+_whitespace = re.compile(r"\s+")
+
+
+class TextExtractor(HTMLParser):
+    """
+    Incremental HTML parser that keeps only the text of h1/h2/h3/p elements.
+
+    Feed it chunks as they are downloaded; no tree is built, so memory stays
+    proportional to the extracted text rather than the page.
+    """
+    def __init__(self, tags: frozenset = TEXT_TAGS):
+        super().__init__(convert_charrefs=True)
+        self.tags = tags
+        self.texts = []
+        self._depth = 0
+        self._skip = 0
+        self._buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag in self.tags:
+            self._depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(self._skip - 1, 0)
+        elif tag in self.tags and self._depth:
+            self._depth -= 1
+            if not self._depth:
+                self._flush()
+
+    def handle_data(self, data):
+        if self._depth and not self._skip:
+            self._buffer.append(data)
+
+    def _flush(self):
+        text = _whitespace.sub(" ", " ".join(self._buffer)).strip()
+        if text:
+            self.texts.append(text)
+        self._buffer = []
+
+    def close(self):
+        super().close()
+        if self._buffer:
+            self._flush()
+
+    def text(self) -> str:
+        return " ".join(self.texts)
+
+
+def extract_chunks(chunks: Iterable[bytes], encoding: str = "utf-8") -> str:
+    """Run byte chunks through an incremental decoder and a TextExtractor."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    parser = TextExtractor()
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    return parser.text()
+
+
+def _capped(chunks: Iterable[bytes], max_bytes: int) -> Iterable[bytes]:
+    seen = 0
+    for chunk in chunks:
+        if seen + len(chunk) >= max_bytes:
+            yield chunk[:max_bytes - seen]
+            return
+        seen += len(chunk)
+        yield chunk
+
+
+def scrape_text(
+        url: str,
+        max_bytes: int = 1 << 20,
+        chunk_size: int = 16 << 10,
+        timeout: float = 10.0,
+        ) -> str | None:
+    """
+    Stream `url` and return its h1/h2/h3/p text, or None when the request
+    fails. At most `max_bytes` of the body are downloaded.
+    """
+    headers = {'User-Agent': 'Mozilla/5.0'}
+    with requests_session().get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code != 200:
+            return None
+        encoding = response.encoding or "utf-8"
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = "utf-8"
+        return extract_chunks(_capped(response.iter_content(chunk_size=chunk_size), max_bytes), encoding)
+
+
+def scrape_many(urls: list[str], max_workers: int = 6, **kwargs) -> list[tuple[str, str | None]]:
+    """Scrape all `urls` concurrently; results keep the order of `urls`."""
+    def _scrape(url):
+        try:
+            return scrape_text(url, **kwargs)
+        except Exception as e:
+            print(f"failed to scrape {url}: {e}")
+            return None
+
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+        return list(zip(urls, executor.map(_scrape, urls)))
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import re
+
+from typing import TYPE_CHECKING
+
+from agents_in_langgraph.config import cache as cache_config
+from agents_in_langgraph.utils.sqlite_store import SQLiteStore
+
+if TYPE_CHECKING:
+    from langchain_core.tools import BaseTool
+
+# seconds a search result stays fresh, per tool; anything else gets default_ttl
+DEFAULT_TTLS = {
+    "tavily_search": 6 * 3600,
+    "tavily_client": 6 * 3600,
+    "ddg": 24 * 3600,
+}
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+def is_error(result) -> bool:
+    # LangChain's Tavily tool answers a failed request with {"error": exc} instead of raising
+    return isinstance(result, dict) and "error" in result
+
+
+class SearchCache:
+    """
+    Shared on-disk cache for search results.
+
+    Results are keyed on (tool, normalized query, parameters) and kept for the
+    tool's TTL. When the search itself fails, by raising or by returning an
+    {"error": ...} dict, an expired entry is served instead of the error,
+    which covers DDG rate limits and Tavily outages. Errors are never cached.
+    """
+    def __init__(
+            self,
+            path: str | None = None,
+            ttls: dict | None = None,
+            default_ttl: float = 3600,
+            max_entries: int | None = 50_000,
+            ):
+        self.store = SQLiteStore(
+            path or os.path.join(cache_config.CACHE_DIR, "search.sqlite"),
+            table="search", max_entries=max_entries)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    @staticmethod
+    def key(tool: str, query: str, params: dict) -> str:
+        raw = json.dumps([tool, normalize_query(query), params], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def call(self, tool: str, search, query: str, **params):
+        """Return `search(query, **params)`, from the cache when possible."""
+        key = self.key(tool, query, params)
+        row = self.store.get(key, allow_stale=True)
+        if row is not None and not row[1]:
+            self.hits += 1
+            return json.loads(row[0])
+        self.misses += 1
+        try:
+            result = search(query, **params)
+        except Exception:
+            if row is None:
+                raise
+            print(f"serving stale {tool} result due to exception in search.")
+            self.stale_hits += 1
+            return json.loads(row[0])
+        if is_error(result):
+            # never cached; the stale entry, if any, beats the error
+            if row is None:
+                return result
+            print(f"serving stale {tool} result due to error in search.")
+            self.stale_hits += 1
+            return json.loads(row[0])
+        self.store.set(key, json.dumps(result).encode(), ttl=self.ttls.get(tool, self.default_ttl))
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "entries": len(self.store),
+        }
+
+
+def cached_tool(tool: "BaseTool", cache: SearchCache) -> "BaseTool":
+    """Wrap a LangChain search tool taking a `query` argument with the cache."""
+    # langchain_core.tools pulls in langsmith, only pay for it when wrapping a tool
+    from langchain_core.tools import StructuredTool
+
+    def _search(query: str, **params):
+        return tool.invoke({"query": query, **params})
+
+    def _run(**kwargs):
+        query = kwargs.pop("query")
+        params = {k: v for k, v in kwargs.items() if v is not None}
+        return cache.call(tool.name, _search, query, **params)
+
+    return StructuredTool.from_function(
+        func=_run,
+        name=tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema,
+    )
+
+
+class CachedTavilyClient:
+    """TavilyClient stand-in whose `search` goes through the cache."""
+    def __init__(self, client, cache: SearchCache):
+        self.client = client
+        self.cache = cache
+
+    def search(self, query: str, **kwargs):
+        return self.cache.call("tavily_client", self.client.search, query, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class SQLiteStore:
+    """
+    A small on-disk key/value table with TTL and LRU eviction, shared by the
+    response and search caches.
+
+    Every entry remembers when it was last read; once the table holds more
+    than `max_entries` rows the least recently used ones are deleted, down
+    to `low_water` of `max_entries`, so eviction runs once per batch of
+    inserts rather than on every write. Expired rows are kept until evicted
+    so callers can still serve them stale.
+    """
+    def __init__(self, path: str, table: str = "kv", max_entries: int | None = 10_000, low_water: float = 0.9):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "accessed_at REAL NOT NULL, expires_at REAL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+        self.low_water = low_water
+        # rows in the table as far as this process knows; resynced on every eviction
+        self._count = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def get(self, key: str, allow_stale: bool = False) -> tuple[bytes, bool] | None:
+        """Return (value, expired) or None. Expired rows only come back with allow_stale."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            expired = expires_at is not None and expires_at <= now
+            if expired and not allow_stale:
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+        return value, expired
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            new = self._conn.execute(f"SELECT 1 FROM {self.table} WHERE key = ?", (key,)).fetchone() is None
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, accessed_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, expires_at),
+            )
+            self._count += new
+            if self.max_entries is not None and self._count > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        # callers hold self._lock; other processes may have written too, so recount
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (int(self.max_entries * self.low_water),),
+        )
+        self._count = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            purged = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            ).rowcount
+            self._count -= purged
+        return purged
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._count = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,259 @@
+import asyncio
+import json
+import threading
+import time
+import weakref
+
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages.utils import message_chunk_to_message
+
+from agents_in_langgraph.utils.llm_cache import lookup_message, update_message
+from agents_in_langgraph.utils.tool_executor import BAD_TOOL_NAME, _timeout_message, _tool_message
+
+
+class ToolCallAccumulator:
+    """
+    Rebuild tool calls from the `tool_call_chunks` of a streamed message.
+
+    Chunks are merged by their `index`; `add` returns each call once, as
+    soon as it has an id, a name and arguments that parse as a complete
+    JSON object. `flush` returns the calls still open when the stream ends.
+    """
+    def __init__(self):
+        self._calls = {}    # index -> {"id", "name", "args"}, args still a string
+        self._done = set()
+
+    def add(self, chunks: list[dict]) -> list[dict]:
+        touched = []
+        for c in chunks:
+            index = c.get("index")
+            index = len(self._calls) if index is None else index
+            call = self._calls.setdefault(index, {"id": None, "name": "", "args": ""})
+            if c.get("id"):
+                call["id"] = c["id"]
+            call["name"] += c.get("name") or ""
+            call["args"] += c.get("args") or ""
+            touched.append(index)
+        return [t for t in map(self._complete, dict.fromkeys(touched)) if t is not None]
+
+    def flush(self) -> list[dict]:
+        return [t for t in map(lambda i: self._complete(i, final=True), list(self._calls)) if t is not None]
+
+    def _complete(self, index: int, final: bool = False) -> dict | None:
+        call = self._calls[index]
+        if index in self._done or not call["id"] or not call["name"]:
+            return None
+        try:
+            args = json.loads(call["args"]) if call["args"] or not final else {}
+        except json.JSONDecodeError:
+            return None     # still streaming, or invalid: the final message reports it
+        if not isinstance(args, dict):
+            return None
+        self._done.add(index)
+        return {"name": call["name"], "args": args, "id": call["id"], "type": "tool_call"}
+
+
+def _replay_cached(model, messages: list, on_token, on_tool_call) -> AIMessage | None:
+    # a ResponseCache hit (utils.llm_cache) is replayed as one chunk
+    message = lookup_message(model, messages)
+    if message is not None:
+        if on_token is not None and message.content:
+            on_token(message.content)
+        if on_tool_call is not None:
+            for t in message.tool_calls:
+                on_tool_call(t)
+    return message
+
+
+def stream_model(
+        model,
+        messages: list,
+        on_token: Callable[[str], None] | None = None,
+        on_tool_call: Callable[[dict], None] | None = None,
+        ) -> AIMessage:
+    """
+    `model.invoke(messages)`, but streamed: text goes to `on_token` as it
+    arrives and every tool call is handed to `on_tool_call` as soon as its
+    arguments are complete, while the model may still be generating the
+    next one. Returns the same AIMessage `invoke` would, and like `invoke`
+    answers from and fills the model's ResponseCache, if it has one.
+    """
+    cached = _replay_cached(model, messages, on_token, on_tool_call)
+    if cached is not None:
+        return cached
+    accumulator = ToolCallAccumulator()
+    message = None
+    for chunk in model.stream(messages):
+        message = chunk if message is None else message + chunk
+        if on_token is not None and chunk.content:
+            on_token(chunk.content)
+        if on_tool_call is not None:
+            for t in accumulator.add(chunk.tool_call_chunks):
+                on_tool_call(t)
+    if on_tool_call is not None:
+        for t in accumulator.flush():
+            on_tool_call(t)
+    message = message_chunk_to_message(message)
+    update_message(model, messages, message)
+    return message
+
+
+async def astream_model(
+        model,
+        messages: list,
+        on_token: Callable[[str], None] | None = None,
+        on_tool_call: Callable[[dict], None] | None = None,
+        ) -> AIMessage:
+    """Async counterpart of `stream_model` built on `model.astream`."""
+    cached = _replay_cached(model, messages, on_token, on_tool_call)
+    if cached is not None:
+        return cached
+    accumulator = ToolCallAccumulator()
+    message = None
+    async for chunk in model.astream(messages):
+        message = chunk if message is None else message + chunk
+        if on_token is not None and chunk.content:
+            on_token(chunk.content)
+        if on_tool_call is not None:
+            for t in accumulator.add(chunk.tool_call_chunks):
+                on_tool_call(t)
+    if on_tool_call is not None:
+        for t in accumulator.flush():
+            on_tool_call(t)
+    message = message_chunk_to_message(message)
+    update_message(model, messages, message)
+    return message
+
+
+class ToolDispatcher:
+    """
+    Start tool calls while the model is still streaming and collect their
+    ToolMessages in the action node.
+
+    `submit` is meant as the `on_tool_call` of `stream_model`; `collect`
+    returns the ToolMessages for a turn in tool_call order, running any
+    call that was not submitted early (e.g. after a resume from a
+    checkpoint). Calls are keyed by tool_call id, so one dispatcher can be
+    shared by every thread of an agent. Because early calls get a head
+    start, `timeout` counts from `collect`: each call gets at least that long.
+
+    Calls that are never collected (the stream failed, the final message
+    dropped the call, the graph stopped before its action node) are dropped
+    with `discard`, which the agent does at the end of every model turn, or
+    after `max_age` seconds at the latest.
+    """
+    def __init__(self, tools: dict, max_workers: int = 4, output_policy=None, max_age: float = 600.0):
+        self.tools = tools
+        self.output_policy = output_policy
+        self.max_age = max_age
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="tool")
+        self._lock = threading.Lock()
+        self._pending = {}  # tool_call id -> (future, start time, submit time)
+
+    def submit(self, t: dict) -> None:
+        with self._lock:
+            if t['id'] in self._pending:
+                return
+            now = time.monotonic()
+            for key in [k for k, (_, _, submitted) in self._pending.items() if now - submitted > self.max_age]:
+                self._pending.pop(key)[0].cancel()
+            started_at = [0.0]
+            self._pending[t['id']] = (self._executor.submit(self._call, t, started_at), started_at, now)
+
+    def discard(self, ids) -> None:
+        """Forget (and cancel, if not started yet) the calls of `ids` that were not collected."""
+        with self._lock:
+            for key in ids:
+                entry = self._pending.pop(key, None)
+                if entry is not None:
+                    entry[0].cancel()
+
+    def _call(self, t: dict, started_at: list) -> ToolMessage:
+        if t['name'] not in self.tools:
+            return _tool_message(t, BAD_TOOL_NAME, 0.0, status="error")
+        started_at[0] = time.perf_counter()
+        result = self.tools[t['name']].invoke(t['args'])
+        return _tool_message(t, result, time.perf_counter() - started_at[0], output_policy=self.output_policy)
+
+    def collect(self, tool_calls: list[dict], timeout: float | None = None) -> list[ToolMessage]:
+        for t in tool_calls:
+            self.submit(t)
+        with self._lock:
+            pending = [self._pending.pop(t['id']) for t in tool_calls]
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        results = []
+        for t, (future, started_at, _) in zip(tool_calls, pending):
+            try:
+                remaining = None if deadline is None else max(deadline - time.perf_counter(), 0.0)
+                results.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                future.cancel()
+                results.append(_timeout_message(t, timeout, time.perf_counter() - (started_at[0] or time.perf_counter())))
+        return results
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncToolDispatcher:
+    """
+    `ToolDispatcher` for coroutine nodes: early calls are tasks on the running
+    loop. The concurrency cap is per event loop, so one agent can be driven
+    by successive `asyncio.run` calls.
+    """
+    def __init__(self, tools: dict, max_concurrency: int = 4, output_policy=None):
+        self.tools = tools
+        self.output_policy = output_policy
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphores = weakref.WeakKeyDictionary()  # event loop -> asyncio.Semaphore
+        self._pending = {}  # tool_call id -> asyncio.Task
+
+    def submit(self, t: dict) -> None:
+        if t['id'] not in self._pending:
+            self._pending[t['id']] = asyncio.ensure_future(self._call(t))
+
+    def discard(self, ids) -> None:
+        """Cancel and forget the calls of `ids` that were not collected."""
+        for key in ids:
+            task = self._pending.pop(key, None)
+            if task is not None:
+                task.cancel()
+
+    async def _call(self, t: dict) -> ToolMessage:
+        if t['name'] not in self.tools:
+            return _tool_message(t, BAD_TOOL_NAME, 0.0, status="error")
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            start = time.perf_counter()
+            result = await self.tools[t['name']].ainvoke(t['args'])
+            return _tool_message(t, result, time.perf_counter() - start, output_policy=self.output_policy)
+
+    async def collect(self, tool_calls: list[dict], timeout: float | None = None) -> list[ToolMessage]:
+        for t in tool_calls:
+            self.submit(t)
+        tasks = [self._pending.pop(t['id']) for t in tool_calls]
+        start = time.perf_counter()
+        try:
+            await asyncio.wait(tasks, timeout=timeout)
+            results = []
+            for t, task in zip(tool_calls, tasks):
+                if task.done():
+                    results.append(task.result())
+                else:
+                    task.cancel()
+                    results.append(_timeout_message(t, timeout, time.perf_counter() - start))
+            return results
+        finally:
+            # a failed call or a cancelled node must not leave the others running
+            for task in tasks:
+                task.cancel()
+
+    def shutdown(self) -> None:
+        self.discard(list(self._pending))
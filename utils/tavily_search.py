@@ -1,23 +1,41 @@
 # from langchain_community.tools.tavily_search import TavilySearchResults # deprecated
-from tavily import TavilyClient
-from langchain_tavily import TavilySearch
+# tavily and langchain_tavily are imported by the factories, on first use
 
 from agents_in_langgraph.config import tavily_search as tavily_config
+from agents_in_langgraph.utils.search_cache import SearchCache, CachedTavilyClient, cached_tool
+from agents_in_langgraph.utils.clients import get_or_create
 
 def get_tavily_key() -> str:
     return tavily_config.TAVILY_API_KEY
 
 def new_tavily_search(
         max_results: int=4, 
-        tavily_api_key: str = get_tavily_key()
+        tavily_api_key: str = get_tavily_key(),
+        cache: SearchCache | None = None,
         ):
-    return TavilySearch(
-        max_results=max_results, 
-        tavily_api_key = tavily_api_key)
+    def _tool():
+        from langchain_tavily import TavilySearch
+        tool = TavilySearch(
+            max_results=max_results, 
+            tavily_api_key = tavily_api_key)
+        if cache is not None:
+            # repeated queries are served from disk and do not burn credits
+            tool = cached_tool(tool, cache)
+        return tool
+    # tavily posts through module-level requests calls, so sharing the
+    # instance is as much pooling as it allows
+    return get_or_create(("tavily_search", max_results, tavily_api_key, id(cache)), _tool)
 
 def new_trvily_client(
-        tavily_api_key: str = get_tavily_key()
+        tavily_api_key: str = get_tavily_key(),
+        cache: SearchCache | None = None,
         ):
-    return TavilyClient(
-        api_key=tavily_api_key,
-        )
\ No newline at end of file
+    def _client():
+        from tavily import TavilyClient
+        client = TavilyClient(
+            api_key=tavily_api_key,
+            )
+        if cache is not None:
+            client = CachedTavilyClient(client, cache)
+        return client
+    return get_or_create(("tavily_client", tavily_api_key, id(cache)), _client)
\ No newline at end of file
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from langchain_core.messages import ToolMessage
+
+BAD_TOOL_NAME = "bad tool name, retry"
+
+
+def _tool_message(t: dict, result, latency: float, status: str = "success", output_policy=None) -> ToolMessage:
+    # the latency rides in response_metadata, which is never sent back to the model
+    metadata = {"latency": latency}
+    if output_policy is not None and status == "success":
+        # extract, cap and store the output out of line, see utils.tool_output
+        content, extra = output_policy.apply(t['name'], result)
+        metadata.update(extra)
+    else:
+        content = str(result)
+    return ToolMessage(
+        tool_call_id=t['id'],
+        name=t['name'],
+        content=content,
+        status=status,
+        response_metadata=metadata,
+    )
+
+
+def _timeout_message(t: dict, timeout: float, latency: float) -> ToolMessage:
+    result = f"tool call timed out after {timeout}s, retry"
+    return _tool_message(t, result, latency, status="error")
+
+
+def run_tool_calls(
+        tools: dict,
+        tool_calls: list[dict],
+        max_workers: int = 4,
+        timeout: float | None = None,
+        executor: ThreadPoolExecutor | None = None,
+        output_policy=None,
+        ) -> list[ToolMessage]:
+    """
+    Run the tool calls of one model turn on a thread pool.
+
+    At most `max_workers` calls run at once and each call gets `timeout`
+    seconds from the moment it starts. The returned ToolMessages are in the
+    same order as `tool_calls`, whatever order the calls finish in, and each
+    one carries its wall time in `response_metadata["latency"]`. An
+    `output_policy` (utils.tool_output.ToolOutputPolicy) shapes the content.
+    """
+    if not tool_calls:
+        return []
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tool_calls))))
+
+    started = [threading.Event() for _ in tool_calls]
+    started_at = [0.0] * len(tool_calls)
+    finished_at = [0.0] * len(tool_calls)
+
+    def _call(i: int, t: dict):
+        started_at[i] = time.perf_counter()
+        started[i].set()
+        try:
+            return tools[t['name']].invoke(t['args'])
+        finally:
+            finished_at[i] = time.perf_counter()
+
+    futures = {}
+    for i, t in enumerate(tool_calls):
+        if t['name'] in tools:      # bad tool names are answered without a worker
+            futures[i] = executor.submit(_call, i, t)
+
+    results = []
+    try:
+        for i, t in enumerate(tool_calls):
+            if i not in futures:
+                results.append(_tool_message(t, BAD_TOOL_NAME, 0.0, status="error"))
+                continue
+            if timeout is None:
+                started[i].wait()
+                result = futures[i].result()
+            else:
+                # a saturated (shared) executor may not start the call in time either
+                if not started[i].wait(timeout):
+                    futures[i].cancel()
+                    results.append(_timeout_message(t, timeout, timeout))
+                    continue
+                remaining = started_at[i] + timeout - time.perf_counter()
+                try:
+                    result = futures[i].result(timeout=max(remaining, 0.0))
+                except FutureTimeoutError:
+                    futures[i].cancel()
+                    results.append(_timeout_message(t, timeout, time.perf_counter() - started_at[i]))
+                    continue
+            results.append(_tool_message(t, result, finished_at[i] - started_at[i], output_policy=output_policy))
+    finally:
+        if own_executor:
+            # do not block on calls that timed out, they finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+async def arun_tool_calls(
+        tools: dict,
+        tool_calls: list[dict],
+        max_concurrency: int = 4,
+        timeout: float | None = None,
+        output_policy=None,
+        ) -> list[ToolMessage]:
+    """
+    Async counterpart of `run_tool_calls`: every call goes through
+    `tool.ainvoke` and they are gathered on the running event loop,
+    bounded by a semaphore of `max_concurrency`.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _call(t: dict) -> ToolMessage:
+        if t['name'] not in tools:
+            return _tool_message(t, BAD_TOOL_NAME, 0.0, status="error")
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(tools[t['name']].ainvoke(t['args']), timeout)
+            except asyncio.TimeoutError:
+                return _timeout_message(t, timeout, time.perf_counter() - start)
+            return _tool_message(t, result, time.perf_counter() - start, output_policy=output_policy)
+
+    # gather keeps the input order, so messages still line up with tool_call ids
+    return list(await asyncio.gather(*(_call(t) for t in tool_calls)))
+
+
+def report_timings(results: list[ToolMessage]) -> None:
+    for r in results:
+        print(f"Tool {r.name} ({r.tool_call_id}): {r.status} in {r.response_metadata.get('latency', 0.0):.3f}s")
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import zlib
+
+from agents_in_langgraph.config import cache as cache_config
+from agents_in_langgraph.config import tool_output as output_config
+from agents_in_langgraph.utils.sqlite_store import SQLiteStore
+
+
+class BlobStore:
+    """
+    Content-addressed store for full tool outputs, keyed by their sha256.
+
+    Large blobs are zlib-compressed on disk. Nothing is ever evicted, since
+    checkpoints may still reference any blob, and every read is checked
+    against its digest.
+    """
+    def __init__(
+            self,
+            path: str | None = None,
+            compress_min_bytes: int = output_config.COMPRESS_MIN_BYTES,
+            level: int = output_config.COMPRESS_LEVEL,
+            ):
+        self.store = SQLiteStore(
+            path or os.path.join(cache_config.CACHE_DIR, "tool_outputs.sqlite"),
+            table="blobs", max_entries=None)
+        self.compress_min_bytes = compress_min_bytes
+        self.level = level
+
+    @staticmethod
+    def digest(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def put(self, text: str) -> tuple[str, int]:
+        """Store `text`; returns (digest, bytes on disk)."""
+        digest = self.digest(text)
+        data = text.encode()
+        # one byte of header says whether the rest is compressed
+        if len(data) >= self.compress_min_bytes:
+            value = b"z" + zlib.compress(data, self.level)
+        else:
+            value = b"r" + data
+        if self.store.get(digest) is None:
+            self.store.set(digest, value)
+        return digest, len(value)
+
+    def get(self, digest: str) -> str | None:
+        row = self.store.get(digest)
+        if row is None:
+            return None
+        value = row[0]
+        data = zlib.decompress(value[1:]) if value[:1] == b"z" else value[1:]
+        text = data.decode()
+        if self.digest(text) != digest:
+            raise ValueError(f"blob {digest} is corrupt")
+        return text
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def close(self) -> None:
+        self.store.close()
+
+
+def to_text(result) -> str:
+    """What the model reads for a tool result: JSON for structured results, str otherwise."""
+    if isinstance(result, str):
+        return result
+    if isinstance(result, (dict, list)):
+        return json.dumps(result, ensure_ascii=False, default=str)
+    return str(result)
+
+
+def search_extractor(top_k: int = output_config.SEARCH_TOP_K, snippet_chars: int = output_config.SNIPPET_CHARS):
+    """
+    Keep the parts of a search result the model answers from: Tavily's
+    `answer` and the title, url and a snippet of the top `top_k` hits.
+    Takes Tavily dicts and plain lists of hits (DDG, federated search);
+    anything else is returned as is.
+    """
+    def extract(result):
+        if isinstance(result, dict) and isinstance(result.get("results"), list):
+            hits = result["results"]
+        elif isinstance(result, list) and all(isinstance(r, dict) for r in result):
+            hits = result
+        else:
+            return result
+        compact = {}
+        if isinstance(result, dict) and result.get("answer"):
+            compact["answer"] = result["answer"]
+        compact["results"] = [{
+            "title": h.get("title", ""),
+            "url": h.get("url") or h.get("href", ""),
+            "content": (h.get("content") or h.get("body") or "")[:snippet_chars],
+        } for h in hits[:top_k]]
+        return compact
+    return extract
+
+
+DEFAULT_EXTRACTORS = {
+    "tavily_search": search_extractor(),
+    "tavily_search_results_json": search_extractor(),
+    "federated_search": search_extractor(),
+}
+
+
+class ToolOutputPolicy:
+    """
+    Decides what of a tool output goes into its ToolMessage, and so into
+    every later prompt and every checkpoint.
+
+    A per-tool extractor first keeps the useful structure (see
+    `search_extractor`), then the text is capped at the tool's size. When a
+    `store` is given, outputs of at least `blob_min_chars` are kept there in
+    full and the message only carries their digest in `response_metadata`,
+    plus a reference line in its content; `load` fetches them on demand.
+    """
+    def __init__(
+            self,
+            max_chars: dict | None = None,
+            default_max_chars: int = output_config.DEFAULT_MAX_CHARS,
+            extractors: dict | None = None,
+            store: BlobStore | None = None,
+            blob_min_chars: int = output_config.BLOB_MIN_CHARS,
+            ):
+        self.max_chars = {**output_config.TOOL_MAX_CHARS, **(max_chars or {})}
+        self.default_max_chars = default_max_chars
+        self.extractors = DEFAULT_EXTRACTORS if extractors is None else extractors
+        self.store = store
+        self.blob_min_chars = blob_min_chars
+
+    def apply(self, name: str, result) -> tuple[str, dict]:
+        """(message content, response_metadata entries) for `result` of tool `name`."""
+        raw = to_text(result)
+        extractor = self.extractors.get(name)
+        content = to_text(extractor(result)) if extractor is not None else raw
+        cap = self.max_chars.get(name, self.default_max_chars)
+        if len(content) > cap:
+            content = content[:cap] + f"\n[truncated {len(content) - cap} of {len(content)} chars]"
+        metadata = {"output_chars": len(raw)}
+        if self.store is not None and len(raw) >= self.blob_min_chars and content != raw:
+            digest, stored = self.store.put(raw)
+            metadata.update(output_digest=digest, output_stored_bytes=stored)
+            content += f"\n[full output: {len(raw)} chars, ref sha256:{digest}]"
+        return content, metadata
+
+    def load(self, message) -> str:
+        """The full output behind a ToolMessage, or its content when it was kept inline."""
+        digest = message.response_metadata.get("output_digest")
+        if digest is None or self.store is None:
+            return message.content
+        text = self.store.get(digest)
+        if text is None:
+            raise KeyError(f"tool output {digest} is not in the blob store")
+        return text
+
+    def as_tool(self, name: str = "read_tool_output"):
+        """A tool the model can call to page through a stored output by its ref."""
+        from langchain_core.tools import StructuredTool
+
+        def read_tool_output(ref: str, offset: int = 0, limit: int = 4000) -> str:
+            text = self.store.get(ref.removeprefix("sha256:")) if self.store is not None else None
+            if text is None:
+                return f"no stored output {ref}"
+            return text[offset:offset + limit]
+
+        return StructuredTool.from_function(
+            func=read_tool_output,
+            name=name,
+            description=(
+                "Read part of a tool output that was shortened. "
+                "Input is the sha256 ref shown after the output, a character offset and a limit."),
+        )
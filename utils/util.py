@@ -1,17 +1,19 @@
-def calculate(what):
-    return eval(what)
+from agents_in_langgraph.utils.calc import evaluate
+from agents_in_langgraph.utils.lookup import LookupTable, data_path, register_lookup_tool
 
-def average_dog_weight(name):
-    if name in "Scottish Terrier": 
-        return("Scottish Terriers average 20 lbs")
-    elif name in "Border Collie":
-        return("a Border Collies average weight is 37 lbs")
-    elif name in "Toy Poodle":
-        return("a toy poodles average weight is 7 lbs")
-    else:
-        return("An average dog weights 50 lbs")
+def calculate(what):
+    # no eval: only arithmetic is accepted, see utils.calc
+    return evaluate(what)
     
 known_actions = {
     "calculate": calculate,
-    "average_dog_weight": average_dog_weight
-}
\ No newline at end of file
+}
+
+# exact, then prefix, then fuzzy breed name matching over utils/data/dog_weights.csv
+average_dog_weight = register_lookup_tool(
+    known_actions,
+    "average_dog_weight",
+    LookupTable(path=data_path("dog_weights.csv")),
+    formatter=lambda row: row["answer"],
+    default="An average dog weights 50 lbs",
+)
\ No newline at end of file
@@ -0,0 +1,15 @@
+def draw_graph(graph):
+    """
+    Render a compiled graph as a PNG for notebooks.
+
+    IPython and pygraphviz are only needed here; they come with the
+    optional `viz` extra: pip install "agents-in-langgraph[viz]".
+    """
+    try:
+        from IPython.display import Image
+        png = graph.get_graph().draw_png()
+    except ImportError as e:
+        raise ImportError(
+            f"drawing graphs needs the viz extra (IPython, pygraphviz): "
+            f'pip install "agents-in-langgraph[viz]" ({e})') from e
+    return Image(png)